@@ -10,13 +10,17 @@ from typing import (
 )
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
-from agent.interview_response import QAResult, InterviewResult
+from agent.interview_response import QAResult, InterviewResult, Question
 from enum import Enum
 from datetime import datetime
 from langchain_core.messages import HumanMessage
 from typing import List, Tuple
+from pydantic import BaseModel
 import operator
 
+# default token budget of the rendered question & answer history
+QA_HISTORY_TOKEN_BUDGET = 1500
+
 
 class Language(str, Enum):
     ENGLISH = "English"
@@ -29,6 +33,46 @@ class Difficulty(str, Enum):
     HARD = "Hard"
 
 
+class AnswerMode(str, Enum):
+    # analyze_answer then send_next_question, two LLM calls per turn
+    TWO_STEP = "two_step"
+    # grade_and_ask, one LLM call returns the analysis and the next question
+    GRADE_AND_ASK = "grade_and_ask"
+
+
+class QAHistoryDigest(BaseModel):
+    """Running digest of the question & answer turns compacted out of the rendered history"""
+    # number of leading qa_history turns folded into the digest
+    turns: int = 0
+    correct: int = 0
+    score: int = 0
+    knowledge_points: List[str] = []
+    # rendered digest, the cached prefix of the rendered history
+    text: str = ""
+
+    def fold(self, qa_results: List[QAResult]) -> "QAHistoryDigest":
+        """Return a new digest extended with the given turns"""
+        knowledge_points = list(self.knowledge_points)
+        correct, score = self.correct, self.score
+        for qa_result in qa_results:
+            correct += 1 if qa_result.answer.is_correct else 0
+            score += qa_result.answer.score
+            if qa_result.question.knowledge_point not in knowledge_points:
+                knowledge_points.append(qa_result.question.knowledge_point)
+
+        turns = self.turns + len(qa_results)
+        text = (f"Q1-Q{turns} (compacted): {turns} questions asked, {correct} correct, "
+                f"total score {score}/{turns * 5}. Knowledge points covered: {', '.join(knowledge_points)}")
+        return QAHistoryDigest(turns=turns, correct=correct, score=score,
+                               knowledge_points=knowledge_points, text=text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text, one token per CJK character and per 4 other characters"""
+    cjk = sum(1 for c in text if '\u4e00' <= c <= '\u9fff' or '\u3000' <= c <= '\u30ff' or '\uff00' <= c <= '\uffef')
+    return cjk + (len(text) - cjk + 3) // 4
+
+
 def add_or_remove_messages(left: list[BaseMessage], right: list[BaseMessage] | list[str]) -> List[BaseMessage]:
     """Add or remove messages from the list.
     Args:
@@ -59,6 +103,9 @@ class AgentState(TypedDict):
     # question & answer history (question, answer, QAResult)
     qa_history: Annotated[List[Tuple[str, str, QAResult]], operator.add] = []
 
+    # older qa_history turns compacted to keep the rendered history within the token budget
+    qa_history_digest: QAHistoryDigest | None = None
+
     # interview requirement
     job_title: str
     knowledge_points: str
@@ -73,22 +120,97 @@ class AgentState(TypedDict):
     user_answer: str | None = None
     analyze_answer_response: QAResult | None = None
 
+    # id of the feedback waiting for an answer, set by the caller with the start input
+    # and replaced by next_question_id once an answer is accepted
+    question_id: str | None = None
+
+    # sent by the caller with each answer: the id of the feedback it replies to and the id of the
+    # feedback that follows, an answer to another id (e.g. a late retry) is rejected by the answer node
+    answered_question_id: str | None = None
+    next_question_id: str | None = None
+
+    # answer key of the current question, parsed from the hidden line of the generated question
+    question_key: Question | None = None
+
+    # question prepared before kickoff_interview or send_next_question runs,
+    # taken from the opening question pool, generated speculatively or by the grade_and_ask node
+    prepared_question: str | None = None
+
+    # how the answer is processed, see AnswerMode
+    answer_mode: str = "two_step"
+
     # final interview result
     interview_result: InterviewResult | None = None
 
+    # the narrative summary of interview_result is generated in the background
+    summary_pending: bool = False
+
 
-def get_qa_history(qa_history: List[Tuple[str, str, QAResult]]) -> str:
+def get_qa_history(qa_history: List[Tuple[str, str, QAResult]],
+                   digest: QAHistoryDigest | None = None) -> str:
     """Generate the history string of the question and answer.
     Args:
         qa_history: The history of the question and answer.
+        digest: The digest of the compacted turns, only the turns after it are rendered in full.
 
     Returns:
         The history string of the question and answer.
     """
     if len(qa_history) == 0:
         return "None"
-    else:
-        return "\n".join([f"{qa[2].summary}" for i, qa in enumerate(qa_history)])
+
+    lines = [qa[2].summary for qa in qa_history[digest.turns:]] if digest else [qa[2].summary for qa in qa_history]
+    if digest and digest.turns > 0:
+        lines.insert(0, digest.text)
+    return "\n".join(lines)
+
+
+def get_pending_qa_history(qa_history: List[Tuple[str, str, QAResult]], question: str, answer: str,
+                           digest: QAHistoryDigest | None = None) -> str:
+    """Generate the history string including the current, not yet analyzed, question and answer.
+    Args:
+        qa_history: The history of the question and answer.
+        question: The current question.
+        answer: The user answer of the current question.
+        digest: The digest of the compacted turns.
+
+    Returns:
+        The history string of the question and answer.
+    """
+    pending = f"{question}\nUser answer: {answer}"
+    if len(qa_history) == 0:
+        return pending
+    return get_qa_history(qa_history, digest) + "\n" + pending
+
+
+def compact_qa_history(qa_history: List[Tuple[str, str, QAResult]],
+                       digest: QAHistoryDigest | None = None,
+                       token_budget: int = QA_HISTORY_TOKEN_BUDGET) -> QAHistoryDigest | None:
+    """Fold the oldest turns into the digest until the rendered history fits the token budget.
+
+    Only the turns after the current digest are inspected, so the cost is bounded by
+    the budget rather than by the interview length. The latest turn is always kept in full.
+    Args:
+        qa_history: The history of the question and answer.
+        digest: The current digest.
+        token_budget: The token budget of the rendered history.
+
+    Returns:
+        The updated digest, or the current one if the history already fits.
+    """
+    start = digest.turns if digest else 0
+    recent = [qa[2] for qa in qa_history[start:]]
+    tokens = [estimate_tokens(qa_result.summary) + 1 for qa_result in recent]
+    total = sum(tokens) + (estimate_tokens(digest.text) if digest else 0)
+
+    fold = 0
+    while total > token_budget and fold < len(recent) - 1:
+        total -= tokens[fold]
+        fold += 1
+
+    if fold == 0:
+        return digest
+    return (digest or QAHistoryDigest()).fold(recent[:fold])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+import sys
+import os
+import re
+import json
+import unicodedata
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List, Optional, Tuple
+from pydantic import ValidationError
+from agent.interview_response import QAResult, Question, Answer, QuestionType
+from utils.log_utils import logger
+
+# the generated question ends with a hidden line carrying its answer key, e.g.
+# <answer_key>{"question_number": 1, "question_type": "Single Choice", "answer": "B", "knowledge_point": "React"}</answer_key>
+ANSWER_KEY_START = "<answer_key>"
+ANSWER_KEY_PATTERN = re.compile(r"\s*<answer_key>(.*?)(?:</answer_key>|$)\s*", re.DOTALL)
+
+CHOICE_TYPES = (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE)
+
+# "选A", "答案是 B", "I choose C", "Option D" ...
+ANSWER_PREFIX_PATTERN = re.compile(
+    r"^(?:我的答案是|答案是|答案|我选择|我选|选项|选择|选|MY ANSWER IS|THE ANSWER IS|ANSWER|I CHOOSE|I PICK|I SELECT|OPTION)\s*[:：]?\s*"
+)
+CHOICE_SEPARATOR_PATTERN = re.compile(r"\s*(?:,|、|/|&|和|及|\bAND\b|\s)\s*")
+CHOICE_TOKEN_PATTERN = re.compile(r"^[(\[]?([A-H])[)\]]?$")
+OPTION_PATTERN = re.compile(r"^[\s>*\-]*\**\s*([A-H])\s*[.、)）:：]", re.MULTILINE)
+
+TRUE_WORDS = {"TRUE", "T", "YES", "Y", "对", "正确", "是", "√", "✓"}
+FALSE_WORDS = {"FALSE", "F", "NO", "N", "错", "错误", "不对", "否", "×", "✗"}
+
+FEEDBACK = {
+    "Chinese": "已收到您的回答。",
+    "English": "Thanks, your answer has been recorded."
+}
+
+
+def split_answer_key(text: str) -> Tuple[str, Optional[Question]]:
+    """Split the generated question into the text shown to the user and its answer key.
+    Args:
+        text: The generated question, optionally ending with the answer key line.
+
+    Returns:
+        The question text without the answer key, and the parsed answer key if any.
+    """
+    match = ANSWER_KEY_PATTERN.search(text)
+    if match is None:
+        return text, None
+
+    question = (text[:match.start()] + text[match.end():]).strip()
+    try:
+        key = json.loads(match.group(1))
+        return question, Question(question=question,
+                                  question_number=key.get("question_number") or get_question_number(question),
+                                  question_type=key["question_type"],
+                                  knowledge_point=key.get("knowledge_point", ""),
+                                  answer=str(key["answer"]))
+    except (ValueError, KeyError, TypeError, ValidationError) as e:
+        logger.warning(f"Invalid answer key {match.group(1)}: {str(e)}")
+        return question, None
+
+
+class AnswerKeyStreamFilter:
+    """Remove the answer key line from a streamed question, chunk by chunk"""
+
+    def __init__(self):
+        self._pending = ""
+        self._stopped = False
+
+    def feed(self, chunk: str) -> str:
+        """Return the part of the chunk that can be shown to the user"""
+        if self._stopped:
+            return ""
+        text = self._pending + chunk
+        index = text.find(ANSWER_KEY_START)
+        if index >= 0:
+            self._stopped = True
+            self._pending = ""
+            return text[:index].rstrip()
+
+        # hold back a trailing partial "<answer_key>" and the whitespace before it until the next chunk
+        hold = next((n for n in range(len(ANSWER_KEY_START) - 1, 0, -1) if text.endswith(ANSWER_KEY_START[:n])), 0)
+        shown = text[:len(text) - hold].rstrip()
+        self._pending = text[len(shown):]
+        return shown
+
+
+def grade_answer_locally(question_key: Optional[Question], answer: str, language: str) -> Optional[QAResult]:
+    """Grade a choice or true/false answer against the answer key without the LLM.
+    Args:
+        question_key: The answer key of the current question.
+        answer: The user answer.
+        language: The interview language, used for the feedback.
+
+    Returns:
+        The analysis result, or None if the answer needs the LLM
+        (no answer key, essay or short answer questions, or ambiguous input).
+    """
+    if question_key is None:
+        return None
+
+    if question_key.question_type in CHOICE_TYPES:
+        expected = normalize_choice_answer(question_key.answer, multiple=True)
+        selected = normalize_choice_answer(answer, multiple=question_key.question_type == QuestionType.MULTIPLE_CHOICE)
+        options = set(OPTION_PATTERN.findall(unicodedata.normalize("NFKC", question_key.question)))
+        if expected is None or selected is None or (options and not set(selected) <= options):
+            return None
+        is_correct = selected == expected
+        hits = len(set(selected) & set(expected))
+        score = 5 if is_correct else (round(5 * hits / len(expected)) if set(selected) <= set(expected) else 0)
+        user_answer = ",".join(selected)
+        correct_answer = ",".join(expected)
+    elif question_key.question_type == QuestionType.TRUE_FALSE:
+        expected = normalize_true_false_answer(question_key.answer)
+        selected = normalize_true_false_answer(answer)
+        if expected is None or selected is None:
+            return None
+        is_correct = selected == expected
+        score = 5 if is_correct else 0
+        user_answer = str(selected)
+        correct_answer = str(expected)
+    else:
+        return None
+
+    logger.info(f"Graded locally: answer {user_answer}, expected {correct_answer}")
+    feedback = FEEDBACK.get(language, FEEDBACK["English"])
+    return QAResult(
+        question=question_key,
+        answer=Answer(is_valid=True,
+                      giveup=False,
+                      suggest_more_details=False,
+                      follow_up_question="",
+                      feedback=feedback,
+                      is_correct=is_correct,
+                      analysis=f"The correct answer is {correct_answer}, the user answered {user_answer}",
+                      score=score),
+        is_interview_over=False,
+        summary=f"Q{question_key.question_number} : {question_key.knowledge_point} "
+                f"Answer:{user_answer} Correct:{correct_answer} Score:{score}"
+    )
+
+
+def normalize_choice_answer(answer: str, multiple: bool = False) -> Optional[List[str]]:
+    """Extract the selected option letters, e.g. "选Ａ" -> ["A"], "a, c" -> ["A", "C"].
+    Args:
+        answer: The user answer.
+        multiple: Whether more than one option may be selected.
+
+    Returns:
+        The sorted option letters, or None if the answer is not a plain choice.
+    """
+    text = _normalize(answer)
+    text = ANSWER_PREFIX_PATTERN.sub("", text).rstrip(".。!！")
+    if not text:
+        return None
+
+    if multiple and re.fullmatch(r"[A-H]{2,}", text):
+        letters = list(text)
+    else:
+        tokens = [token for token in CHOICE_SEPARATOR_PATTERN.split(text) if token]
+        matches = [CHOICE_TOKEN_PATTERN.match(token) for token in tokens]
+        if not matches or not all(matches):
+            return None
+        letters = [match.group(1) for match in matches]
+
+    letters = sorted(set(letters))
+    if len(letters) > 1 and not multiple:
+        return None
+    return letters
+
+
+def normalize_true_false_answer(answer: str) -> Optional[bool]:
+    """Normalize a true/false answer, e.g. "对" -> True, "False." -> False, None if ambiguous"""
+    text = ANSWER_PREFIX_PATTERN.sub("", _normalize(answer)).rstrip(".。!！")
+    if text in TRUE_WORDS:
+        return True
+    if text in FALSE_WORDS:
+        return False
+    return None
+
+
+def _normalize(text: str) -> str:
+    # NFKC folds full-width letters and punctuation, e.g. "Ａ，Ｃ" -> "A,C"
+    return unicodedata.normalize("NFKC", text).strip().upper()
+
+
+def get_question_number(question: str) -> int:
+    """Get the question number from the "Q<number>" prefix, 0 if missing"""
+    match = re.search(r"Q(\d+)", question)
+    return int(match.group(1)) if match else 0
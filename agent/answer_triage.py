@@ -0,0 +1,145 @@
+import sys
+import os
+import re
+import unicodedata
+from enum import Enum
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Optional
+from agent.interview_response import QAResult, Question, Answer, QuestionType
+from agent.answer_grader import get_question_number
+from utils.log_utils import logger
+
+
+class AnswerTriage(str, Enum):
+    # the user wants to end the interview
+    STOP = "stop"
+    # the user skips the current question
+    GIVEUP = "giveup"
+    # empty, punctuation only or keyboard mashing
+    INVALID = "invalid"
+    # anything else is analyzed by the LLM
+    NEEDS_LLM = "needs_llm"
+
+
+# matched anywhere in the answer, case insensitive
+STOP_PHRASES = (
+    "结束面试", "停止面试", "退出面试", "终止面试",
+    "end interview", "stop interview", "quit interview", "end the interview", "stop the interview"
+)
+
+# matched against the whole answer after removing punctuation, case insensitive,
+# single words that can also be an answer ("pass", "next", "过") are left to the LLM
+GIVEUP_ANSWERS = {
+    "skip", "pass this question", "next question", "skip this question", "i give up", "give up",
+    "i don't know", "i dont know", "don't know", "dont know", "idk", "no idea", "not sure", "no clue",
+    "不会", "不知道", "不清楚", "不了解", "没学过", "没用过", "跳过", "放弃", "下一题", "下一个", "我不会", "我不知道"
+}
+
+# keyboard rows without vowels other than "a", long words typed on one of them are mashing
+KEYBOARD_ROWS = ("asdfghjkl", "zxcvbnm")
+VOWELS = set("aeiouy")
+
+FEEDBACK = {
+    AnswerTriage.GIVEUP: {
+        "Chinese": "好的，我们进入下一题。",
+        "English": "OK, let's move on to the next question."
+    },
+    AnswerTriage.INVALID: {
+        "Chinese": "没有识别到有效的回答，请重新作答。",
+        "English": "Your answer could not be recognized, please answer the question again."
+    }
+}
+
+
+def triage_answer(answer: Optional[str]) -> AnswerTriage:
+    """Classify the user answer before it is sent to the LLM.
+    Args:
+        answer: The user answer.
+
+    Returns:
+        The triage of the answer, NEEDS_LLM unless the answer is clearly a stop, a give-up or invalid.
+    """
+    text = unicodedata.normalize("NFKC", answer or "").strip().lower()
+    if any(phrase in text for phrase in STOP_PHRASES):
+        return AnswerTriage.STOP
+
+    words = re.sub(r"[^\w\s']", " ", text).split()
+    if " ".join(words) in GIVEUP_ANSWERS:
+        return AnswerTriage.GIVEUP
+
+    # punctuation such as "[]" or "=>" may be a valid answer to a code question, plain noise is not
+    if not words and re.fullmatch(r"[\s.,?!。，？！、~～…·*_-]*", text):
+        return AnswerTriage.INVALID
+    if words and all(is_gibberish(word) for word in words):
+        return AnswerTriage.INVALID
+
+    return AnswerTriage.NEEDS_LLM
+
+
+def is_gibberish(word: str) -> bool:
+    """Character statistics of keyboard mashing, e.g. "adfadsfdasf", "xcvbnm", "aaaaaa", "qwrtpsdfg".
+
+    Only latin words of 6+ letters and repeated characters are judged, short words,
+    digits and CJK text are never gibberish so that choices and code survive.
+    """
+    if len(word) >= 4 and len(set(word)) == 1:
+        return True
+    if len(word) < 6 or not word.isascii() or not word.isalpha():
+        return False
+
+    # typed on a single vowel-less keyboard row
+    if any(set(word) <= set(row) for row in KEYBOARD_ROWS):
+        return True
+
+    # a short pattern repeated, e.g. "asdasdasd", "hahahaha"
+    if any(len(word) >= 3 * period and word == (word[:period] * len(word))[:len(word)] for period in (2, 3)):
+        return True
+
+    vowel_ratio = sum(1 for c in word if c in VOWELS) / len(word)
+    longest_consonants = max(len(run) for run in re.split(r"[aeiouy]+", word))
+    return vowel_ratio < 0.1 or longest_consonants >= 6
+
+
+def build_triage_result(triage: AnswerTriage,
+                        question: str,
+                        question_key: Optional[Question],
+                        answer: str,
+                        language: str) -> Optional[QAResult]:
+    """Build the analysis result of a give-up or invalid answer without the LLM.
+    Args:
+        triage: The triage of the answer.
+        question: The current question.
+        question_key: The answer key of the current question if any.
+        answer: The user answer.
+        language: The interview language, used for the feedback.
+
+    Returns:
+        The analysis result, None for the other triages.
+    """
+    if triage not in FEEDBACK:
+        return None
+
+    logger.info(f"Answer triaged as {triage.value}: {answer}")
+    feedback = FEEDBACK[triage].get(language, FEEDBACK[triage]["English"])
+    question_key = question_key or Question(question=question,
+                                            question_number=get_question_number(question),
+                                            question_type=QuestionType.NONE,
+                                            knowledge_point="",
+                                            answer="")
+    giveup = triage == AnswerTriage.GIVEUP
+    return QAResult(
+        question=question_key,
+        answer=Answer(is_valid=giveup,
+                      giveup=giveup,
+                      suggest_more_details=False,
+                      follow_up_question="",
+                      feedback=feedback,
+                      is_correct=False,
+                      analysis="The user skipped the question" if giveup else "The answer is not a valid response",
+                      score=0),
+        is_interview_over=False,
+        summary=f"Q{question_key.question_number} : {question_key.knowledge_point} "
+                f"Answer:{'skipped' if giveup else 'invalid'} Score:0"
+    )
+
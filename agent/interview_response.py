@@ -34,6 +34,11 @@ class QAResult(BaseModel):
     answer: Answer = Field(description="The answer of the question")
     is_interview_over: bool = Field(description="Whether the interview is over")
     summary: str = Field(description="The summary of the question and answer")
+
+
+class GradeAndAskResult(BaseModel):
+    qa_result: QAResult = Field(description="The analysis result of the current answer")
+    next_question: str = Field(description="The next question if the interview moves on, empty if the current question should be repeated or the interview is over")
     
 
 class InterviewResult(BaseModel):
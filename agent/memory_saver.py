@@ -0,0 +1,82 @@
+from typing import List, Sequence
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class InterviewMemorySaver(MemorySaver):
+    """
+    In-process checkpointer with the session housekeeping used by the interview service
+
+    Adds pruning (keep only the latest checkpoint of a thread), thread listing and
+    per-thread size reporting on top of langgraph's MemorySaver. Stored values are
+    already serialized bytes, so the reported size is the real payload held in memory.
+    """
+
+    def list_thread_ids(self) -> List[str]:
+        """List the ids of all threads that have checkpoints"""
+        return [thread_id for thread_id, namespaces in self.storage.items() if namespaces]
+
+    async def alist_thread_ids(self) -> List[str]:
+        """Asynchronous version of list_thread_ids"""
+        return self.list_thread_ids()
+
+    def get_thread_size(self, thread_id: str) -> int:
+        """
+        Get the serialized size of a thread
+
+        Args:
+            thread_id: the thread id
+
+        Returns:
+            int: total bytes of checkpoints, blobs and pending writes of the thread
+        """
+        size = 0
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                size += len(checkpoint[1]) + len(metadata[1])
+        for key, (_, value) in self.blobs.items():
+            if key[0] == thread_id:
+                size += len(value)
+        for key, writes in self.writes.items():
+            if key[0] == thread_id:
+                size += sum(len(value[1]) for _, _, value, _ in writes.values())
+        return size
+
+    async def aget_thread_size(self, thread_id: str) -> int:
+        """Asynchronous version of get_thread_size"""
+        return self.get_thread_size(thread_id)
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """
+        Prune checkpoints of the given threads
+
+        Args:
+            thread_ids: the threads to prune
+            strategy: "keep_latest" keeps only the latest checkpoint per namespace,
+                      "delete" removes the threads entirely
+        """
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+                continue
+
+            kept_blobs = set()
+            for checkpoint_ns, checkpoints in self.storage.get(thread_id, {}).items():
+                if not checkpoints:
+                    continue
+                latest_id = max(checkpoints.keys())
+                for checkpoint_id in [c for c in checkpoints.keys() if c != latest_id]:
+                    del checkpoints[checkpoint_id]
+                    self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+                latest = self.serde.loads_typed(checkpoints[latest_id][0])
+                kept_blobs.update(
+                    (thread_id, checkpoint_ns, channel, version)
+                    for channel, version in latest["channel_versions"].items()
+                )
+
+            for key in [k for k in self.blobs.keys() if k[0] == thread_id and k not in kept_blobs]:
+                del self.blobs[key]
+
+    async def aprune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """Asynchronous version of prune"""
+        return self.prune(thread_ids, strategy=strategy)
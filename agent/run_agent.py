@@ -2,14 +2,14 @@
 from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
 from langgraph.graph import StateGraph
 import uuid
+import asyncio
 from datetime import datetime
 from pydantic import BaseModel, Field
 from workflow import build_graph
 from langgraph.types import Command
-from langgraph.types import StateSnapshot
 
 
-def execute_ai_interview_agent(workflow, inputs: dict):
+async def execute_ai_interview_agent(workflow, inputs: dict):
     config = {
         "configurable": {
             "thread_id": uuid.uuid4(), 
@@ -21,15 +21,10 @@ def execute_ai_interview_agent(workflow, inputs: dict):
     }
 
     # start the interview, generate the first question
-    events = workflow.stream(inputs, config=config, stream_mode="values")
-    for event in events:
-        pass
+    feedback, interrupted = await run_until_interrupt(workflow, inputs, config)
+    while interrupted:
 
-    snapshot: StateSnapshot = workflow.get_state(config)
-    while snapshot.next:        
-        
         # show the question to user
-        feedback = snapshot.values["feedback"]
         print("AI :> " + feedback)
 
         # get the user answer
@@ -38,13 +33,26 @@ def execute_ai_interview_agent(workflow, inputs: dict):
         # resume the interview workflow
         # pass user answer and get the result
         # then generate next question
-        events = workflow.invoke(Command(resume="Go ahead", update={"user_answer": user_input}), config=config)
-        for event in events:
-            pass
+        next_feedback, interrupted = await run_until_interrupt(
+            workflow, Command(resume="Go ahead", update={"user_answer": user_input}), config
+        )
+        feedback = next_feedback or feedback
 
-        # get the snapshot state (next question is in the snapshot)
-        snapshot = workflow.get_state(config)
 
+async def run_until_interrupt(workflow, inputs, config: dict):
+    """Run the workflow until it waits for the user answer or ends, using the updates of the run only
+
+    Returns:
+        The last feedback written by the run (None if no node wrote one), and whether the run was interrupted.
+    """
+    feedback, interrupted = None, False
+    async for update in workflow.astream(inputs, config=config, stream_mode="updates"):
+        for node, values in update.items():
+            if node == "__interrupt__":
+                interrupted = True
+            elif isinstance(values, dict) and values.get("feedback"):
+                feedback = values["feedback"]
+    return feedback, interrupted
 
 
 if __name__ == "__main__":
@@ -60,4 +68,4 @@ if __name__ == "__main__":
         "language": "English",
         "difficulty": "Easy"
     }
-    execute_ai_interview_agent(workflow, inputs)
\ No newline at end of file
+    asyncio.run(execute_ai_interview_agent(workflow, inputs))
\ No newline at end of file
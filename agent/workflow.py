@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from langgraph.graph import StateGraph, END
@@ -8,52 +9,127 @@ from langchain_core.runnables import RunnableConfig
 from langchain_core.prompts import ChatPromptTemplate
 from agent.agent_state import AgentState
 from pydantic import BaseModel, Field   
-from utils.prompt_utils import load_prompt
-from utils.llm import get_model
+from utils.prompt_utils import get_prompt, PromptTemplate
+from utils.llm import get_model, warmup_models
+from utils.llm_policy import llm_deadline
 from agent.interview_response import Question, QAResult, Answer, QuestionType
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
+from agent.memory_saver import InterviewMemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from datetime import datetime   
+from typing import Any, Awaitable, Callable, Dict, Optional
 from agent.qa_analyzer import analyze_question_answer   
 from utils.log_utils import logger
-from agent.agent_state import get_qa_history
-from agent.interview_response import InterviewResult
+from agent.agent_state import get_qa_history, get_pending_qa_history, compact_qa_history, QA_HISTORY_TOKEN_BUDGET
+from agent.interview_response import InterviewResult, GradeAndAskResult
+from agent.agent_state import AnswerMode
+from agent.answer_grader import grade_answer_locally, split_answer_key
+from agent.answer_triage import triage_answer, build_triage_result, AnswerTriage
 
+# nodes processing the user answer, the graph is interrupted before them to wait for the answer
+ANSWER_NODES = ("analyze_answer", "grade_and_ask")
 
-def kickoff_interview(state: AgentState,     
+# called with the final state and the runnable config when the interview is over
+InterviewOverHook = Callable[[Dict[str, Any], RunnableConfig], Awaitable[Any]]
+
+
+async def kickoff_interview(state: AgentState,     
                       config: RunnableConfig):
     
     logger.info("========== Kickoff Interview ==========")
 
-    prompt_content: str = load_prompt('prompts/kickoff_interview.txt')
-    human_prompt: HumanMessage = HumanMessage(content=prompt_content.format(job_title=state["job_title"], 
+    prompt_template: PromptTemplate = get_prompt('prompts/kickoff_interview.txt', state["language"])
+    human_prompt: HumanMessage = HumanMessage(content=prompt_template.format(job_title=state["job_title"], 
                                                               knowledge_points=state["knowledge_points"],
                                                               interview_time=state["interview_time"],
                                                               remaining_time=state["interview_time"],
                                                               language=state["language"],
                                                               difficulty=state["difficulty"],
-                                                              qa_history=get_qa_history(state["qa_history"])))
+                                                              qa_history=get_qa_history(state["qa_history"], state.get("qa_history_digest"))))
 
-    model_name: str = config["configurable"].get("model_name", "gpt-4o")
-    model: ChatOpenAI = get_model(model=model_name)
-    
-    logger.info(f"System : {human_prompt.content}")
-    response = model.invoke([human_prompt])
+    # use the opening question taken from the pre-generated pool
+    if state.get("prepared_question"):
+        logger.info("Use prepared opening question")
+        response: AIMessage = AIMessage(content=state["prepared_question"])
+    else:
+        model_name: str = config["configurable"].get("model_name", "gpt-4o")
+        model: ChatOpenAI = get_model(model=model_name)
+
+        logger.info(f"System : {human_prompt.content}")
+        response = await model.ainvoke([human_prompt])
+
+    # the answer key line is kept in the state only, never shown to the user
+    question, question_key = split_answer_key(response.content)
 
     return {
-        "messages": [human_prompt, response],
-        "question": response.content,
-        "feedback": response.content
+        "messages": [human_prompt, AIMessage(content=question)],
+        "question": question,
+        "feedback": question,
+        "question_key": question_key,
+        "prepared_question": None
     }
 
 
+def get_remaining_time(state: AgentState) -> int:
+    """Get the remaining interview time in minutes"""
+    elapsed_time: int = int((datetime.now() - state["start_time"]).total_seconds() / 60)
+    return (state["interview_time"] - elapsed_time) if elapsed_time < state["interview_time"] else 0
+
+
+def get_remaining_seconds(state: AgentState) -> float:
+    """Get the remaining interview time in seconds, bounds the deadline of the LLM calls of a turn"""
+    return max(0.0, state["interview_time"] * 60 - (datetime.now() - state["start_time"]).total_seconds())
+
+
+def update_qa_history_digest(state: AgentState,
+                             qa_tuple: tuple,
+                             config: RunnableConfig):
+    """Compact the oldest turns once the rendered history exceeds the token budget"""
+    token_budget: int = config["configurable"].get("qa_history_token_budget", QA_HISTORY_TOKEN_BUDGET)
+    return compact_qa_history(state["qa_history"] + [qa_tuple], state.get("qa_history_digest"), token_budget)
+
+
 def is_stop_by_user(user_answer: str) -> bool:
-    return "结束面试" in user_answer or \
-           "End Interview" in user_answer or \
-           "Stop Interview" in user_answer
+    return triage_answer(user_answer) == AnswerTriage.STOP
 
 
-def analyze_answer(state: AgentState,   
+def analyze_answer_without_llm(state: AgentState, answer: str) -> QAResult | None:
+    """Handle give-up, invalid and choice answers locally, None if the answer needs the LLM"""
+    triage = triage_answer(answer)
+    qa_result = build_triage_result(triage, state["question"], state.get("question_key"), answer, state["language"])
+    if qa_result is None:
+        # choice and true/false answers are graded against the answer key
+        qa_result = grade_answer_locally(state.get("question_key"), answer, state["language"])
+    return qa_result
+
+
+def stop_by_user(state: AgentState, answer: str, user_message: str) -> dict:
+    """Build the state update when the user stops the interview"""
+    logger.info(f"Interview is stopped by user answer {answer}")
+    qa_result = QAResult(question=Question( question=state["question"],
+                                            question_number=-1,
+                                            question_type=QuestionType.NONE,
+                                            knowledge_point="",
+                                            answer=""), 
+                         answer=Answer( is_valid=False, 
+                                        feedback="Interview is stopped by user", 
+                                        is_correct=False, 
+                                        analysis="", 
+                                        giveup=False,
+                                        suggest_more_details=False,
+                                        follow_up_question="",
+                                        score=0),
+                         is_interview_over=True,
+                         summary="Last question is not answered due to the interview is stopped by user")
+    return {
+        "messages": [HumanMessage(content=user_message)], 
+        "analyze_answer_response": qa_result,
+        "feedback": qa_result.answer.feedback,
+        "qa_history": [(state["question"], answer, qa_result)]
+    }
+
+
+async def analyze_answer(state: AgentState,   
                    config: RunnableConfig):
 
     logger.info("========== Analyze Answer ==========")
@@ -63,43 +139,127 @@ def analyze_answer(state: AgentState,
     answer: str = state["user_answer"]
     user_message = answer + f"""\n\ntotal {elapsed_time} minutes passed"""
     if is_stop_by_user(answer):
-        logger.info(f"Interview is stopped by user answer {answer}")
-        qa_result = QAResult(question=Question( question=state["question"],
-                                                question_number=-1,
-                                                question_type=QuestionType.NONE,
-                                                knowledge_point="",
-                                                answer=""), 
-                             answer=Answer( is_valid=False, 
-                                            feedback="Interview is stopped by user", 
-                                            is_correct=False, 
-                                            analysis="", 
-                                            giveup=False,
-                                            suggest_more_details=False,
-                                            follow_up_question="",
-                                            score=0),
-                             is_interview_over=True,
-                             summary="Last question is not answered due to the interview is stopped by user")
+        return stop_by_user(state, answer, user_message)
+
+    response: QAResult | None = analyze_answer_without_llm(state, answer)
+
+    # speculative mode: generate the next question while the answer is analyzed
+    speculation: asyncio.Task | None = None
+    if response is None and config["configurable"].get("speculative_next_question", False):
+        pending_history = get_pending_qa_history(state["qa_history"], state["question"], answer, state.get("qa_history_digest"))
+        speculation = asyncio.create_task(generate_next_question(state, config, pending_history))
+
+    if response is None:
+        try:
+            with llm_deadline(get_remaining_seconds(state)):
+                response = await analyze_question_answer(user_message, state["question"], state["language"])
+        except Exception:
+            if speculation:
+                speculation.cancel()
+            raise
+
+    prepared_question = await resolve_speculative_question(speculation, {**state, "analyze_answer_response": response}, config)
+
+    qa_tuple = (state["question"], answer, response)
+
+    return {
+        "end_time": end_time,
+        "messages": [HumanMessage(content=user_message)], 
+        "analyze_answer_response": response,
+        "qa_history": [qa_tuple],
+        "qa_history_digest": update_qa_history_digest(state, qa_tuple, config),
+        "prepared_question": prepared_question
+    }    
+
+
+async def resolve_speculative_question(speculation: asyncio.Task | None,
+                                       state: AgentState,
+                                       config: RunnableConfig) -> str | None:
+    """
+    Commit the speculative question if the answer routes to send_next_question, discard it otherwise
+
+    Args:
+        speculation: the task generating the next question, None if not in speculative mode
+        state: the state including the analysis result of the current answer
+        config: the runnable config
+
+    Returns:
+        str | None: the committed question
+    """
+    if speculation is None:
+        return None
+
+    if check_analyze_answer_response_condition(state, config) != "send_next_question":
+        logger.info("Discard speculative next question")
+        speculation.cancel()
+        return None
+
+    try:
+        return await speculation
+    except Exception as e:
+        # send_next_question will generate the question again
+        logger.error(f"Speculative next question failed: {str(e)}")
+        return None
+
+
+async def grade_and_ask(state: AgentState,
+                        config: RunnableConfig):
+
+    logger.info("========== Grade And Ask ==========")
+
+    end_time = datetime.now()
+    elapsed_time = (end_time - state["start_time"]).total_seconds() / 60
+    answer: str = state["user_answer"]
+    user_message = answer + f"""\n\ntotal {elapsed_time} minutes passed"""
+    if is_stop_by_user(answer):
+        return stop_by_user(state, answer, user_message)
+
+    # a locally analyzed answer leaves only the next question to send_next_question
+    qa_result: QAResult | None = analyze_answer_without_llm(state, answer)
+    if qa_result is not None:
+        qa_tuple = (state["question"], answer, qa_result)
         return {
+            "end_time": end_time,
             "messages": [HumanMessage(content=user_message)], 
             "analyze_answer_response": qa_result,
-            "feedback": qa_result.answer.feedback,
-            "qa_history": [(state["question"], answer, qa_result)]
+            "qa_history": [qa_tuple],
+            "qa_history_digest": update_qa_history_digest(state, qa_tuple, config),
+            "prepared_question": None
         }
 
-    model_name = config["configurable"].get("model_name", "gpt-4o")
-    response: QAResult = analyze_question_answer(user_message, state["question"], state["language"])
+    # one structured call returns both the analysis and the next question
+    model_name: str = config["configurable"].get("model_name", "gpt-4o")
+    model = get_model(model=model_name, output_schema=GradeAndAskResult)
 
-    qa_tuple = (state["question"], answer, response)
+    prompt_template: PromptTemplate = get_prompt('prompts/grade_and_ask.txt', state["language"])
+    human_prompt: HumanMessage = HumanMessage(content=prompt_template.format(job_title=state["job_title"], 
+                                                              knowledge_points=state["knowledge_points"],
+                                                              interview_time=state["interview_time"],
+                                                              remaining_time=get_remaining_time(state),
+                                                              language=state["language"],
+                                                              difficulty=state["difficulty"],
+                                                              qa_history=get_qa_history(state["qa_history"], state.get("qa_history_digest")),
+                                                              question=state["question"],
+                                                              answer=user_message))
+
+    logger.info(f"System : {human_prompt.content}")
+    with llm_deadline(get_remaining_seconds(state)):
+        response: GradeAndAskResult = await model.ainvoke([human_prompt])
+    logger.info(f"Grade And Ask Result : {response.model_dump_json(indent=2)}")
+
+    qa_tuple = (state["question"], answer, response.qa_result)
 
     return {
         "end_time": end_time,
         "messages": [HumanMessage(content=user_message)], 
-        "analyze_answer_response": response,
-        "qa_history": [qa_tuple]
-    }    
+        "analyze_answer_response": response.qa_result,
+        "qa_history": [qa_tuple],
+        "qa_history_digest": update_qa_history_digest(state, qa_tuple, config),
+        "prepared_question": response.next_question or None
+    }
 
 
-def repeat_question(state: AgentState,
+async def repeat_question(state: AgentState,
                     config: RunnableConfig):
     
     logger.info("========== Repeat Question ==========")  
@@ -120,65 +280,146 @@ def repeat_question(state: AgentState,
         "messages": [ai_response],
         "feedback": feedback,
         "analyze_answer_response": None,
+        "prepared_question": None,
     }
 
 
-def send_next_question(state: AgentState,
-                      config: RunnableConfig):
+async def generate_next_question(state: AgentState,
+                                 config: RunnableConfig,
+                                 qa_history: str) -> str:
+    """
+    Generate the next question with the kickoff prompt
 
-    logger.info("========== Send Next Question ==========")
+    Args:
+        state: the current state
+        config: the runnable config
+        qa_history: the rendered question & answer history used by the prompt
 
+    Returns:
+        str: the next question
+    """
     model_name: str = config["configurable"].get("model_name", "gpt-4o")
     model: ChatOpenAI = get_model(model=model_name)
     
-    prompt_content: str = load_prompt('prompts/kickoff_interview.txt')
-    elapsed_time: int = int((datetime.now() - state["start_time"]).total_seconds() / 60)
-    remaining_time: int = (state["interview_time"] - elapsed_time) if elapsed_time < state["interview_time"] else 0
-    human_prompt: HumanMessage = HumanMessage(content=prompt_content.format(job_title=state["job_title"], 
+    prompt_template: PromptTemplate = get_prompt('prompts/kickoff_interview.txt', state["language"])
+    remaining_time: int = get_remaining_time(state)
+    human_prompt: HumanMessage = HumanMessage(content=prompt_template.format(job_title=state["job_title"], 
                                                               knowledge_points=state["knowledge_points"],
                                                               interview_time=state["interview_time"],
                                                               remaining_time=remaining_time,
                                                               language=state["language"],
                                                               difficulty=state["difficulty"],
-                                                              qa_history=get_qa_history(state["qa_history"])))
+                                                              qa_history=qa_history))
 
     logger.info(f"System : {human_prompt.content}")
-    response = model.invoke([human_prompt])
+    with llm_deadline(get_remaining_seconds(state)):
+        response = await model.ainvoke([human_prompt])
+    return response.content
+
+
+async def send_next_question(state: AgentState,
+                      config: RunnableConfig):
+
+    logger.info("========== Send Next Question ==========")
+
+    # use the question prepared while the answer was analyzed
+    question: str | None = state.get("prepared_question")
+    if question:
+        logger.info("Use prepared next question")
+    else:
+        question = await generate_next_question(state, config, get_qa_history(state["qa_history"], state.get("qa_history_digest")))
+    question, question_key = split_answer_key(question)
 
     qa_result: QAResult = state["analyze_answer_response"]
     ai_analysis = "User answer analysis:\n\n" + qa_result.answer.model_dump_json(indent=2) + "\n\n"
-    ai_message = AIMessage(content=ai_analysis + "Next question:\n\n" + response.content)
+    ai_message = AIMessage(content=ai_analysis + "Next question:\n\n" + question)
 
     return {
         "messages": [ai_message],
-        "question": response.content,
-        "feedback": response.content,
+        "question": question,
+        "feedback": question,
+        "question_key": question_key,
         "user_answer": None,
         "analyze_answer_response": None,
+        "prepared_question": None,
     }
 
 
-def summarize_interview(state: AgentState,
+async def summarize_interview(state: AgentState,
                         config: RunnableConfig):
     logger.info("========== Summarize Interview ==========")
 
-    prompt_content: str = load_prompt('prompts/summarize_interview.txt')
-    human_prompt: HumanMessage = HumanMessage(content=prompt_content.format(job_title=state["job_title"], 
+    # deferred mode: score locally, the narrative summary is generated in the background
+    if config["configurable"].get("deferred_summary", False):
+        interview_result = compute_interview_result(state)
+        logger.info(f"Provisional Interview Result : {interview_result.model_dump_json(indent=2)}")
+        return {
+            "interview_result": interview_result,
+            "summary_pending": True
+        }
+
+    return {
+        "interview_result": await generate_interview_summary(state, config)
+    }
+
+
+async def generate_interview_summary(state: AgentState,
+                                     config: RunnableConfig) -> InterviewResult:
+    """
+    Summarize the interview with the LLM
+
+    Args:
+        state: the state of the finished interview
+        config: the runnable config
+
+    Returns:
+        InterviewResult: the interview result including the narrative summary
+    """
+    prompt_template: PromptTemplate = get_prompt('prompts/summarize_interview.txt', state["language"])
+    human_prompt: HumanMessage = HumanMessage(content=prompt_template.format(job_title=state["job_title"], 
                                                               knowledge_points=state["knowledge_points"],
                                                               interview_time=state["interview_time"],
                                                               language=state["language"],
-                                                              qa_history=get_qa_history(state["qa_history"])))
+                                                              qa_history=get_qa_history(state["qa_history"], state.get("qa_history_digest"))))
 
     model_name: str = config["configurable"].get("model_name", "gpt-4o")
-    model: ChatOpenAI = get_model(model=model_name).with_structured_output(InterviewResult)
+    model = get_model(model=model_name, output_schema=InterviewResult)
     
     logger.info(f"System : {human_prompt.content}")
-    response: InterviewResult = model.invoke([human_prompt])
+    response: InterviewResult = await model.ainvoke([human_prompt])
     logger.info(f"Interview Result : {response.model_dump_json(indent=2)}")
+    return response
 
-    return {
-        "interview_result": response
-    }
+
+def compute_interview_result(state: AgentState) -> InterviewResult:
+    """
+    Compute the interview result from the analyzed answers without the LLM
+
+    Repeated questions (invalid answers, follow-ups) are counted once with their last answer,
+    the score (0-10) is the average answer score (0-5) scaled up.
+
+    Args:
+        state: the state of the finished interview
+
+    Returns:
+        InterviewResult: the provisional result, the summary is filled in later
+    """
+    answers: dict = {}
+    for question, _, qa_result in state["qa_history"]:
+        # skip invalid answers and the entry written when the user stops the interview
+        if qa_result.answer.is_valid or qa_result.answer.giveup:
+            answers[question] = qa_result
+
+    total = len(answers)
+    correct = sum(1 for qa_result in answers.values() if qa_result.answer.is_correct)
+    score = round(sum(qa_result.answer.score for qa_result in answers.values()) * 10 / (5 * total)) if total else 0
+    elapsed_time = int((state.get("end_time", datetime.now()) - state["start_time"]).total_seconds() / 60)
+
+    return InterviewResult(summary="",
+                           total_question_number=total,
+                           correct_question_number=correct,
+                           score=score,
+                           interview_time=elapsed_time)
 
 
 def is_over_condition(state: AgentState,
@@ -189,7 +430,15 @@ def is_over_condition(state: AgentState,
         logger.info(f"Interview is over: {question}")
         return "summarize_interview"
     else:
-        return "analyze_answer"
+        return select_answer_node(state, config)
+
+
+def select_answer_node(state: AgentState,
+                       config: RunnableConfig):
+    """Select the node processing the next user answer according to the answer mode"""
+    if state.get("answer_mode") == AnswerMode.GRADE_AND_ASK:
+        return "grade_and_ask"
+    return "analyze_answer"
 
 
 def check_analyze_answer_response_condition(state: AgentState,
@@ -197,6 +446,9 @@ def check_analyze_answer_response_condition(state: AgentState,
     
     logger.info("========== Check Analysis Response Condition ==========")
 
+    if is_stale_answer(state):
+        return select_answer_node(state, config)
+
     qa_result: QAResult = state["analyze_answer_response"]
 
     if qa_result is None:
@@ -219,44 +471,120 @@ def check_analyze_answer_response_condition(state: AgentState,
     return "send_next_question"
 
 
-def build_graph():
+def warmup_workflow_models(model_name: str = "gpt-4o"):
+    """
+    Create the models used by the workflow nodes in advance
+
+    Args:
+        model_name: the model name used by the nodes
+    """
+    logger.info(f"Warming up workflow models: {model_name}")
+    warmup_models([
+        {"model": model_name},
+        {"model": model_name, "output_schema": QAResult},
+        {"model": model_name, "output_schema": InterviewResult},
+        {"model": model_name, "output_schema": GradeAndAskResult}
+    ])
+
+
+def is_stale_answer(state: AgentState) -> bool:
+    """Whether the answer replies to another question than the one waiting for an answer"""
+    pending = state.get("question_id")
+    answered = state.get("answered_question_id")
+    # threads created before question_id was stored and callers without ids are not checked
+    return pending is not None and answered is not None and answered != pending
+
+
+def with_question_check(node: Callable) -> Callable:
+    """
+    Wrap an answer node so that it only accepts the answer to the question waiting for it
+
+    The check runs on the state the graph already loaded for the run. A stale answer leaves the
+    interview unchanged and is routed back to the answer node, an accepted answer moves question_id
+    to the next_question_id sent with it
+    """
+    async def answer_node(state: AgentState, config: RunnableConfig):
+        if is_stale_answer(state):
+            logger.info(f"Reject answer to {state['answered_question_id']}, waiting for {state['question_id']}")
+            return {}
+        update = await node(state, config)
+        if state.get("next_question_id") is not None:
+            update = {**update, "question_id": state["next_question_id"],
+                      "answered_question_id": None, "next_question_id": None}
+        return update
+
+    return answer_node
+
+
+def with_interview_over_hook(node: Callable, on_interview_over: InterviewOverHook) -> Callable:
+    """Wrap the summarize node so that the hook runs in the same step that ends the interview"""
+    async def summarize_interview_node(state: AgentState, config: RunnableConfig):
+        update = await node(state, config)
+        await on_interview_over({**state, **update}, config)
+        return update
+
+    return summarize_interview_node
+
+
+def build_graph(checkpointer: BaseCheckpointSaver | None = None,
+                on_interview_over: Optional[InterviewOverHook] = None):
+    """
+    Build the interview workflow graph
+
+    Args:
+        checkpointer: checkpoint saver used to persist interview threads,
+                      defaults to an in-process InterviewMemorySaver
+        on_interview_over: awaited inside summarize_interview with the final state, before the
+                           final checkpoint is written. If it fails the node fails and is run again
+                           when the thread is resumed, so the hook must be idempotent
+
+    Returns:
+        The compiled workflow graph
+    """
     logger.info("Building interview workflow graph")
 
     workflow = StateGraph(AgentState)
 
     workflow.add_node("kickoff_interview", kickoff_interview)
-    workflow.add_node("analyze_answer", analyze_answer)
+    workflow.add_node("analyze_answer", with_question_check(analyze_answer))
+    workflow.add_node("grade_and_ask", with_question_check(grade_and_ask))
     workflow.add_node("repeat_question", repeat_question)
     workflow.add_node("send_next_question", send_next_question)
-    workflow.add_node("summarize_interview", summarize_interview)
+    workflow.add_node("summarize_interview", with_interview_over_hook(summarize_interview, on_interview_over)
+                      if on_interview_over else summarize_interview)
 
     workflow.set_entry_point("kickoff_interview")
 
-    workflow.add_edge("kickoff_interview", "analyze_answer")
-    workflow.add_conditional_edges(
-        "analyze_answer",
-        check_analyze_answer_response_condition,
-        {
-            "summarize_interview": "summarize_interview",
-            "repeat_question": "repeat_question",
-            "send_next_question": "send_next_question"
-        },
-    )
-
-    workflow.add_edge("repeat_question", "analyze_answer")
+    answer_nodes = {node: node for node in ANSWER_NODES}
+    workflow.add_conditional_edges("kickoff_interview", select_answer_node, answer_nodes)
+    for answer_node in ANSWER_NODES:
+        workflow.add_conditional_edges(
+            answer_node,
+            check_analyze_answer_response_condition,
+            {
+                "summarize_interview": "summarize_interview",
+                "repeat_question": "repeat_question",
+                "send_next_question": "send_next_question",
+                # a stale answer waits for the answer again
+                **answer_nodes
+            },
+        )
+
+    workflow.add_conditional_edges("repeat_question", select_answer_node, answer_nodes)
     workflow.add_conditional_edges(
         "send_next_question",
         is_over_condition,
         {
             "summarize_interview": "summarize_interview",
-            "analyze_answer": "analyze_answer"
+            **answer_nodes
         },
     )
     workflow.add_edge("summarize_interview", END)
 
-    memory = MemorySaver()
-    graph = workflow.compile(checkpointer=memory,
-                             interrupt_before=["analyze_answer"])
+    if checkpointer is None:
+        checkpointer = InterviewMemorySaver()
+    graph = workflow.compile(checkpointer=checkpointer,
+                             interrupt_before=list(ANSWER_NODES))
      
     return graph
 
@@ -271,18 +599,21 @@ def generate_workflow_mermaid() -> str:
     mermaid_diagram = """
     graph TD
         START[开始] --> A[kickoff_interview]
-        A --> B[analyze_answer]
+        A -->|select_answer_node| S{回答模式}
+        S -->|two_step| B[analyze_answer]
+        S -->|grade_and_ask| H[grade_and_ask]
         
         B -->|check_analyze_answer_response| C{条件判断}
+        H -->|check_analyze_answer_response| C
         C -->|需要重复问题| D[repeat_question]
         C -->|继续下一问题| E[send_next_question]
         C -->|面试结束| F[summarize_interview]
         
-        D --> B
+        D --> S
         
         E -->|is_over_condition| G{是否结束}
         G -->|是| F
-        G -->|否| B
+        G -->|否| S
         
         F --> END[结束]
         
@@ -290,6 +621,7 @@ def generate_workflow_mermaid() -> str:
         style END fill:#f96,stroke:#333,stroke-width:2px
         style C fill:#bbf,stroke:#333,stroke-width:2px
         style G fill:#bbf,stroke:#333,stroke-width:2px
+        style S fill:#bbf,stroke:#333,stroke-width:2px
     """
     return mermaid_diagram.strip()
 
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, List
 from omegaconf import DictConfig
 import hydra
 
@@ -15,12 +15,30 @@ class ServerConfig:
     port: int
     reload: bool
 
+@dataclass
+class HttpLoggingConfig:
+    sample_rate: float
+    max_body_bytes: int
+    exclude_paths: List[str]
+
+@dataclass
+class CallLoggingConfig:
+    level: str
+    sample_rate: float
+    max_repr_length: int
+
 @dataclass
 class LoggingConfig:
     level: str
-    format: str
     file: str
+    console: bool
     rotation: str
+    retention: int
+    compression: str
+    queue_size: int
+    batch_size: int
+    http: HttpLoggingConfig
+    calls: CallLoggingConfig
 
 @dataclass
 class CorsConfig:
@@ -29,12 +47,73 @@ class CorsConfig:
     allow_methods: List[str]
     allow_headers: List[str]
 
+@dataclass
+class MongoDBConfig:
+    host: str
+    port: int
+    database: str
+    username: str
+    password: str
+    authentication_source: str
+    repository_backend: str
+    max_pool_size: int
+    min_pool_size: int
+
+@dataclass
+class CheckpointerConfig:
+    backend: str
+    checkpoint_collection: str
+    writes_collection: str
+
+@dataclass
+class SessionConfig:
+    idle_ttl_minutes: int
+    finished_ttl_minutes: int
+    sweep_interval_seconds: int
+
+@dataclass
+class QuestionPoolConfig:
+    enabled: bool
+    depth: int
+    refill_threshold: int
+    refill_interval_seconds: int
+    max_configurations: int
+
+@dataclass
+class OutboxConfig:
+    batch_size: int
+    poll_interval_seconds: float
+    lease_seconds: int
+    max_attempts: int
+    retry_backoff_seconds: int
+
+@dataclass
+class LLMLimitsConfig:
+    default: Dict[str, Any]
+    models: Dict[str, Dict[str, Any]]
+
+@dataclass
+class WorkflowConfig:
+    speculative_next_question: bool
+    answer_mode: str
+    qa_history_token_budget: int
+    deferred_summary: bool
+    duplicate_result_ttl_seconds: float
+    llm_policies: Dict[str, Dict[str, Any]]
+
 @dataclass
 class Config:
     app: AppConfig
     server: ServerConfig
     logging: LoggingConfig
     cors: CorsConfig
+    mongodb: MongoDBConfig
+    checkpointer: CheckpointerConfig
+    session: SessionConfig
+    question_pool: QuestionPoolConfig
+    outbox: OutboxConfig
+    llm_limits: LLMLimitsConfig
+    workflow: WorkflowConfig
 
     @classmethod
     def load_config(cls) -> 'Config':
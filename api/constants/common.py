@@ -58,6 +58,27 @@ class TestStatus(str, Enum):
     def choices(cls):
         return [member.value for member in cls] 
 
+class SummaryStatus(str, Enum):
+    """Status of the interview summary in the test result"""
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    
+    @classmethod
+    def choices(cls):
+        return [member.value for member in cls]
+
+class OutboxStatus(str, Enum):
+    """Status of the interview completion outbox events"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    
+    @classmethod
+    def choices(cls):
+        return [member.value for member in cls]
+
 class QuestionType(str, Enum):
     """Types of questions available in the system"""
     MULTIPLE_CHOICE = "multiple_choice"
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from api.conf.config import Config
+from api.repositories.async_mongo import (
+    AsyncJobRepository,
+    AsyncQuestionRepository,
+    AsyncTestRepository,
+    AsyncTestResultRepository,
+    AsyncUserRepository
+)
+from api.repositories.job_repository import JobRepository
+from api.repositories.question_repository import QuestionRepository
+from api.repositories.test_repository import TestRepository
+from api.repositories.test_result_repository import TestResultRepository
+from api.repositories.user_repository import UserRepository
+from api.service.chat import ChatService
+from api.service.job import JobService
+from api.service.question import QuestionService
+from api.service.test import TestService
+from api.service.test_result import TestResultService
+from api.service.user import UserService
+
+# 应用级的仓储与服务实例：首次使用（或启动时 init_services）创建一次，之后所有请求共享，
+# 路由通过 Depends(get_xxx_service) 获取，测试可以用 app.dependency_overrides 替换
+
+
+@lru_cache
+def use_async_repositories() -> bool:
+    """mongodb.repository_backend 为 async 时使用基于 AsyncMongoClient 的仓储"""
+    return Config.load_config().mongodb.repository_backend == "async"
+
+
+@lru_cache
+def get_test_repository() -> TestRepository | AsyncTestRepository:
+    return AsyncTestRepository() if use_async_repositories() else TestRepository()
+
+
+@lru_cache
+def get_test_result_repository() -> TestResultRepository | AsyncTestResultRepository:
+    return AsyncTestResultRepository() if use_async_repositories() else TestResultRepository()
+
+
+@lru_cache
+def get_user_repository() -> UserRepository | AsyncUserRepository:
+    return AsyncUserRepository() if use_async_repositories() else UserRepository()
+
+
+@lru_cache
+def get_job_repository() -> JobRepository | AsyncJobRepository:
+    return AsyncJobRepository() if use_async_repositories() else JobRepository()
+
+
+@lru_cache
+def get_question_repository() -> QuestionRepository | AsyncQuestionRepository:
+    return AsyncQuestionRepository() if use_async_repositories() else QuestionRepository()
+
+
+@lru_cache
+def get_test_service() -> TestService:
+    return TestService(
+        repository=get_test_repository(),
+        job_repository=get_job_repository(),
+        user_repository=get_user_repository(),
+        question_repository=get_question_repository()
+    )
+
+
+@lru_cache
+def get_test_result_service() -> TestResultService:
+    return TestResultService(
+        repository=get_test_result_repository(),
+        test_repository=get_test_repository(),
+        user_repository=get_user_repository()
+    )
+
+
+@lru_cache
+def get_user_service() -> UserService:
+    return UserService(repository=get_user_repository())
+
+
+@lru_cache
+def get_job_service() -> JobService:
+    return JobService(repository=get_job_repository())
+
+
+@lru_cache
+def get_question_service() -> QuestionService:
+    return QuestionService(repository=get_question_repository())
+
+
+@lru_cache
+def get_chat_service() -> ChatService:
+    return ChatService(test_service=get_test_service(), test_result_service=get_test_result_service())
+
+
+def init_services() -> None:
+    """启动时创建全部服务实例，请求路径上不再创建对象或查找集合"""
+    if use_async_repositories():
+        # 异步仓储不经过 MongoEngine 的集合初始化，启动时创建索引（含唯一索引）
+        for repository in (get_test_repository(), get_test_result_repository(), get_user_repository(),
+                           get_job_repository(), get_question_repository()):
+            repository.document.ensure_indexes()
+    for provider in (get_test_service, get_test_result_service, get_user_service, get_job_service,
+                     get_question_service, get_chat_service):
+        provider()
@@ -0,0 +1,36 @@
+from typing import Optional
+from loguru import logger
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from api.conf.config import Config
+
+_client: Optional[AsyncMongoClient] = None
+_database: Optional[AsyncDatabase] = None
+
+
+def get_async_database() -> AsyncDatabase:
+    """获取异步 MongoDB 数据库，进程内共享同一个带连接池的客户端"""
+    global _client, _database
+    if _database is None:
+        config = Config.load_config()
+        _client = AsyncMongoClient(
+            host=config.mongodb.host,
+            port=config.mongodb.port,
+            username=config.mongodb.username or None,
+            password=config.mongodb.password or None,
+            authSource=config.mongodb.authentication_source,
+            maxPoolSize=config.mongodb.max_pool_size,
+            minPoolSize=config.mongodb.min_pool_size
+        )
+        _database = _client[config.mongodb.database]
+        logger.info(f"Created async MongoDB client: {config.mongodb.host}:{config.mongodb.port}/{config.mongodb.database}")
+    return _database
+
+
+async def close_async_client() -> None:
+    """关闭异步 MongoDB 客户端及其连接池"""
+    global _client, _database
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _database = None
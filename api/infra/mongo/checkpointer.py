@@ -0,0 +1,399 @@
+import asyncio
+from datetime import datetime, UTC
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bson.binary import Binary
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from loguru import logger
+from mongoengine.connection import get_db
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.database import Database
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer backed by the application's MongoDB database
+
+    Each checkpoint is stored as one document whose payload is serialized with the
+    graph serializer (msgpack) into a BSON binary field. Pending writes are kept in
+    a separate collection. Both collections are indexed by thread_id first, so the
+    latest checkpoint of a thread is a single indexed lookup.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Database] = None,
+        checkpoint_collection: str = "ai_checkpoint",
+        writes_collection: str = "ai_checkpoint_write",
+        **kwargs: Any
+    ):
+        """
+        Args:
+            db: MongoDB database, defaults to the mongoengine default connection
+            checkpoint_collection: collection name for checkpoints
+            writes_collection: collection name for pending writes
+        """
+        super().__init__(**kwargs)
+        self._db = db
+        self.checkpoint_collection_name = checkpoint_collection
+        self.writes_collection_name = writes_collection
+        self._indexes_ready = False
+
+    @property
+    def db(self) -> Database:
+        # resolve the connection lazily so that the saver can be created before init_mongodb()
+        if self._db is None:
+            self._db = get_db()
+        return self._db
+
+    @property
+    def checkpoints(self):
+        self.ensure_indexes()
+        return self.db[self.checkpoint_collection_name]
+
+    @property
+    def writes(self):
+        self.ensure_indexes()
+        return self.db[self.writes_collection_name]
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes used by the saver (idempotent)"""
+        if self._indexes_ready:
+            return
+        self.db[self.checkpoint_collection_name].create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", DESCENDING)],
+            unique=True
+        )
+        self.db[self.writes_collection_name].create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", ASCENDING),
+             ("task_id", ASCENDING), ("idx", ASCENDING)],
+            unique=True
+        )
+        self._indexes_ready = True
+        logger.info(f"Checkpoint indexes ensured: {self.checkpoint_collection_name}, {self.writes_collection_name}")
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint tuple, the latest one of the thread if no checkpoint_id is given
+
+        Args:
+            config: config containing thread_id and optional checkpoint_ns / checkpoint_id
+
+        Returns:
+            Optional[CheckpointTuple]: the checkpoint tuple, None if not found
+        """
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        query: Dict[str, Any] = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+
+        doc = self.checkpoints.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        if doc is None:
+            return None
+        return self._to_checkpoint_tuple(doc)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first
+
+        Args:
+            config: config used to filter by thread_id / checkpoint_ns / checkpoint_id
+            filter: metadata key-value pairs the checkpoints must match
+            before: only list checkpoints created before this config's checkpoint
+            limit: maximum number of checkpoints to return
+
+        Yields:
+            CheckpointTuple: matching checkpoint tuples
+        """
+        query: Dict[str, Any] = {}
+        checkpoint_id_query: Dict[str, Any] = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query["checkpoint_ns"] = checkpoint_ns
+            if checkpoint_id := get_checkpoint_id(config):
+                checkpoint_id_query["$eq"] = checkpoint_id
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            checkpoint_id_query["$lt"] = before_checkpoint_id
+        if checkpoint_id_query:
+            query["checkpoint_id"] = checkpoint_id_query
+
+        cursor = self.checkpoints.find(query).sort("checkpoint_id", DESCENDING)
+        remaining = limit
+        for doc in cursor:
+            if remaining is not None and remaining <= 0:
+                break
+            checkpoint_tuple = self._to_checkpoint_tuple(doc)
+            if filter and not all(
+                checkpoint_tuple.metadata.get(key) == value for key, value in filter.items()
+            ):
+                continue
+            if remaining is not None:
+                remaining -= 1
+            yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint
+
+        Args:
+            config: config of the parent checkpoint
+            checkpoint: the checkpoint to save
+            metadata: metadata of the checkpoint
+            new_versions: channel versions written by this step
+
+        Returns:
+            RunnableConfig: config pointing to the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        self.checkpoints.update_one(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]},
+            {"$set": {
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "type": type_,
+                "checkpoint": Binary(serialized_checkpoint),
+                "metadata_type": metadata_type,
+                "metadata": Binary(serialized_metadata),
+                "update_date": datetime.now(UTC)
+            }},
+            upsert=True
+        )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"]
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """
+        Save the pending writes of a task
+
+        Args:
+            config: config of the checkpoint the writes belong to
+            writes: (channel, value) pairs
+            task_id: id of the task producing the writes
+            task_path: path of the task producing the writes
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, serialized_value = self.serde.dumps_typed(value)
+            key = {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+                "task_id": task_id,
+                "idx": write_idx
+            }
+            fields = {
+                "channel": channel,
+                "type": type_,
+                "value": Binary(serialized_value),
+                "task_path": task_path
+            }
+            # special writes (errors, interrupts...) overwrite, regular writes are kept once
+            if write_idx < 0:
+                operations.append(UpdateOne(key, {"$set": fields}, upsert=True))
+            else:
+                operations.append(UpdateOne(key, {"$setOnInsert": fields}, upsert=True))
+
+        if operations:
+            self.writes.bulk_write(operations, ordered=False)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete all checkpoints and writes of a thread
+
+        Args:
+            thread_id: the thread to delete
+        """
+        self.checkpoints.delete_many({"thread_id": thread_id})
+        self.writes.delete_many({"thread_id": thread_id})
+
+    def list_thread_ids(self) -> List[str]:
+        """List the ids of all threads that have checkpoints"""
+        return self.checkpoints.distinct("thread_id")
+
+    def get_thread_size(self, thread_id: str) -> int:
+        """
+        Get the stored size of a thread
+
+        Args:
+            thread_id: the thread id
+
+        Returns:
+            int: total BSON bytes of the thread's checkpoints and pending writes
+        """
+        size = 0
+        for collection in (self.checkpoints, self.writes):
+            result = list(collection.aggregate([
+                {"$match": {"thread_id": thread_id}},
+                {"$group": {"_id": None, "size": {"$sum": {"$bsonSize": "$$ROOT"}}}}
+            ]))
+            if result:
+                size += result[0]["size"]
+        return size
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """
+        Prune checkpoints of the given threads
+
+        Args:
+            thread_ids: the threads to prune
+            strategy: "keep_latest" keeps only the latest checkpoint per namespace,
+                      "delete" removes the threads entirely
+        """
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+                continue
+
+            for checkpoint_ns in self.checkpoints.distinct("checkpoint_ns", {"thread_id": thread_id}):
+                latest = self.checkpoints.find_one(
+                    {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns},
+                    sort=[("checkpoint_id", DESCENDING)],
+                    projection={"checkpoint_id": 1}
+                )
+                if latest is None:
+                    continue
+                stale = {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": {"$lt": latest["checkpoint_id"]}
+                }
+                self.checkpoints.delete_many(stale)
+                self.writes.delete_many(stale)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Asynchronous version of get_tuple, runs the query in a worker thread"""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronous version of list, runs the query in a worker thread"""
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Asynchronous version of put, runs the write in a worker thread"""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Asynchronous version of put_writes, runs the write in a worker thread"""
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Asynchronous version of delete_thread, runs the delete in a worker thread"""
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def alist_thread_ids(self) -> List[str]:
+        """Asynchronous version of list_thread_ids, runs the query in a worker thread"""
+        return await asyncio.to_thread(self.list_thread_ids)
+
+    async def aget_thread_size(self, thread_id: str) -> int:
+        """Asynchronous version of get_thread_size, runs the query in a worker thread"""
+        return await asyncio.to_thread(self.get_thread_size, thread_id)
+
+    async def aprune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """Asynchronous version of prune, runs the deletes in a worker thread"""
+        return await asyncio.to_thread(self.prune, thread_ids, strategy=strategy)
+
+    def _to_checkpoint_tuple(self, doc: Dict[str, Any]) -> CheckpointTuple:
+        """Build a CheckpointTuple from a checkpoint document and its pending writes"""
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        checkpoint_id = doc["checkpoint_id"]
+
+        write_docs = self.writes.find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+        ).sort([("task_id", ASCENDING), ("idx", ASCENDING)])
+        pending_writes = [
+            (w["task_id"], w["channel"], self.serde.loads_typed((w["type"], bytes(w["value"]))))
+            for w in write_docs
+        ]
+
+        parent_checkpoint_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id
+                }
+            },
+            checkpoint=self.serde.loads_typed((doc["type"], bytes(doc["checkpoint"]))),
+            metadata=self.serde.loads_typed((doc["metadata_type"], bytes(doc["metadata"]))),
+            pending_writes=pending_writes,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            )
+        )
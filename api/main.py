@@ -8,41 +8,94 @@ config = Config.load_config()
 init_mongodb()
 
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from omegaconf import OmegaConf
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
-from loguru import logger
 import uvicorn
 
 from api.middleware.logging import LoggingMiddleware
+from api.utils.log_decorator import log_settings
 from api.middleware.error_handler import (
     api_error_handler,
     http_exception_handler,
     validation_exception_handler,
     generic_exception_handler
 )
-from api.router import health, test, user, job, question, chat, test_result
+from api.router import health, metrics, test, user, job, question, chat, test_result
 from api.exceptions.api_error import APIError
+from api.dependencies import init_services, get_chat_service
+from agent.workflow import warmup_workflow_models
+from utils.llm import close_clients
+from utils.llm_governor import llm_governor
+from api.infra.mongo.async_client import close_async_client
+from utils.log_utils import configure_json_logging
+from utils.prompt_utils import prompt_registry
 
 
 
-# Configure logging
-logger.add(
+# Configure logging, a single JSON sink written by a background thread
+configure_json_logging(
     config.logging.file,
     level=config.logging.level,
-    format=config.logging.format,
-    rotation=config.logging.rotation
+    console=config.logging.console,
+    rotation=config.logging.rotation,
+    retention=config.logging.retention,
+    compression=config.logging.compression,
+    queue_size=config.logging.queue_size,
+    batch_size=config.logging.batch_size
 )
+log_settings.level = config.logging.calls.level
+log_settings.sample_rate = config.logging.calls.sample_rate
+log_settings.max_repr_length = config.logging.calls.max_repr_length
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """创建应用级的服务并启动后台任务，应用关闭时依次停止并释放连接"""
+    # 创建应用级的服务实例，请求通过依赖注入共享
+    init_services()
+    chat_service = get_chat_service()
+    # 启动面试会话的后台清理任务
+    chat_service.session_manager.start()
+    # 启动开场问题池的后台补充任务
+    chat_service.question_pool.start()
+    # 启动面试完成事件的 dispatcher
+    chat_service.completion_outbox.start()
+    # LLM 调用的并发及速率限制
+    llm_governor.configure(**OmegaConf.to_container(config.llm_limits, resolve=True))
+    # 预先创建 LLM 客户端及连接池
+    warmup_workflow_models()
+    # 预先加载并编译全部 prompt 模板
+    prompt_registry.load_all()
+
+    yield
+
+    await chat_service.session_manager.stop()
+    await chat_service.question_pool.stop()
+    await chat_service.completion_outbox.stop()
+    await chat_service.summary_service.stop()
+    await close_clients()
+    await close_async_client()
+
 
 app = FastAPI(
     title=config.app.name,
+    lifespan=lifespan,
     openapi_url=f"{config.app.api_v1_str}/openapi.yaml",
     docs_url=f"{config.app.api_v1_str}/doc",
 )
 
 # Add middleware
-app.add_middleware(LoggingMiddleware)
+app.add_middleware(
+    LoggingMiddleware,
+    sample_rate=config.logging.http.sample_rate,
+    max_body_bytes=config.logging.http.max_body_bytes,
+    exclude_paths=list(config.logging.http.exclude_paths)
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.cors.allow_origins,
@@ -59,6 +112,7 @@ app.add_exception_handler(Exception, generic_exception_handler)
 
 # Register routers
 app.include_router(health.router, prefix=config.app.api_v1_str)
+app.include_router(metrics.router, prefix=config.app.api_v1_str)
 app.include_router(test.router, prefix=config.app.api_v1_str)
 app.include_router(user.router, prefix=config.app.api_v1_str)
 app.include_router(job.router, prefix=config.app.api_v1_str)
@@ -66,14 +120,6 @@ app.include_router(question.router, prefix=config.app.api_v1_str)
 app.include_router(chat.router, prefix=config.app.api_v1_str)
 app.include_router(test_result.router, prefix=config.app.api_v1_str)
 
-#def shutdown_event():
-#    MongoConnection.close_client()
-
-# 在 FastAPI 应用中注册 shutdown 事件
-@app.on_event("shutdown")
-def shutdown():
-    shutdown_event()
-
 # Run the API server
 # uvicorn api.main:app --reload
 if __name__ == "__main__":
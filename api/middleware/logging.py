@@ -1,62 +1,101 @@
+import random
 import time
-import json
-from fastapi import Request
+from typing import Any, Dict, List, Sequence
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from fastapi.responses import JSONResponse
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        body = await self._get_request_body(request)
-        logger.info(f"Request: {request.method} {request.url}\nBody: {body}")
-        
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _decode(chunks: List[bytes], truncated: bool) -> str:
+    """Decode a captured body as is, it is at most max_body_bytes long"""
+    body = b"".join(chunks).decode("utf-8", errors="replace")
+    return f"{body}...(truncated)" if truncated else body
+
+
+def write_record(record: Dict[str, Any]) -> None:
+    """
+    Log a request record
+
+    The bodies are bound as extra fields instead of being formatted into the message,
+    the JSON log sink serializes them on its writer thread and drops records when its queue is full.
+    """
+    request = f"{record['method']} {record['path']}" + (f"?{record['query']}" if record["query"] else "")
+    log = logger.bind(method=record["method"], path=record["path"], status=record["status"],
+                      duration=record["duration"],
+                      request_body=_decode(record["request_body"], record["request_truncated"]))
+    if record["error"]:
+        log.bind(error=record["error"]).error(f"Request failed: {request}: {record['error']}")
+        return
+    log.bind(response_body=_decode(record["response_body"], record["response_truncated"])).info(
+        f"Request: {request} -> {record['status']} in {record['duration']:.3f}s"
+    )
+
+
+class LoggingMiddleware:
+    """
+    Pure ASGI request/response logging
+
+    Request and response bodies are copied while they pass through, up to max_body_bytes each,
+    so nothing is buffered and streaming responses (SSE) are forwarded chunk by chunk.
+    Only a sample_rate share of the requests is logged, paths starting with one of
+    exclude_paths are never logged. Records are logged after the response has been sent.
+    """
+
+    def __init__(self,
+                 app: ASGIApp,
+                 sample_rate: float = 1.0,
+                 max_body_bytes: int = 4096,
+                 exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths) or (
+                self.sample_rate < 1 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        record: Dict[str, Any] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": None,
+            "error": None,
+            "request_body": [],
+            "request_truncated": False,
+            "response_body": [],
+            "response_truncated": False,
+        }
+        sizes = {"request": 0, "response": 0}
+
+        def tee(kind: str, body: bytes) -> None:
+            remaining = self.max_body_bytes - sizes[kind]
+            if len(body) > remaining:
+                record[f"{kind}_truncated"] = True
+            if remaining > 0 and body:
+                record[f"{kind}_body"].append(body[:remaining])
+            sizes[kind] += len(body)
+
+        async def logged_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                tee("request", message.get("body", b""))
+            return message
+
+        async def logged_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                record["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                tee("response", message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
         try:
-            # Get the original response
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            
-            # Create new response with same content
-            response_body = b""
-            async for chunk in response.body_iterator:
-                response_body += chunk
-            
-            # Log response with body
-            body = self._get_response_body(response_body)
-            logger.info(
-                f"Response: {request.method} {request.url}\n"
-                f"Status: {response.status_code}\n"
-                f"Body: {body}\n"
-                f"Completed in {process_time:.3f}s"
-            )
-            
-            # Return a new response with the captured body
-            return Response(
-                content=response_body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
-            )
-            
+            await self.app(scope, logged_receive, logged_send)
         except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise e
-    
-    async def _get_request_body(self, request: Request) -> str:
-        """Get request body content"""
-        try:
-            body = await request.body()
-            return body.decode() if body else ""
-        except Exception:
-            return ""
-    
-    def _get_response_body(self, body: bytes) -> str:
-        """Get response body content"""
-        try:
-            body_str = body.decode()
-            return json.dumps(json.loads(body_str), indent=2)  # Pretty print JSON
-        except Exception:
-            return "" 
\ No newline at end of file
+            record["error"] = str(e)
+            raise
+        finally:
+            record["duration"] = time.perf_counter() - started
+            write_record(record)
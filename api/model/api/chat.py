@@ -13,6 +13,7 @@ class StartChatRequest(BaseModel):
     test_time: int = Field(..., description="测试时间（分钟）")
     language: str = Field(..., description="语言")
     difficulty: str = Field(..., description="难度")
+    answer_mode: Optional[str] = Field(None, description="回答处理模式", examples=["two_step", "grade_and_ask"])
 
 class AnswerRequest(BaseModel):
     """回答问题请求模型"""
@@ -27,4 +28,17 @@ class ChatResponse(BaseModel):
     feedback: Optional[str] = Field(None, description="反馈内容")
     type: Optional[str] = Field(None, description="反馈类型", examples=["question", "feedback", "summary"])
     question_id: Optional[str] = Field(None, description="问题ID") 
-    is_over: bool = Field(..., description="是否结束")
\ No newline at end of file
+    is_over: bool = Field(..., description="是否结束")
+
+class SessionUsage(BaseModel):
+    """会话占用统计模型"""
+    thread_id: str = Field(..., description="会话ID（即测试ID）")
+    size_bytes: int = Field(..., description="会话占用的存储大小（字节）")
+    last_active: datetime = Field(..., description="最后活动时间")
+    is_finished: bool = Field(..., description="面试是否已结束")
+
+class SessionUsageResponse(BaseModel):
+    """会话占用统计响应模型"""
+    total_sessions: int = Field(..., description="会话总数")
+    total_bytes: int = Field(..., description="全部会话占用的存储大小（字节）")
+    sessions: List[SessionUsage] = Field(default=[], description="各会话的占用统计")
@@ -19,6 +19,7 @@ class CreateTestResultRequest(BaseModel):
     correct_number: int = Field(..., description="正确答案数量", ge=0)
     elapse_time: int = Field(..., description="耗时(分钟)", ge=0)
     qa_history: List[Dict[str, Any]] = Field(..., description="问答历史")
+    summary_status: str = Field("completed", description="总结状态", examples=["pending", "completed", "failed"])
     
     @field_validator('correct_number')
     @classmethod
@@ -54,4 +55,5 @@ class TestResultResponse(BaseModel):
     question_number: int = Field(..., description="问题数量")
     correct_number: int = Field(..., description="正确答案数量")
     elapse_time: int = Field(..., description="耗时(分钟)")
-    qa_history: List[Dict[str, Any]] = Field(..., description="问答历史")
\ No newline at end of file
+    qa_history: List[Dict[str, Any]] = Field(..., description="问答历史")
+    summary_status: Optional[str] = Field(None, description="总结状态，pending 表示总结仍在后台生成")
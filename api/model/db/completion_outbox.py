@@ -0,0 +1,56 @@
+from mongoengine import Document, StringField, IntField, BooleanField, DictField, DateTimeField
+from datetime import datetime, UTC
+from api.constants.common import OutboxStatus
+
+# Done events are removed by MongoDB this long after they were applied
+DONE_RETENTION_SECONDS = 7 * 24 * 3600
+
+class CompletionOutbox(Document):
+    """Interview completion outbox document model"""
+
+    # Test id, one completion event per test, e.g. '1234567890'
+    test_id = StringField(required=True, unique=True)
+
+    # User id, e.g. '1234567890'
+    user_id = StringField(required=True)
+
+    # Test result to save, fields of CreateTestResultRequest
+    test_result = DictField(required=True)
+
+    # Whether the summary is generated in the background after the event is applied
+    summary_pending = BooleanField(default=False)
+
+    # Interview state used to generate the summary, e.g. job_title, language, qa_history
+    summary_state = DictField()
+
+    # Whether the test result has been saved, an applied event with a pending summary
+    # stays processing until the summary is written
+    applied = BooleanField(default=False)
+
+    # Status, e.g. 'pending'
+    status = StringField(required=True, choices=OutboxStatus.choices(), default=OutboxStatus.PENDING.value)
+
+    # Number of dispatch attempts
+    attempts = IntField(default=0, min_value=0)
+
+    # Last dispatch error
+    last_error = StringField()
+
+    # Timestamps
+    next_attempt_at = DateTimeField(default=lambda: datetime.now(UTC))
+    # A processing event whose lease expired is dispatched again
+    locked_until = DateTimeField()
+    # Set when the event is done, expired by the TTL index
+    done_date = DateTimeField()
+    create_date = DateTimeField(default=lambda: datetime.now(UTC))
+    update_date = DateTimeField(default=lambda: datetime.now(UTC))
+
+    meta = {
+        'collection': 'ai_completion_outbox',
+        'indexes': [
+            'test_id',
+            ('status', 'next_attempt_at'),
+            ('status', 'locked_until'),
+            {'fields': ['done_date'], 'expireAfterSeconds': DONE_RETENTION_SECONDS}
+        ]
+    }
@@ -0,0 +1,36 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+from datetime import datetime, UTC
+
+class OpeningQuestion(Document):
+    """Pre-generated opening question document model"""
+
+    # Pool key, hash of (job_title, knowledge_points, difficulty, language, interview_time)
+    pool_key = StringField(required=True)
+
+    # Job title, e.g. 'React Developer'
+    job_title = StringField(required=True)
+
+    # Knowledge points, e.g. 'React, JavaScript, CSS'
+    knowledge_points = StringField(required=True)
+
+    # Difficulty, e.g. 'easy'
+    difficulty = StringField(required=True)
+
+    # Language, e.g. 'English'
+    language = StringField(required=True)
+
+    # Interview time used to generate the question, e.g. 30 minutes
+    interview_time = IntField(required=True, min_value=1)
+
+    # The generated question
+    question = StringField(required=True)
+
+    # Timestamps
+    create_date = DateTimeField(default=lambda: datetime.now(UTC))
+
+    meta = {
+        'collection': 'ai_opening_question',
+        'indexes': [
+            ('pool_key', 'create_date')
+        ]
+    }
@@ -1,5 +1,6 @@
 from mongoengine import Document, StringField, IntField, FloatField, ListField, DictField
 from datetime import datetime, UTC
+from api.constants.common import SummaryStatus
 
 class TestResult(Document):
     """Test result document model"""
@@ -27,6 +28,9 @@ class TestResult(Document):
 
     # Q&A history, e.g. [{'question': 'What is the capital of France?', 'answer': 'Paris'}]
     qa_history = ListField(DictField(), required=True)  # list of Q&A pairs
+
+    # Summary status, 'pending' while the summary is generated in the background
+    summary_status = StringField(choices=SummaryStatus.choices(), default=SummaryStatus.COMPLETED.value)
     
     meta = {
         'collection': 'ai_test_result',
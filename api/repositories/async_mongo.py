@@ -0,0 +1,338 @@
+import re
+from datetime import datetime, UTC
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from loguru import logger
+from mongoengine import Document, NotUniqueError
+from mongoengine.errors import InvalidQueryError
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError
+from api.constants.common import TestStatus
+from api.infra.mongo.async_client import get_async_database
+from api.model.db.job import Job
+from api.model.db.question import Question
+from api.model.db.test import Test
+from api.model.db.test_result import TestResult
+from api.model.db.user import User
+from api.utils.log_decorator import log
+
+# 基于 pymongo AsyncMongoClient 的仓储实现，接口与 api/repositories 下的 MongoEngine 仓储相同，
+# 数据库等待不阻塞事件循环。文档仍使用 MongoEngine 模型校验与转换。
+
+D = TypeVar("D", bound=Document)
+
+
+class AsyncMongoRepository(Generic[D]):
+    """异步仓储基类"""
+
+    document: Type[D]
+
+    def __init__(self, database: Optional[AsyncDatabase] = None):
+        """
+        Args:
+            database: 异步数据库，默认使用进程共享的客户端
+        """
+        database = database if database is not None else get_async_database()
+        self.collection = database[self.document._get_collection_name()]
+
+    def _query(self, **conditions: Any) -> Dict[str, Any]:
+        """将 MongoEngine 风格的查询条件（field、field__in、field__icontains）转换为 MongoDB 查询"""
+        query: Dict[str, Any] = {}
+        for key, value in conditions.items():
+            name, _, operator = key.partition("__")
+            if name not in self.document._fields:
+                raise InvalidQueryError(f'Cannot resolve field "{name}"')
+            field = self.document._fields[name].db_field
+            if not operator:
+                query[field] = value
+            elif operator == "in":
+                query[field] = {"$in": list(value)}
+            elif operator == "icontains":
+                query[field] = {"$regex": re.escape(value), "$options": "i"}
+            else:
+                raise ValueError(f"Unsupported query operator: {key}")
+        return query
+
+    def _update(self, **values: Any) -> Dict[str, Any]:
+        """字段值转换为 $set 更新"""
+        return {"$set": {self.document._fields[name].db_field: value for name, value in values.items()}}
+
+    def _to_document(self, son: Optional[Dict[str, Any]]) -> Optional[D]:
+        return self.document._from_son(son) if son is not None else None
+
+    async def _find_one(self, **conditions: Any) -> Optional[D]:
+        return self._to_document(await self.collection.find_one(self._query(**conditions)))
+
+    async def _find(self, skip: int = 0, limit: int = 0, **conditions: Any) -> List[D]:
+        cursor = self.collection.find(self._query(**conditions)).skip(skip).limit(limit)
+        return [self._to_document(son) for son in await cursor.to_list()]
+
+    async def _save(self, document: D) -> D:
+        """校验并写入文档，新文档插入，已有文档整体替换"""
+        document.validate()
+        son = document.to_mongo()
+        try:
+            if document.pk is None:
+                document.pk = (await self.collection.insert_one(son)).inserted_id
+            else:
+                await self.collection.replace_one({"_id": document.pk}, son, upsert=True)
+        except DuplicateKeyError as e:
+            # 与 MongoEngine 的 save 抛出相同的异常
+            raise NotUniqueError(str(e)) from e
+        document._clear_changed_fields()
+        return document
+
+    async def _delete(self, **conditions: Any) -> int:
+        return (await self.collection.delete_many(self._query(**conditions))).deleted_count
+
+    async def _update_one(self, conditions: Dict[str, Any], **values: Any) -> bool:
+        result = await self.collection.update_one(self._query(**conditions), self._update(**values))
+        return result.matched_count > 0
+
+
+class AsyncTestRepository(AsyncMongoRepository[Test]):
+    document = Test
+
+    @log
+    async def create_test(self, test: Test) -> Test:
+        """创建新测试"""
+        return await self._save(test)
+
+    @log
+    async def update_test(self, test: Test) -> Test:
+        """更新测试"""
+        return await self._save(test)
+
+    @log
+    async def get_test_by_id(self, test_id: str) -> Optional[Test]:
+        """根据ID获取测试"""
+        return await self._find_one(test_id=test_id)
+
+    @log
+    async def get_tests(self, skip: int = 0, limit: int = 100) -> List[Test]:
+        """获取测试列表（分页）"""
+        return await self._find(skip, limit)
+
+    @log
+    async def delete_test(self, test_id: str) -> bool:
+        """删除测试"""
+        return await self._delete(test_id=test_id) > 0
+
+    @log
+    async def get_tests_by_user_id(self, user_id: str, skip: int = 0, limit: int = 100) -> List[Test]:
+        """根据用户ID获取测试"""
+        return await self._find(skip, limit, user_id=user_id)
+
+    @log
+    async def get_tests_by_job_id(self, job_id: str, skip: int = 0, limit: int = 100) -> List[Test]:
+        """根据职位ID获取测试"""
+        return await self._find(skip, limit, job_id=job_id)
+
+    @log
+    async def get_tests_by_status(self, status: str, skip: int = 0, limit: int = 100) -> List[Test]:
+        """根据状态获取测试"""
+        return await self._find(skip, limit, status=status)
+
+    @log
+    async def get_tests_by_type(self, type: str, skip: int = 0, limit: int = 100) -> List[Test]:
+        """根据类型获取测试"""
+        return await self._find(skip, limit, type=type)
+
+    @log
+    async def get_test_by_activate_code(self, activate_code: str) -> Optional[Test]:
+        """根据激活码获取测试"""
+        return await self._find_one(activate_code=activate_code)
+
+    @log
+    async def update_test_status(self, test_id: str, status: TestStatus) -> Optional[Test]:
+        """
+        更新测试状态，一次 find_one_and_update 完成读取与更新
+
+        Args:
+            test_id: 测试ID
+            status: 新状态
+
+        Returns:
+            Optional[Test]: 更新后的测试文档，如果不存在则返回 None
+        """
+        now = datetime.now(UTC)
+        values = {"status": status.value, "update_date": now}
+        if status == TestStatus.COMPLETED:
+            values["close_date"] = now
+        test = self._to_document(await self.collection.find_one_and_update(
+            self._query(test_id=test_id), self._update(**values), return_document=ReturnDocument.AFTER
+        ))
+        if test:
+            logger.info(f"更新测试状态成功: {test_id} -> {status}")
+        else:
+            logger.info(f"测试不存在: {test_id}")
+        return test
+
+
+class AsyncUserRepository(AsyncMongoRepository[User]):
+    document = User
+
+    @log
+    async def create_user(self, user: User) -> User:
+        """Create a new user"""
+        return await self._save(user)
+
+    @log
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID"""
+        return await self._find_one(user_id=user_id)
+
+    @log
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self._find_one(email=email)
+
+    @log
+    async def get_user_by_staff_id(self, staff_id: str) -> Optional[User]:
+        """Get user by staff ID"""
+        if staff_id is None or staff_id == "":
+            return None
+        return await self._find_one(staff_id=staff_id)
+
+    @log
+    async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
+        """Get users with pagination"""
+        return await self._find(skip, limit)
+
+    @log
+    async def update_user(self, user: User) -> User:
+        """Update user"""
+        return await self._save(user)
+
+    @log
+    async def delete_user(self, user_id: str) -> bool:
+        """Delete user by ID"""
+        return await self._delete(user_id=user_id) > 0
+
+
+class AsyncJobRepository(AsyncMongoRepository[Job]):
+    document = Job
+
+    @log
+    async def create_job(self, job: Job) -> Job:
+        """创建新职位"""
+        return await self._save(job)
+
+    @log
+    async def get_job_by_id(self, job_id: str) -> Optional[Job]:
+        """根据ID获取职位"""
+        return await self._find_one(job_id=job_id)
+
+    @log
+    async def get_jobs(self, skip: int = 0, limit: int = 100) -> List[Job]:
+        """获取职位列表（分页）"""
+        return await self._find(skip, limit)
+
+    @log
+    async def update_job(self, job: Job) -> Job:
+        """更新职位"""
+        return await self._save(job)
+
+    @log
+    async def delete_job(self, job_id: str) -> bool:
+        """删除职位"""
+        return await self._delete(job_id=job_id) > 0
+
+    @log
+    async def search_jobs(self, keyword: str, skip: int = 0, limit: int = 100) -> List[Job]:
+        """搜索职位"""
+        return await self._find(skip, limit, job_title__icontains=keyword)
+
+
+class AsyncQuestionRepository(AsyncMongoRepository[Question]):
+    document = Question
+
+    @log
+    async def create_question(self, question: Question) -> Question:
+        """创建新问题"""
+        return await self._save(question)
+
+    @log
+    async def get_question_by_id(self, question_id: str) -> Optional[Question]:
+        """根据ID获取问题"""
+        return await self._find_one(question_id=question_id)
+
+    @log
+    async def get_questions(self, skip: int = 0, limit: int = 100) -> List[Question]:
+        """获取问题列表（分页）"""
+        return await self._find(skip, limit)
+
+    @log
+    async def update_question(self, question: Question) -> Question:
+        """更新问题"""
+        return await self._save(question)
+
+    @log
+    async def delete_question(self, question_id: str) -> bool:
+        """删除问题"""
+        return await self._delete(question_id=question_id) > 0
+
+    @log
+    async def search_questions(self, keyword: str, skip: int = 0, limit: int = 100) -> List[Question]:
+        """搜索问题"""
+        return await self._find(skip, limit, question__icontains=keyword)
+
+    @log
+    async def get_questions_by_job_title(self, job_title: str, skip: int = 0, limit: int = 100) -> List[Question]:
+        """根据岗位名称获取问题"""
+        return await self._find(skip, limit, job_title=job_title)
+
+    @log
+    async def get_questions_by_examination_points(self, examination_points: List[str], skip: int = 0, limit: int = 100) -> List[Question]:
+        """根据考查要点获取问题"""
+        return await self._find(skip, limit, examination_points__in=examination_points)
+
+    @log
+    async def get_questions_by_difficulty(self, difficulty: str, skip: int = 0, limit: int = 100) -> List[Question]:
+        """根据难度获取问题"""
+        return await self._find(skip, limit, difficulty=difficulty)
+
+    @log
+    async def get_questions_by_type(self, type: str, skip: int = 0, limit: int = 100) -> List[Question]:
+        """根据题目类型获取问题"""
+        return await self._find(skip, limit, type=type)
+
+    @log
+    async def get_questions_by_job(self, job_title: str, language: str) -> List[Question]:
+        """Get questions for a specific job and language"""
+        return await self._find(job_title=job_title, language=language)
+
+    @log
+    async def get_questions_by_knowledge_point(self, knowledge_point: str) -> List[Question]:
+        """Get questions by knowledge point"""
+        return await self._find(knowledge_points=knowledge_point)
+
+
+class AsyncTestResultRepository(AsyncMongoRepository[TestResult]):
+    document = TestResult
+
+    @log
+    async def create_result(self, result: TestResult) -> TestResult:
+        """Create a new test result"""
+        return await self._save(result)
+
+    @log
+    async def get_result_by_test_id(self, test_id: str) -> Optional[TestResult]:
+        """Get test result by test ID"""
+        return await self._find_one(test_id=test_id)
+
+    @log
+    async def get_results_by_user_id(self, user_id: str) -> List[TestResult]:
+        """Get all test results for a user"""
+        return await self._find(user_id=user_id)
+
+    @log
+    async def update_summary(self, test_id: str, summary: str, score: float, summary_status: str) -> bool:
+        """Update the summary of a test result"""
+        return await self._update_one({"test_id": test_id}, summary=summary, score=score,
+                                      summary_status=summary_status)
+
+    @log
+    async def update_summary_status(self, test_id: str, summary_status: str) -> bool:
+        """Update the summary status of a test result"""
+        return await self._update_one({"test_id": test_id}, summary_status=summary_status)
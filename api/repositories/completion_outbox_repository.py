@@ -0,0 +1,85 @@
+from typing import Optional, List, Dict, Any
+from datetime import datetime, UTC, timedelta
+from mongoengine import Q
+from api.model.db.completion_outbox import CompletionOutbox
+from api.constants.common import OutboxStatus
+from api.utils.log_decorator import log
+
+class CompletionOutboxRepository:
+    @log
+    async def enqueue(self, test_id: str, user_id: str, test_result: Dict[str, Any],
+                      summary_pending: bool, summary_state: Dict[str, Any]) -> bool:
+        """写入完成事件，同一测试只会写入一次"""
+        result = CompletionOutbox.objects(test_id=test_id).update_one(
+            upsert=True,
+            set_on_insert__user_id=user_id,
+            set_on_insert__test_result=test_result,
+            set_on_insert__summary_pending=summary_pending,
+            set_on_insert__summary_state=summary_state,
+            set_on_insert__status=OutboxStatus.PENDING.value,
+            set_on_insert__attempts=0,
+            set_on_insert__next_attempt_at=datetime.now(UTC),
+            set_on_insert__create_date=datetime.now(UTC),
+            set_on_insert__update_date=datetime.now(UTC),
+            full_result=True
+        )
+        return result.upserted_id is not None
+
+    @log
+    async def get_event(self, test_id: str) -> Optional[CompletionOutbox]:
+        """根据测试ID获取完成事件"""
+        return CompletionOutbox.objects(test_id=test_id).first()
+
+    @log
+    async def claim_batch(self, batch_size: int, lease_seconds: int) -> List[CompletionOutbox]:
+        """原子地领取一批待处理的事件（含租约过期的处理中事件）"""
+        now = datetime.now(UTC)
+        claimable = Q(status=OutboxStatus.PENDING.value, next_attempt_at__lte=now) | \
+                    Q(status=OutboxStatus.PROCESSING.value, locked_until__lte=now)
+        events: List[CompletionOutbox] = []
+        for _ in range(batch_size):
+            event = CompletionOutbox.objects(claimable).order_by('next_attempt_at').modify(
+                new=True,
+                set__status=OutboxStatus.PROCESSING.value,
+                set__locked_until=now + timedelta(seconds=lease_seconds),
+                set__update_date=now,
+                inc__attempts=1
+            )
+            if event is None:
+                break
+            events.append(event)
+        return events
+
+    @log
+    async def renew_lease(self, test_id: str, lease_seconds: int) -> bool:
+        """延长处理中事件的租约，事件已不在处理中时返回 False"""
+        now = datetime.now(UTC)
+        updated = CompletionOutbox.objects(test_id=test_id, status=OutboxStatus.PROCESSING.value).update_one(
+            set__locked_until=now + timedelta(seconds=lease_seconds), set__update_date=now
+        )
+        return updated > 0
+
+    @log
+    async def mark_applied(self, test_id: str) -> None:
+        """标记测试结果已保存，事件保持处理中直到总结写入"""
+        CompletionOutbox.objects(test_id=test_id).update_one(set__applied=True, set__update_date=datetime.now(UTC))
+
+    @log
+    async def mark_done(self, test_id: str) -> None:
+        """标记事件已处理，done_date 上的 TTL 索引会在保留期后删除事件"""
+        now = datetime.now(UTC)
+        CompletionOutbox.objects(test_id=test_id).update_one(
+            set__status=OutboxStatus.DONE.value, set__done_date=now, set__update_date=now, unset__locked_until=True
+        )
+
+    @log
+    async def mark_failed(self, test_id: str, error: str, retry_at: Optional[datetime]) -> None:
+        """记录处理失败，retry_at 为 None 时不再重试"""
+        status = OutboxStatus.PENDING.value if retry_at else OutboxStatus.FAILED.value
+        CompletionOutbox.objects(test_id=test_id).update_one(
+            set__status=status,
+            set__last_error=error,
+            set__next_attempt_at=retry_at or datetime.now(UTC),
+            set__update_date=datetime.now(UTC),
+            unset__locked_until=True
+        )
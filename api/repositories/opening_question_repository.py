@@ -0,0 +1,21 @@
+from typing import Optional, List
+from api.model.db.opening_question import OpeningQuestion
+from api.utils.log_decorator import log
+
+class OpeningQuestionRepository:
+    @log
+    async def create_questions(self, questions: List[OpeningQuestion]) -> List[OpeningQuestion]:
+        """批量保存预生成的开场问题"""
+        if not questions:
+            return []
+        return OpeningQuestion.objects.insert(questions)
+
+    @log
+    async def pop_question(self, pool_key: str) -> Optional[OpeningQuestion]:
+        """原子地取出并删除池中最早生成的问题"""
+        return OpeningQuestion.objects(pool_key=pool_key).order_by('create_date').modify(remove=True)
+
+    @log
+    async def count_questions(self, pool_key: str) -> int:
+        """统计池中剩余的问题数量"""
+        return OpeningQuestion.objects(pool_key=pool_key).count()
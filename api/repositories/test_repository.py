@@ -15,6 +15,11 @@ class TestRepository:
         """创建新测试"""
         return test.save()
     
+    @log
+    async def update_test(self, test: Test) -> Test:
+        """更新测试"""
+        return test.save()
+    
     @log
     async def get_test_by_id(self, test_id: str) -> Optional[Test]:
         """根据ID获取测试"""
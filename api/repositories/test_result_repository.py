@@ -16,4 +16,16 @@ class TestResultRepository:
     @log
     async def get_results_by_user_id(self, user_id: str) -> List[TestResult]:
         """Get all test results for a user"""
-        return TestResult.objects(user_id=user_id).all() 
\ No newline at end of file
+        return TestResult.objects(user_id=user_id).all()
+
+    @log
+    async def update_summary(self, test_id: str, summary: str, score: float, summary_status: str) -> bool:
+        """Update the summary of a test result"""
+        return TestResult.objects(test_id=test_id).update_one(
+            set__summary=summary, set__score=score, set__summary_status=summary_status
+        ) > 0
+
+    @log
+    async def update_summary_status(self, test_id: str, summary_status: str) -> bool:
+        """Update the summary status of a test result"""
+        return TestResult.objects(test_id=test_id).update_one(set__summary_status=summary_status) > 0
@@ -1,8 +1,12 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional, List
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Any, AsyncIterator
 from api.model.api.base import Response
-from api.model.api.chat import StartChatRequest, AnswerRequest, ChatResponse
+from api.model.api.chat import StartChatRequest, AnswerRequest, ChatResponse, SessionUsageResponse
 from api.service.chat import ChatService
+from api.dependencies import get_chat_service
+from api.exceptions.api_error import APIError, DuplicateError
 from api.utils.log_decorator import log
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -10,12 +14,9 @@ from uuid import UUID, uuid4
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
-# 服务实例
-chat_service = ChatService()
-
 @router.post("/start", response_model=Response[ChatResponse])
 @log
-async def start_chat(request: StartChatRequest):
+async def start_chat(request: StartChatRequest, chat_service: ChatService = Depends(get_chat_service)):
     """
     开始聊天
     
@@ -30,7 +31,8 @@ async def start_chat(request: StartChatRequest):
             examination_points=request.examination_points,
             test_time=request.test_time,
             language=request.language,
-            difficulty=request.difficulty
+            difficulty=request.difficulty,
+            answer_mode=request.answer_mode
         )
         
         # 返回成功响应
@@ -45,7 +47,7 @@ async def start_chat(request: StartChatRequest):
 
 @router.post("/answer", response_model=Response[ChatResponse])
 @log
-async def answer_question(request: AnswerRequest):
+async def answer_question(request: AnswerRequest, chat_service: ChatService = Depends(get_chat_service)):
     """
     回答问题
     
@@ -66,6 +68,59 @@ async def answer_question(request: AnswerRequest):
             message="success",
             data=result
         )
+    except DuplicateError as e:
+        # 迟到的重试或已经回答过的问题
+        return Response[ChatResponse](
+            code="409",
+            message=str(e),
+            data=None
+        )
     except Exception as e:
         # 处理异常
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/answer/stream")
+async def answer_question_stream(request: AnswerRequest, chat_service: ChatService = Depends(get_chat_service)):
+    """
+    回答问题（SSE 流式）
+    
+    提交用户对问题的回答，以 Server-Sent Events 的形式推送反馈和下一个问题的生成片段，
+    最后推送 done 事件（包含 is_over / question_id）
+    """
+    events = chat_service.process_answer_stream(
+        user_id=request.user_id,
+        test_id=request.test_id,
+        question_id=request.question_id,
+        user_answer=request.user_answer
+    )
+    return StreamingResponse(
+        _to_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/sessions", response_model=Response[SessionUsageResponse])
+async def get_session_usage(chat_service: ChatService = Depends(get_chat_service)):
+    """
+    获取会话占用统计
+    
+    返回每个面试会话及全部会话占用的存储大小
+    """
+    usage = await chat_service.session_manager.get_usage()
+    return Response[SessionUsageResponse](data=usage)
+
+
+async def _to_sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """将服务层事件编码为 SSE 文本，异常时推送 error 事件"""
+    try:
+        async for event in events:
+            yield _format_sse(event["event"], event["data"])
+    except Exception as e:
+        yield _format_sse("error", {"code": e.code if isinstance(e, APIError) else "500", "message": str(e)})
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """格式化单个 SSE 事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
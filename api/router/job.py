@@ -3,6 +3,7 @@ from typing import List, Optional
 from api.model.api.base import Response
 from api.model.api.job import CreateJobRequest, UpdateJobRequest, JobResponse
 from api.service.job import JobService
+from api.dependencies import get_job_service
 
 router = APIRouter(
     prefix="/job",
@@ -11,7 +12,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=Response[JobResponse])
-async def create_job(request: CreateJobRequest):
+async def create_job(request: CreateJobRequest, service: JobService = Depends(get_job_service)):
     """
     创建新职位
     
@@ -20,25 +21,24 @@ async def create_job(request: CreateJobRequest):
     - **technical_skills**: 技术技能要求
     - **soft_skills**: 软技能要求
     """
-    service = JobService()
     job = await service.create_job(request)
     return Response[JobResponse](data=job)
 
 @router.get("/{job_id}", response_model=Response[JobResponse])
-async def get_job(job_id: str):
+async def get_job(job_id: str, service: JobService = Depends(get_job_service)):
     """
     根据ID获取职位
     
     - **job_id**: 职位ID
     """
-    service = JobService()
     job = await service.get_job(job_id)
     return Response[JobResponse](data=job)
 
 @router.get("", response_model=Response[List[JobResponse]])
 async def get_jobs(
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: JobService = Depends(get_job_service)
 ):
     """
     获取职位列表（分页）
@@ -46,12 +46,11 @@ async def get_jobs(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = JobService()
     jobs = await service.get_jobs(skip, limit)
     return Response[List[JobResponse]](data=jobs)
 
 @router.put("/{job_id}", response_model=Response[JobResponse])
-async def update_job(job_id: str, request: UpdateJobRequest):
+async def update_job(job_id: str, request: UpdateJobRequest, service: JobService = Depends(get_job_service)):
     """
     更新职位
     
@@ -61,18 +60,16 @@ async def update_job(job_id: str, request: UpdateJobRequest):
     - **technical_skills**: 技术技能要求（可选）
     - **soft_skills**: 软技能要求（可选）
     """
-    service = JobService()
     job = await service.update_job(job_id, request)
     return Response[JobResponse](data=job)
 
 @router.delete("/{job_id}", response_model=Response[dict])
-async def delete_job(job_id: str):
+async def delete_job(job_id: str, service: JobService = Depends(get_job_service)):
     """
     删除职位
     
     - **job_id**: 职位ID
     """
-    service = JobService()
     deleted = await service.delete_job(job_id)
     return Response[dict](data={"deleted": deleted})
 
@@ -80,7 +77,8 @@ async def delete_job(job_id: str):
 async def search_jobs(
     keyword: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: JobService = Depends(get_job_service)
 ):
     """
     搜索职位
@@ -89,6 +87,5 @@ async def search_jobs(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = JobService()
     jobs = await service.search_jobs(keyword, skip, limit)
     return Response[List[JobResponse]](data=jobs) 
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import List, Optional
 from api.model.api.base import Response
 from api.model.api.question import CreateQuestionRequest, UpdateQuestionRequest, QuestionResponse
 from api.service.question import QuestionService
+from api.dependencies import get_question_service
 
 router = APIRouter(
     prefix="/question",
@@ -11,7 +12,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=Response[QuestionResponse])
-async def create_question(request: CreateQuestionRequest):
+async def create_question(request: CreateQuestionRequest, service: QuestionService = Depends(get_question_service)):
     """
     创建新问题
     
@@ -23,25 +24,24 @@ async def create_question(request: CreateQuestionRequest):
     - **difficulty**: 难度
     - **type**: 题目类型
     """
-    service = QuestionService()
     question = await service.create_question(request)
     return Response[QuestionResponse](data=question)
 
 @router.get("/{question_id}", response_model=Response[QuestionResponse])
-async def get_question(question_id: str):
+async def get_question(question_id: str, service: QuestionService = Depends(get_question_service)):
     """
     根据ID获取问题
     
     - **question_id**: 问题ID
     """
-    service = QuestionService()
     question = await service.get_question(question_id)
     return Response[QuestionResponse](data=question)
 
 @router.get("", response_model=Response[List[QuestionResponse]])
 async def get_questions(
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: QuestionService = Depends(get_question_service)
 ):
     """
     获取问题列表（分页）
@@ -49,12 +49,11 @@ async def get_questions(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = QuestionService()
     questions = await service.get_questions(skip, limit)
     return Response[List[QuestionResponse]](data=questions)
 
 @router.put("/{question_id}", response_model=Response[QuestionResponse])
-async def update_question(question_id: str, request: UpdateQuestionRequest):
+async def update_question(question_id: str, request: UpdateQuestionRequest, service: QuestionService = Depends(get_question_service)):
     """
     更新问题
     
@@ -67,18 +66,16 @@ async def update_question(question_id: str, request: UpdateQuestionRequest):
     - **difficulty**: 难度（可选）
     - **type**: 题目类型（可选）
     """
-    service = QuestionService()
     question = await service.update_question(question_id, request)
     return Response[QuestionResponse](data=question)
 
 @router.delete("/{question_id}", response_model=Response[dict])
-async def delete_question(question_id: str):
+async def delete_question(question_id: str, service: QuestionService = Depends(get_question_service)):
     """
     删除问题
     
     - **question_id**: 问题ID
     """
-    service = QuestionService()
     deleted = await service.delete_question(question_id)
     return Response[dict](data={"deleted": deleted})
 
@@ -86,7 +83,8 @@ async def delete_question(question_id: str):
 async def search_questions(
     keyword: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: QuestionService = Depends(get_question_service)
 ):
     """
     搜索问题
@@ -95,7 +93,6 @@ async def search_questions(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = QuestionService()
     questions = await service.search_questions(keyword, skip, limit)
     return Response[List[QuestionResponse]](data=questions)
 
@@ -103,7 +100,8 @@ async def search_questions(
 async def get_questions_by_job_title(
     job_title: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: QuestionService = Depends(get_question_service)
 ):
     """
     根据岗位名称获取问题
@@ -112,7 +110,6 @@ async def get_questions_by_job_title(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = QuestionService()
     questions = await service.get_questions_by_job_title(job_title, skip, limit)
     return Response[List[QuestionResponse]](data=questions)
 
@@ -120,7 +117,8 @@ async def get_questions_by_job_title(
 async def get_questions_by_difficulty(
     difficulty: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: QuestionService = Depends(get_question_service)
 ):
     """
     根据难度获取问题
@@ -129,7 +127,6 @@ async def get_questions_by_difficulty(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = QuestionService()
     questions = await service.get_questions_by_difficulty(difficulty, skip, limit)
     return Response[List[QuestionResponse]](data=questions)
 
@@ -137,7 +134,8 @@ async def get_questions_by_difficulty(
 async def get_questions_by_type(
     type: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: QuestionService = Depends(get_question_service)
 ):
     """
     根据题目类型获取问题
@@ -146,6 +144,5 @@ async def get_questions_by_type(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = QuestionService()
     questions = await service.get_questions_by_type(type, skip, limit)
     return Response[List[QuestionResponse]](data=questions) 
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import List, Optional
 from api.model.api.base import Response
 from api.model.api.test import CreateTestRequest, UpdateTestRequest, TestResponse
 from api.service.test import TestService
+from api.dependencies import get_test_service
 from api.constants.common import TestType
 # from api.utils.log_decorator import log
 from api.exceptions.api_error import NotFoundError, DuplicateError, ValidationError
@@ -15,7 +16,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=Response[TestResponse])
-async def create_test(request: CreateTestRequest):
+async def create_test(request: CreateTestRequest, service: TestService = Depends(get_test_service)):
     """
     创建新测试
     
@@ -27,25 +28,24 @@ async def create_test(request: CreateTestRequest):
     - **user_id**: 关联的用户ID（可选）
     - **question_ids**: 测试包含的问题ID列表（可选）
     """
-    service = TestService()
     test = await service.create_test(request)
     return Response[TestResponse](data=test)
 
 @router.get("/{test_id}", response_model=Response[TestResponse])
-async def get_test(test_id: str):
+async def get_test(test_id: str, service: TestService = Depends(get_test_service)):
     """
     根据ID获取测试
     
     - **test_id**: 测试ID
     """
-    service = TestService()
     test = await service.get_test(test_id)
     return Response[TestResponse](data=test)
 
 @router.get("", response_model=Response[List[TestResponse]])
 async def get_tests(
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: TestService = Depends(get_test_service)
 ):
     """
     获取测试列表（分页）
@@ -53,12 +53,11 @@ async def get_tests(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = TestService()
     tests = await service.get_tests(skip, limit)
     return Response[List[TestResponse]](data=tests)
 
 @router.put("/{test_id}", response_model=Response[TestResponse])
-async def update_test(test_id: str, request: UpdateTestRequest):
+async def update_test(test_id: str, request: UpdateTestRequest, service: TestService = Depends(get_test_service)):
     """
     更新测试
     
@@ -71,18 +70,16 @@ async def update_test(test_id: str, request: UpdateTestRequest):
     - **user_id**: 关联的用户ID（可选）
     - **question_ids**: 测试包含的问题ID列表（可选）
     """
-    service = TestService()
     test = await service.update_test(test_id, request)
     return Response[TestResponse](data=test)
 
 @router.delete("/{test_id}", response_model=Response[dict])
-async def delete_test(test_id: str):
+async def delete_test(test_id: str, service: TestService = Depends(get_test_service)):
     """
     删除测试
     
     - **test_id**: 测试ID
     """
-    service = TestService()
     deleted = await service.delete_test(test_id)
     return Response[dict](data={"deleted": deleted})
 
@@ -90,7 +87,8 @@ async def delete_test(test_id: str):
 async def get_tests_by_user_id(
     user_id: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: TestService = Depends(get_test_service)
 ):
     """
     根据用户ID获取测试
@@ -99,7 +97,6 @@ async def get_tests_by_user_id(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = TestService()
     tests = await service.get_tests_by_user_id(user_id, skip, limit)
     return Response[List[TestResponse]](data=tests)
 
@@ -107,7 +104,8 @@ async def get_tests_by_user_id(
 async def get_tests_by_job_id(
     job_id: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: TestService = Depends(get_test_service)
 ):
     """
     根据职位ID获取测试
@@ -116,7 +114,6 @@ async def get_tests_by_job_id(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = TestService()
     tests = await service.get_tests_by_job_id(job_id, skip, limit)
     return Response[List[TestResponse]](data=tests)
 
@@ -124,7 +121,8 @@ async def get_tests_by_job_id(
 async def get_tests_by_status(
     status: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: TestService = Depends(get_test_service)
 ):
     """
     根据状态获取测试
@@ -133,7 +131,6 @@ async def get_tests_by_status(
     - **skip**: 跳过的记录数
     - **limit**: 返回的最大记录数
     """
-    service = TestService()
     tests = await service.get_tests_by_status(status, skip, limit)
     return Response[List[TestResponse]](data=tests)
 
@@ -141,7 +138,8 @@ async def get_tests_by_status(
 async def get_tests_by_type(
     type: str,
     skip: int = Query(0, description="跳过的记录数"),
-    limit: int = Query(100, description="返回的最大记录数")
+    limit: int = Query(100, description="返回的最大记录数"),
+    service: TestService = Depends(get_test_service)
 ):
     """
     根据类型获取测试
@@ -153,12 +151,11 @@ async def get_tests_by_type(
     if type not in TestType.choices():
         raise HTTPException(status_code=400, detail=f"无效的测试类型: {type}")
     
-    service = TestService()
     tests = await service.get_tests_by_type(type, skip, limit)
     return Response[List[TestResponse]](data=tests) 
 
 @router.get("/activate_code/{code}", response_model=Response[TestResponse])
-async def get_test_by_activate_code(code: str):
+async def get_test_by_activate_code(code: str, service: TestService = Depends(get_test_service)):
     """
     根据激活码获取测试
     
@@ -167,7 +164,6 @@ async def get_test_by_activate_code(code: str):
     只返回状态不是已完成的测试
     """
     try:
-        service = TestService()
         test = await service.get_test_by_activate_code(code)
         return Response[TestResponse](
             code="0",
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import List, Optional
 from api.model.api.base import Response
 from api.model.api.test_result import CreateTestResultRequest, UpdateTestResultRequest, TestResultResponse
 from api.service.test_result import TestResultService
+from api.dependencies import get_test_result_service
 from api.exceptions.api_error import NotFoundError, ValidationError
 from loguru import logger
 
@@ -13,7 +14,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=Response[TestResultResponse])
-async def create_test_result(request: CreateTestResultRequest):
+async def create_test_result(request: CreateTestResultRequest, service: TestResultService = Depends(get_test_result_service)):
     """
     创建或更新测试结果
     
@@ -27,7 +28,6 @@ async def create_test_result(request: CreateTestResultRequest):
     - **qa_history**: 问答历史
     """
     try:
-        service = TestResultService()
         result = await service.create_test_result(request)
         return Response[TestResultResponse](
             code="0",
@@ -53,14 +53,13 @@ async def create_test_result(request: CreateTestResultRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/test/{test_id}", response_model=Response[TestResultResponse])
-async def get_test_result_by_test_id(test_id: str):
+async def get_test_result_by_test_id(test_id: str, service: TestResultService = Depends(get_test_result_service)):
     """
     根据测试ID获取测试结果
     
     - **test_id**: 测试ID
     """
     try:
-        service = TestResultService()
         result = await service.get_test_result_by_test_id(test_id)
         return Response[TestResultResponse](
             code="0",
@@ -79,14 +78,13 @@ async def get_test_result_by_test_id(test_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user/{user_id}", response_model=Response[List[TestResultResponse]])
-async def get_test_results_by_user_id(user_id: str):
+async def get_test_results_by_user_id(user_id: str, service: TestResultService = Depends(get_test_result_service)):
     """
     根据用户ID获取测试结果列表
     
     - **user_id**: 用户ID
     """
     try:
-        service = TestResultService()
         results = await service.get_test_results_by_user_id(user_id)
         return Response[List[TestResultResponse]](
             code="0",
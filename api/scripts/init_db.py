@@ -5,6 +5,7 @@ from api.model.db.user import User
 from api.model.db.job import Job
 from api.model.db.test_result import TestResult
 from api.model.db.question import Question
+from api.infra.mongo.checkpointer import MongoCheckpointSaver
 
 def init_collections():
     """Initialize database collections"""
@@ -18,6 +19,7 @@ def init_collections():
         Job.ensure_indexes()
         TestResult.ensure_indexes()
         Question.ensure_indexes()
+        MongoCheckpointSaver().ensure_indexes()
         
         logger.info("Database collections initialized successfully")
     except Exception as e:
@@ -1,26 +1,93 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from datetime import datetime
 from uuid import uuid4
 from api.utils.log_decorator import log
-from agent.workflow import build_graph
+from agent.workflow import build_graph, ANSWER_NODES
 from langgraph.types import Command
 from langgraph.types import StateSnapshot
 from api.model.api.test_result import CreateTestResultRequest
-from api.service.test_result import TestResultService
 from agent.interview_response import InterviewResult
+from agent.answer_grader import AnswerKeyStreamFilter
 from loguru import logger
+from omegaconf import OmegaConf
 from api.service.test import TestService
+from api.service.test_result import TestResultService
 from langgraph.graph import START
+from langchain_core.messages import AIMessageChunk
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from agent.memory_saver import InterviewMemorySaver
+from api.conf.config import Config
+from api.infra.mongo.checkpointer import MongoCheckpointSaver
+from api.service.session import SessionManager
+from api.service.question_pool import QuestionPoolService
+from api.service.interview_summary import InterviewSummaryService
+from api.service.completion_outbox import CompletionOutboxService
+from api.service.single_flight import SingleFlight, get_answer_key
+from api.constants.common import SummaryStatus, TestStatus
+from api.exceptions.api_error import DuplicateError
+
+# 需要向客户端逐 token 推送输出的工作流节点
+# grade_and_ask 为结构化输出，不产生逐 token 的问题片段，下一个问题通过 feedback 事件推送
+STREAMING_NODES = ("send_next_question",)
+
+# 后台生成总结期间写入测试结果的占位总结
+PENDING_SUMMARY = "Summary is being generated"
 
 
 class ChatService:
     """聊天服务类"""
     
-    def __init__(self):
-        """初始化聊天服务"""
-        self.workflow = build_graph()
+    def __init__(
+        self,
+        test_service: Optional[TestService] = None,
+        test_result_service: Optional[TestResultService] = None
+    ):
+        """
+        初始化聊天服务
+
+        Args:
+            test_service: 测试服务，未传入时自行创建
+            test_result_service: 测试结果服务，未传入时自行创建
+        """
+        config = Config.load_config()
+        test_result_service = test_result_service or TestResultService()
+        self.test_result_service = test_result_service
+        # 面试完成事件在 summarize_interview 节点内写入，与结束面试的 checkpoint 属于同一步
+        self.workflow = build_graph(checkpointer=self._create_checkpointer(config),
+                                    on_interview_over=self._on_interview_over)
+        self.session_manager = SessionManager(
+            self.workflow.checkpointer,
+            idle_ttl_minutes=config.session.idle_ttl_minutes,
+            finished_ttl_minutes=config.session.finished_ttl_minutes,
+            sweep_interval_seconds=config.session.sweep_interval_seconds
+        )
+        self.question_pool = QuestionPoolService(
+            enabled=config.question_pool.enabled,
+            depth=config.question_pool.depth,
+            refill_threshold=config.question_pool.refill_threshold,
+            refill_interval_seconds=config.question_pool.refill_interval_seconds,
+            max_configurations=config.question_pool.max_configurations
+        )
         self.model_name = "claude-3-5-sonnet"
-        self.test_service = TestService()  # 添加 TestService 实例
+        self.speculative_next_question = config.workflow.speculative_next_question
+        self.answer_mode = config.workflow.answer_mode
+        self.deferred_summary = config.workflow.deferred_summary
+        self.summary_service = InterviewSummaryService(test_result_service=test_result_service)
+        self.qa_history_token_budget = config.workflow.qa_history_token_budget
+        self.llm_policies = OmegaConf.to_container(config.workflow.llm_policies)
+        self.test_service = test_service or TestService()
+        # 同一面试的请求串行执行，重复请求共享结果
+        self.single_flight = SingleFlight(result_ttl_seconds=config.workflow.duplicate_result_ttl_seconds)
+        self.completion_outbox = CompletionOutboxService(
+            self.test_service,
+            self.summary_service,
+            test_result_service,
+            batch_size=config.outbox.batch_size,
+            poll_interval_seconds=config.outbox.poll_interval_seconds,
+            lease_seconds=config.outbox.lease_seconds,
+            max_attempts=config.outbox.max_attempts,
+            retry_backoff_seconds=config.outbox.retry_backoff_seconds
+        )
     
     @log
     async def start_chat(
@@ -31,7 +98,46 @@ class ChatService:
         examination_points: str,
         test_time: int,
         language: str,
-        difficulty: str
+        difficulty: str,
+        answer_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        开始聊天
+
+        同一测试并发的重复开始请求共享同一次执行的结果，只生成一次开场问题；
+        完成后不保留结果，之后的开始请求从工作流状态恢复当前问题
+
+        Args:
+            user_id: 用户ID
+            test_id: 测试ID
+            job_title: 职位名称
+            examination_points: 考查要点
+            test_time: 测试时间（分钟）
+            language: 语言
+            difficulty: 难度
+            answer_mode: 回答处理模式（two_step / grade_and_ask），默认使用配置值
+
+        Returns:
+            Dict: 包含第一个问题的信息
+        """
+        return await self.single_flight.run(
+            test_id,
+            ("start", test_id),
+            lambda: self._start_chat(user_id, test_id, job_title, examination_points, test_time, language,
+                                     difficulty, answer_mode),
+            keep_result=False
+        )
+
+    async def _start_chat(
+        self,
+        user_id: str,
+        test_id: str,
+        job_title: str,
+        examination_points: str,
+        test_time: int,
+        language: str,
+        difficulty: str,
+        answer_mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         开始聊天
@@ -44,6 +150,7 @@ class ChatService:
             test_time: 测试时间（分钟）
             language: 语言
             difficulty: 难度
+            answer_mode: 回答处理模式（two_step / grade_and_ask），默认使用配置值
             
         Returns:
             Dict: 包含第一个问题的信息
@@ -56,26 +163,20 @@ class ChatService:
             "knowledge_points": examination_points,
             "interview_time": test_time,
             "language": language,
-            "difficulty": difficulty
+            "difficulty": difficulty,
+            "answer_mode": answer_mode or self.answer_mode
         }
 
-        config = {
-            "configurable": {
-                "thread_id": test_id, 
-                "user_id": user_id
-            },
-            "model_name": self.model_name,
-            # "model_name": "gpt-4o",
-            # "model_name": "deepseek-v3",
-        }
+        config = self._build_config(user_id, test_id)
 
         # check if the test exists
-        current: StateSnapshot = self.workflow.get_state(config)
+        current: StateSnapshot = await self.workflow.aget_state(config)
         if current:
             # workflow found
             (next,) = current.next if current.next else (None,)
             feedback = current.values["feedback"] if "feedback" in current.values.keys() else None
-            question_id = str(uuid4())
+            # 线程创建于 question_id 写入状态之前时重新生成
+            question_id = current.values.get("question_id") or str(uuid4())
             type = "question"
             if next is None:
                 if "interview_result" in current.values.keys():
@@ -98,8 +199,8 @@ class ChatService:
                 else:
                     # normal start the workflow
                     pass
-            elif next == "analyze_answer":
-                logger.info(f"start chat, current next is analyze_answer")
+            elif next in ANSWER_NODES:
+                logger.info(f"start chat, current next is {next}")
                 # load all messages from the test
                 # wait for user answer
                 # return is_over = false
@@ -119,20 +220,11 @@ class ChatService:
                 logger.info(f"start chat, current next is {next}")
                 # resume the workflow
                 # load all messages from the test
-                events = self.workflow.invoke(None, config=config)
-                for event in events:
-                    pass
+                changes, interrupted = await self._run_workflow(None, config)
+                self.session_manager.on_turn_completed(test_id)
 
-                # get the snapshot state (next question is in the snapshot)
-                snapshot = self.workflow.get_state(config)
-                if snapshot.next:                    
-                    # show the question to user
-                    # wait for user answer
-                    feedback = snapshot.values["feedback"]
-                    is_over = False
-                else:
-                    # workflow has no next, end
-                    is_over = True
+                # the next question is taken from the updates of the run
+                feedback, is_over = await self._finish_turn(config, changes, interrupted)
 
                 if "qa_history" in current.values.keys():
                     qa_history=[{"question": q, "answer": a, "summary": s} for (q, a, s) in current.values["qa_history"]]
@@ -141,29 +233,32 @@ class ChatService:
 
                 return {
                     "feedback": feedback,
-                    "question_id": str(uuid4()),  # TODO: 需要从snapshot中获取
+                    "question_id": question_id,
                     "type": "question",
                     "is_over": is_over,
                     "qa_history": qa_history
                 }
 
+        # 面试结束后会话只保留 finished_ttl_minutes，会话被清理后根据保存的结果判断测试是否已完成
+        completed = await self._get_completed_test(test_id)
+        if completed is not None:
+            return completed
+
         # new workflow
-        # start the interview, generate the first question
-        events = self.workflow.stream(inputs, config=config, stream_mode="values")
-        for event in events:
-            pass
-
-        snapshot: StateSnapshot = self.workflow.get_state(config)
-        if snapshot.next:                    
-            # show the question to user
-            feedback = snapshot.values["feedback"]
-            is_over = False
-        else:
-            is_over = True
+        # start the interview, take the first question from the pool or generate it
+        inputs["prepared_question"] = await self.question_pool.pop(
+            job_title, examination_points, difficulty, language, test_time
+        )
+        inputs["question_id"] = str(uuid4())
+        changes, interrupted = await self._run_workflow(inputs, config)
+        self.session_manager.on_turn_completed(test_id)
+
+        # show the question to user
+        feedback, is_over = await self._finish_turn(config, changes, interrupted)
 
         return {
             "feedback": feedback,
-            "question_id": str(uuid4()),  # TODO: 需要从snapshot中获取
+            "question_id": inputs["question_id"],
             "type": "question",
             "is_over": is_over
         }
@@ -178,6 +273,38 @@ class ChatService:
     ) -> Dict[str, Any]:
         """
         处理用户回答
+
+        同一测试的回答按到达顺序串行处理，与流式接口使用相同的合并键，
+        (test_id, question_id, 回答) 相同的重复请求无论来自哪个接口都共享同一次执行的结果
+
+        Args:
+            user_id: 用户ID
+            test_id: 测试ID
+            question_id: 问题ID
+            user_answer: 用户回答
+
+        Returns:
+            Dict: 包含下一个问题或反馈的信息
+        """
+        result: Dict[str, Any] = {}
+        async for event in self.single_flight.stream(
+            test_id,
+            ("answer",) + get_answer_key(test_id, question_id, user_answer),
+            lambda: self._process_answer(user_id, test_id, question_id, user_answer)
+        ):
+            if event["event"] == "done":
+                result = event["data"]
+        return result
+
+    async def _process_answer(
+        self,
+        user_id: str,
+        test_id: str,
+        question_id: str,
+        user_answer: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        处理用户回答，只产出最终的 done 事件
         
         Args:
             user_id: 用户ID
@@ -185,61 +312,303 @@ class ChatService:
             question_id: 问题ID
             user_answer: 用户回答
             
+        Yields:
+            Dict: done 事件，包含下一个问题或反馈的信息
+        """
+        config = self._build_config(user_id, test_id)
+        next_question_id = str(uuid4())
+
+        # resume the interview workflow
+        # pass user answer and get the result
+        # then generate next question
+        changes, interrupted = await self._run_workflow(
+            self._answer_command(question_id, user_answer, next_question_id), config
+        )
+        self._check_answer_accepted(question_id, changes)
+        self.session_manager.on_turn_completed(test_id)
+
+        # the next question is taken from the updates of the run, check if the interview is over
+        feedback, is_over = await self._finish_turn(config, changes, interrupted)
+
+        yield {
+            "event": "done",
+            "data": {
+                "feedback": feedback,
+                "question_id": next_question_id,
+                "type": "question",
+                "is_over": is_over
+            }
+        }
+
+    def process_answer_stream(
+        self,
+        user_id: str,
+        test_id: str,
+        question_id: str,
+        user_answer: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        处理用户回答（流式）
+
+        与 process_answer 使用相同的合并键串行处理和合并重复请求，重复请求先回放已推送的事件再继续接收；
+        与非流式请求合并时只收到 done 事件
+
+        Args:
+            user_id: 用户ID
+            test_id: 测试ID
+            question_id: 问题ID
+            user_answer: 用户回答
+
         Returns:
-            Dict: 包含下一个问题或反馈的信息
+            AsyncIterator[Dict]: 形如 {"event": str, "data": dict} 的事件流
+        """
+        return self.single_flight.stream(
+            test_id,
+            ("answer",) + get_answer_key(test_id, question_id, user_answer),
+            lambda: self._process_answer_stream(user_id, test_id, question_id, user_answer)
+        )
+
+    async def _process_answer_stream(
+        self,
+        user_id: str,
+        test_id: str,
+        question_id: str,
+        user_answer: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        处理用户回答（流式）
+
+        与 process_answer 相同，但在图执行过程中逐步产出事件：
+        - feedback: 节点写入的反馈（重复问题、追问或完整的下一个问题）
+        - token: send_next_question 正在生成的问题片段
+        - done: 最终结果，包含 is_over / question_id
+
+        Args:
+            user_id: 用户ID
+            test_id: 测试ID
+            question_id: 问题ID
+            user_answer: 用户回答
+
+        Yields:
+            Dict: 形如 {"event": str, "data": dict} 的事件
         """
-        config = {
+        config = self._build_config(user_id, test_id)
+        next_question_id = str(uuid4())
+        # 生成的问题末尾带有标准答案行，不能推送给客户端
+        answer_key_filter = AnswerKeyStreamFilter()
+        changes: Dict[str, Any] = {}
+        interrupted = False
+
+        async for mode, chunk in self.workflow.astream(
+            self._answer_command(question_id, user_answer, next_question_id),
+            config=config,
+            stream_mode=["messages", "updates"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                # 只推送模型生成的增量片段，忽略节点写回状态的完整消息
+                if isinstance(message, AIMessageChunk) and metadata.get("langgraph_node") in STREAMING_NODES and message.content:
+                    content = answer_key_filter.feed(message.content)
+                    if content:
+                        yield {"event": "token", "data": {"content": content}}
+            elif mode == "updates":
+                interrupted = self._collect_updates(chunk, changes) or interrupted
+                for node, update in chunk.items():
+                    if isinstance(update, dict) and update.get("feedback"):
+                        yield {"event": "feedback", "data": {"node": node, "feedback": update["feedback"]}}
+
+        self._check_answer_accepted(question_id, changes)
+        self.session_manager.on_turn_completed(test_id)
+
+        feedback, is_over = await self._finish_turn(config, changes, interrupted)
+
+        yield {
+            "event": "done",
+            "data": {
+                "feedback": feedback,
+                "question_id": next_question_id,
+                "type": "question",
+                "is_over": is_over
+            }
+        }
+
+    @staticmethod
+    def _answer_command(question_id: str, user_answer: str, next_question_id: str) -> Command:
+        """
+        构建提交回答的恢复命令
+
+        回答节点在已加载的状态上检查 question_id 是否为等待回答的问题，
+        结果保留时间之后到达的重试请求不能被合并，如果不检查会被当作下一个问题的回答
+        """
+        return Command(resume="Go ahead", update={
+            "user_answer": user_answer,
+            "answered_question_id": question_id,
+            "next_question_id": next_question_id
+        })
+
+    @staticmethod
+    def _check_answer_accepted(question_id: str, changes: Dict[str, Any]) -> None:
+        """
+        接受回答的节点会将 question_id 更新为下一个问题ID，被拒绝的回答不改变面试状态
+
+        Raises:
+            DuplicateError: 回答的不是当前等待回答的问题
+        """
+        if "question_id" not in changes:
+            raise DuplicateError(f"该问题已经回答过或不是当前问题: {question_id}")
+
+    async def _get_completed_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """
+        没有工作流状态时检查测试是否已完成，避免已完成的测试重新开始面试
+
+        依次检查测试结果、尚未处理的完成事件和测试状态
+
+        Returns:
+            Optional[Dict]: 已完成时返回 is_over 为 True 的结果，否则返回 None
+        """
+        # 直接使用仓储查询，不存在时返回 None 而不是抛出 NotFoundError
+        qa_history: Optional[List[Dict[str, Any]]] = None
+        test_result = await self.test_result_service.repository.get_result_by_test_id(test_id)
+        if test_result is not None:
+            qa_history = test_result.qa_history
+        else:
+            event_result = await self.completion_outbox.get_test_result(test_id)
+            if event_result is not None:
+                qa_history = event_result["qa_history"]
+            else:
+                test = await self.test_service.repository.get_test_by_id(test_id)
+                if test is not None and test.status == TestStatus.COMPLETED.value:
+                    qa_history = []
+
+        if qa_history is None:
+            return None
+        logger.info(f"start chat, test is already completed: {test_id}")
+        return {
+            "feedback": None,
+            "question_id": str(uuid4()),
+            "type": "question",
+            "is_over": True,
+            "qa_history": qa_history
+        }
+
+    def _create_checkpointer(self, config: Config) -> BaseCheckpointSaver:
+        """根据配置创建工作流的 checkpointer，默认持久化到 MongoDB"""
+        if config.checkpointer.backend == "memory":
+            logger.info("Using in-memory checkpointer")
+            return InterviewMemorySaver()
+
+        logger.info(f"Using MongoDB checkpointer: {config.checkpointer.checkpoint_collection}")
+        return MongoCheckpointSaver(
+            checkpoint_collection=config.checkpointer.checkpoint_collection,
+            writes_collection=config.checkpointer.writes_collection
+        )
+
+    def _build_config(self, user_id: str, test_id: str) -> Dict[str, Any]:
+        """构建面试工作流的运行配置"""
+        return {
             "configurable": {
                 "thread_id": test_id, 
-                "user_id": user_id
+                "user_id": user_id,
+                "speculative_next_question": self.speculative_next_question,
+                "qa_history_token_budget": self.qa_history_token_budget,
+                "deferred_summary": self.deferred_summary,
+                "llm_policies": self.llm_policies
             },
             "model_name": self.model_name,
             # "model_name": "gpt-4o",
             # "model_name": "deepseek-v3",
         }
 
-        # resume the interview workflow
-        # pass user answer and get the result
-        # then generate next question
-        events = self.workflow.invoke(Command(resume="Go ahead", update={"user_answer": user_answer}), config=config)
-        for event in events:
-            pass
-
-        # get the snapshot state (next question is in the snapshot)
-        snapshot = self.workflow.get_state(config)
-        feedback = snapshot.values["feedback"]
-
-        # check if the interview is over
-        if "interview_result" in snapshot.values.keys():
-            # call test result service to update interview result
-            # async call
-            interview_result: InterviewResult = snapshot.values["interview_result"]  
-            logger.info(f"Interview is over, call test result service to update interview result {interview_result.model_dump_json(indent=2)}")
-
-            # 保存测试结果
-            test_result_service = TestResultService()
-            request = CreateTestResultRequest(
-                test_id=test_id,
-                user_id=user_id,
-                summary=interview_result.summary,
-                score=interview_result.score,
-                question_number=interview_result.total_question_number,
-                correct_number=interview_result.correct_question_number,
-                elapse_time=interview_result.interview_time,
-                qa_history=[{"question": q, "answer": a, "summary": s} for (q, a, s) in snapshot.values["qa_history"]]
-            )
-            await test_result_service.complete_test_result(request)
-
-            # 更新测试状态为已完成
-            await self.test_service.update_test_status_to_completed(test_id)
-
-            is_over = True
-        else:
-            is_over = False
+    async def _run_workflow(self, inputs: Any, config: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        执行工作流直到中断（等待用户回答）或结束
 
-        return {
-            "feedback": feedback,
-            "question_id": str(uuid4()),  # TODO: 需要从snapshot中获取
-            "type": "question",
-            "is_over": is_over
-        }
+        只消费 updates 模式的状态增量，不在每一步复制完整状态，也不在执行后重新读取 checkpoint
+
+        Args:
+            inputs: 工作流输入、恢复命令或 None（继续执行）
+            config: 工作流运行配置
+
+        Returns:
+            Tuple: (本次执行写入的状态字段，同一字段保留最后一次写入的值；是否停在中断处)
+        """
+        changes: Dict[str, Any] = {}
+        interrupted = False
+        async for chunk in self.workflow.astream(inputs, config=config, stream_mode="updates"):
+            interrupted = self._collect_updates(chunk, changes) or interrupted
+        return changes, interrupted
+
+    @staticmethod
+    def _collect_updates(chunk: Dict[str, Any], changes: Dict[str, Any]) -> bool:
+        """合并一步的节点更新，返回工作流是否在这一步中断"""
+        interrupted = False
+        for node, update in chunk.items():
+            if node == "__interrupt__":
+                interrupted = True
+            elif isinstance(update, dict):
+                changes.update(update)
+        return interrupted
+
+    async def _finish_turn(
+        self,
+        config: Dict[str, Any],
+        changes: Dict[str, Any],
+        interrupted: bool
+    ) -> Tuple[Optional[str], bool]:
+        """
+        根据本次执行的状态增量得到返回给用户的反馈以及面试是否结束
+
+        面试完成事件已由 summarize_interview 节点写入，只有本次执行没有写入反馈时才读取 checkpoint
+
+        Returns:
+            Tuple: (反馈内容, 面试是否结束)
+        """
+        is_over = "interview_result" in changes or not interrupted
+        if "feedback" in changes:
+            return changes["feedback"], is_over
+
+        values = (await self.workflow.aget_state(config)).values
+        return values.get("feedback"), is_over or "interview_result" in values
+
+    async def _on_interview_over(self, values: Dict[str, Any], config: Dict[str, Any]) -> None:
+        """summarize_interview 节点的回调，在写入结束面试的 checkpoint 之前写入面试完成事件"""
+        configurable = config["configurable"]
+        await self._complete_interview_if_over(configurable["user_id"], configurable["thread_id"], values)
+
+    async def _complete_interview_if_over(self, user_id: str, test_id: str, values: Dict[str, Any]) -> bool:
+        """
+        如果面试已结束，写入面试完成事件
+        测试结果的保存、测试状态的更新以及后台总结由 outbox dispatcher 异步完成
+
+        Args:
+            user_id: 用户ID
+            test_id: 测试ID
+            values: 工作流当前状态
+
+        Returns:
+            bool: 面试是否已结束
+        """
+        if "interview_result" not in values.keys():
+            return False
+
+        # call test result service to update interview result
+        interview_result: InterviewResult = values["interview_result"]  
+        logger.info(f"Interview is over, call test result service to update interview result {interview_result.model_dump_json(indent=2)}")
+
+        summary_pending: bool = values.get("summary_pending", False)
+
+        request = CreateTestResultRequest(
+            test_id=test_id,
+            user_id=user_id,
+            summary=interview_result.summary or PENDING_SUMMARY,
+            score=interview_result.score,
+            question_number=interview_result.total_question_number,
+            correct_number=interview_result.correct_question_number,
+            elapse_time=interview_result.interview_time,
+            qa_history=[{"question": q, "answer": a, "summary": s} for (q, a, s) in values["qa_history"]],
+            summary_status=SummaryStatus.PENDING.value if summary_pending else SummaryStatus.COMPLETED.value
+        )
+        # 同一测试只会写入一次完成事件，重复调用是安全的
+        await self.completion_outbox.enqueue(request, summary_pending, values)
+
+        return True
@@ -0,0 +1,233 @@
+import asyncio
+import functools
+from datetime import datetime, UTC, timedelta
+from typing import Any, Dict, Optional
+from loguru import logger
+from agent.agent_state import QAHistoryDigest
+from agent.interview_response import QAResult
+from api.model.api.test_result import CreateTestResultRequest
+from api.model.db.completion_outbox import CompletionOutbox
+from api.repositories.completion_outbox_repository import CompletionOutboxRepository
+from api.service.interview_summary import InterviewSummaryService
+from api.service.test import TestService
+from api.service.test_result import TestResultService
+
+
+class CompletionOutboxService:
+    """
+    面试完成事件的 outbox
+
+    面试结束时只写入一条完成事件（每个测试一条，重复写入会被忽略），
+    后台 dispatcher 批量领取事件，幂等地保存测试结果并将测试状态更新为已完成，
+    需要时再启动后台总结任务。
+
+    - 事件至少被处理一次：处理中的事件在租约过期后会被重新领取
+    - 需要后台总结的事件在总结写入后才标记为 done，总结生成期间定期续租，
+      进程崩溃时租约过期后重新领取，只重新生成总结，重新领取同样计入 attempts
+    - 处理失败按 retry_backoff_seconds * attempts 退避重试，超过 max_attempts 后标记为 failed
+    - 已处理的事件由 done_date 上的 TTL 索引在保留期（DONE_RETENTION_SECONDS）后删除
+    """
+
+    def __init__(
+        self,
+        test_service: TestService,
+        summary_service: InterviewSummaryService,
+        test_result_service: Optional[TestResultService] = None,
+        batch_size: int = 50,
+        poll_interval_seconds: float = 1.0,
+        lease_seconds: int = 60,
+        max_attempts: int = 10,
+        retry_backoff_seconds: int = 5
+    ):
+        """
+        Args:
+            test_service: 更新测试状态的服务
+            summary_service: 后台生成总结的服务
+            test_result_service: 保存测试结果的服务
+            batch_size: 每批领取的事件数量
+            poll_interval_seconds: 没有新事件通知时的轮询间隔
+            lease_seconds: 领取事件的租约时间，超时未完成的事件会被重新领取
+            max_attempts: 最大处理次数
+            retry_backoff_seconds: 失败后的重试退避时间
+        """
+        self.test_service = test_service
+        self.summary_service = summary_service
+        self.test_result_service = test_result_service or TestResultService()
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.repository = CompletionOutboxRepository()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._heartbeats: Dict[str, asyncio.Task] = {}
+
+    async def enqueue(
+        self,
+        request: CreateTestResultRequest,
+        summary_pending: bool,
+        values: Dict[str, Any]
+    ) -> None:
+        """
+        写入面试完成事件并唤醒 dispatcher
+
+        Args:
+            request: 需要保存的测试结果
+            summary_pending: 是否需要在后台生成总结
+            values: 已结束面试的工作流状态
+        """
+        created = await self.repository.enqueue(
+            test_id=request.test_id,
+            user_id=request.user_id,
+            test_result=request.model_dump(mode="json"),
+            summary_pending=summary_pending,
+            summary_state=dump_summary_state(values) if summary_pending else {}
+        )
+        if not created:
+            logger.info(f"Completion event already exists: {request.test_id}")
+        self._wakeup.set()
+
+    async def get_test_result(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取完成事件中的测试结果
+
+        Args:
+            test_id: 测试ID
+
+        Returns:
+            Optional[Dict]: CreateTestResultRequest 的字段，没有完成事件时返回 None
+        """
+        event = await self.repository.get_event(test_id)
+        return event.test_result if event is not None else None
+
+    async def dispatch_batch(self) -> Dict[str, int]:
+        """
+        领取并处理一批完成事件
+
+        Returns:
+            Dict: 本批处理的统计 {"done": n, "summarizing": n, "retried": n, "failed": n}
+        """
+        stats = {"done": 0, "summarizing": 0, "retried": 0, "failed": 0}
+        for event in await self.repository.claim_batch(self.batch_size, self.lease_seconds):
+            try:
+                if not event.applied:
+                    await self._apply(event)
+                    if event.summary_pending:
+                        await self.repository.mark_applied(event.test_id)
+            except Exception as e:
+                logger.error(f"Failed to apply completion event {event.test_id} (attempt {event.attempts}): {str(e)}")
+                retry_at = None
+                if event.attempts < self.max_attempts:
+                    retry_at = datetime.now(UTC) + timedelta(seconds=self.retry_backoff_seconds * event.attempts)
+                await self.repository.mark_failed(event.test_id, str(e), retry_at)
+                stats["retried" if retry_at else "failed"] += 1
+                continue
+
+            if event.summary_pending:
+                if event.applied and event.attempts > self.max_attempts \
+                        and not self.summary_service.is_running(event.test_id):
+                    # 总结多次未能写入（进程反复崩溃），保留本地计算的评分
+                    logger.error(f"Interview summary not written after {event.attempts - 1} attempts: {event.test_id}")
+                    await self.test_result_service.fail_summary(event.test_id)
+                    await self.repository.mark_failed(event.test_id, "summary not written before lease expired", None)
+                    stats["failed"] += 1
+                    continue
+                self.summary_service.schedule(event.test_id, load_summary_state(event.summary_state),
+                                              on_finished=functools.partial(self.repository.mark_done, event.test_id))
+                self._keep_leased(event.test_id)
+                stats["summarizing"] += 1
+                continue
+
+            await self.repository.mark_done(event.test_id)
+            stats["done"] += 1
+        return stats
+
+    def start(self) -> None:
+        """启动后台 dispatcher"""
+        if self._task is None or self._task.done():
+            # Event 绑定创建后首次等待它的事件循环，应用重新启动时重新创建
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Completion outbox dispatcher started, batch size {self.batch_size}")
+
+    async def stop(self) -> None:
+        """停止后台 dispatcher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Completion outbox dispatcher stopped")
+        for heartbeat in self._heartbeats.values():
+            heartbeat.cancel()
+        self._heartbeats.clear()
+
+    def _keep_leased(self, test_id: str) -> None:
+        """总结生成期间续租，避免其他 worker 重新领取事件并重复生成总结"""
+        heartbeat = self._heartbeats.get(test_id)
+        if heartbeat is None or heartbeat.done():
+            self._heartbeats[test_id] = asyncio.create_task(self._renew_lease(test_id))
+
+    async def _renew_lease(self, test_id: str) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.lease_seconds / 3)
+                if not self.summary_service.is_running(test_id):
+                    break
+                try:
+                    if not await self.repository.renew_lease(test_id, self.lease_seconds):
+                        break
+                except Exception as e:
+                    logger.error(f"Failed to renew completion event lease {test_id}: {str(e)}")
+        finally:
+            if self._heartbeats.get(test_id) is asyncio.current_task():
+                del self._heartbeats[test_id]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                # 一直处理到没有可领取的事件为止
+                while sum((await self.dispatch_batch()).values()) > 0:
+                    pass
+            except Exception as e:
+                logger.error(f"Completion outbox dispatch failed: {str(e)}")
+
+    async def _apply(self, event: CompletionOutbox) -> None:
+        """保存测试结果并更新测试状态，两者都是幂等操作，重复处理不会产生副作用"""
+        await self.test_result_service.complete_test_result(CreateTestResultRequest(**event.test_result))
+        await self.test_service.update_test_status_to_completed(event.test_id)
+
+
+def dump_summary_state(values: Dict[str, Any]) -> Dict[str, Any]:
+    """保存生成总结所需的工作流状态，QAResult 等对象转换为可存入 MongoDB 的字典"""
+    digest: Optional[QAHistoryDigest] = values.get("qa_history_digest")
+    return {
+        "job_title": values["job_title"],
+        "knowledge_points": values["knowledge_points"],
+        "interview_time": values["interview_time"],
+        "language": values["language"],
+        "qa_history": [
+            {"question": q, "answer": a, "qa_result": r.model_dump(mode="json")} for (q, a, r) in values["qa_history"]
+        ],
+        "qa_history_digest": digest.model_dump(mode="json") if digest else None
+    }
+
+
+def load_summary_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """dump_summary_state 的逆操作"""
+    digest = state.get("qa_history_digest")
+    return {
+        **state,
+        "qa_history": [
+            (qa["question"], qa["answer"], QAResult.model_validate(qa["qa_result"])) for qa in state["qa_history"]
+        ],
+        "qa_history_digest": QAHistoryDigest.model_validate(digest) if digest else None
+    }
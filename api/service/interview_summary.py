@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+from agent.workflow import generate_interview_summary
+from agent.interview_response import InterviewResult
+from api.service.test_result import TestResultService
+from utils.llm_metrics import llm_node
+
+
+class InterviewSummaryService:
+    """
+    面试总结后台任务
+
+    面试结束时评分已在本地计算并写入测试结果（summary_status 为 pending），
+    此服务在后台调用 LLM 生成面试总结，完成后写入测试结果并将 summary_status 更新为 completed，
+    失败时更新为 failed 并保留本地计算的评分。客户端可通过测试结果接口轮询 summary_status。
+    """
+
+    def __init__(self, model_name: str = "gpt-4o", test_result_service: Optional[TestResultService] = None):
+        """
+        Args:
+            model_name: 生成总结使用的模型
+            test_result_service: 写入总结的测试结果服务
+        """
+        self.model_name = model_name
+        self.test_result_service = test_result_service or TestResultService()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, test_id: str, values: Dict[str, Any],
+                 on_finished: Optional[Callable[[], Awaitable[Any]]] = None) -> None:
+        """
+        在后台生成面试总结
+
+        Args:
+            test_id: 测试ID
+            values: 已结束面试的工作流状态
+            on_finished: 总结（或失败状态）写入测试结果后调用，任务被取消时不会调用
+        """
+        task = self._tasks.get(test_id)
+        if task is not None and not task.done():
+            logger.info(f"Interview summary is already running: {test_id}")
+            return
+        self._tasks[test_id] = asyncio.create_task(self._summarize(test_id, values, on_finished))
+        self._tasks[test_id].add_done_callback(lambda _: self._tasks.pop(test_id, None))
+
+    def is_running(self, test_id: str) -> bool:
+        """总结是否正在当前进程中生成"""
+        task = self._tasks.get(test_id)
+        return task is not None and not task.done()
+
+    async def stop(self) -> None:
+        """取消尚未完成的总结任务"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+    async def _summarize(self, test_id: str, values: Dict[str, Any],
+                         on_finished: Optional[Callable[[], Awaitable[Any]]]) -> None:
+        try:
+            with llm_node("summarize_interview"):
+                result: InterviewResult = await generate_interview_summary(
+                    values, {"configurable": {"model_name": self.model_name}}
+                )
+            await self.test_result_service.complete_summary(test_id, result.summary, result.score)
+            logger.info(f"Interview summary completed: {test_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Interview summary failed {test_id}: {str(e)}")
+            await self.test_result_service.fail_summary(test_id)
+        if on_finished is not None:
+            await on_finished()
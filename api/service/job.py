@@ -7,8 +7,8 @@ from api.utils.log_decorator import log
 from api.exceptions.api_error import NotFoundError, DuplicateError
 
 class JobService:
-    def __init__(self):
-        self.repository = JobRepository()
+    def __init__(self, repository: Optional[JobRepository] = None):
+        self.repository = repository or JobRepository()
     
     @log
     async def create_job(self, request: CreateJobRequest) -> JobResponse:
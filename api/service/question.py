@@ -7,8 +7,8 @@ from api.utils.log_decorator import log
 from api.exceptions.api_error import NotFoundError, DuplicateError
 
 class QuestionService:
-    def __init__(self):
-        self.repository = QuestionRepository()
+    def __init__(self, repository: Optional[QuestionRepository] = None):
+        self.repository = repository or QuestionRepository()
     
     @log
     async def create_question(self, request: CreateQuestionRequest) -> QuestionResponse:
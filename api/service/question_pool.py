@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from loguru import logger
+from agent.workflow import generate_next_question
+from api.model.db.opening_question import OpeningQuestion
+from api.repositories.opening_question_repository import OpeningQuestionRepository
+from utils.llm_metrics import llm_node
+
+
+class QuestionPoolService:
+    """
+    预生成开场问题池
+
+    按面试配置（job_title, knowledge_points, difficulty, language, interview_time）预先生成第一个问题并保存到 MongoDB，
+    开始面试时直接从池中取出，池为空时由工作流实时生成。
+
+    - 取出问题后，若剩余数量低于 refill_threshold，则在后台补充至 depth
+    - 后台任务定期为最近使用过的配置补充问题
+    - 每个问题只会被取出一次，不会在不同面试者之间重复
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        depth: int = 5,
+        refill_threshold: int = 2,
+        refill_interval_seconds: int = 600,
+        max_configurations: int = 100,
+        model_name: str = "gpt-4o"
+    ):
+        """
+        Args:
+            enabled: 是否启用问题池
+            depth: 每个配置预生成的问题数量
+            refill_threshold: 剩余问题数量低于该值时触发补充
+            refill_interval_seconds: 后台补充的执行间隔
+            max_configurations: 后台补充跟踪的配置数量上限，超过时淘汰最久未使用的配置
+            model_name: 生成问题使用的模型
+        """
+        self.enabled = enabled
+        self.depth = depth
+        self.refill_threshold = refill_threshold
+        self.refill_interval_seconds = refill_interval_seconds
+        self.max_configurations = max_configurations
+        self.model_name = model_name
+        self.repository = OpeningQuestionRepository()
+        # pool_key -> 面试配置，按最近使用的顺序排列
+        self._configurations: Dict[str, Dict[str, Any]] = {}
+        self._refilling: Set[str] = set()
+        self._refill_tasks: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def pop(
+        self,
+        job_title: str,
+        knowledge_points: str,
+        difficulty: str,
+        language: str,
+        interview_time: int
+    ) -> Optional[str]:
+        """
+        从池中取出一个开场问题
+
+        Args:
+            job_title: 职位名称
+            knowledge_points: 考查要点
+            difficulty: 难度
+            language: 语言
+            interview_time: 面试时间（分钟）
+
+        Returns:
+            Optional[str]: 预生成的问题，池为空或未启用时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        pool_key = self.get_pool_key(job_title, knowledge_points, difficulty, language, interview_time)
+        self._track(pool_key, job_title, knowledge_points, difficulty, language, interview_time)
+
+        question: Optional[OpeningQuestion] = None
+        try:
+            question = await self.repository.pop_question(pool_key)
+            remaining = await self.repository.count_questions(pool_key)
+        except Exception as e:
+            logger.error(f"Failed to pop opening question {pool_key}: {str(e)}")
+            return None
+
+        if remaining < self.refill_threshold:
+            self._schedule_refill(pool_key)
+
+        if question is None:
+            logger.info(f"Opening question pool is empty: {pool_key}")
+            return None
+        logger.info(f"Use pooled opening question: {pool_key}, remaining {remaining}")
+        return question.question
+
+    async def refill(self, pool_key: str) -> int:
+        """
+        将指定配置的问题池补充至 depth
+
+        Args:
+            pool_key: 问题池的 key
+
+        Returns:
+            int: 本次生成的问题数量
+        """
+        configuration = self._configurations.get(pool_key)
+        if configuration is None or pool_key in self._refilling:
+            return 0
+
+        self._refilling.add(pool_key)
+        try:
+            missing = self.depth - await self.repository.count_questions(pool_key)
+            if missing <= 0:
+                return 0
+
+            results = await asyncio.gather(
+                *[self._generate(configuration) for _ in range(missing)],
+                return_exceptions=True
+            )
+            questions = [
+                OpeningQuestion(
+                    pool_key=pool_key,
+                    job_title=configuration["job_title"],
+                    knowledge_points=configuration["knowledge_points"],
+                    difficulty=configuration["difficulty"],
+                    language=configuration["language"],
+                    interview_time=configuration["interview_time"],
+                    question=result
+                )
+                for result in results if isinstance(result, str) and result
+            ]
+            for error in [result for result in results if isinstance(result, Exception)]:
+                logger.error(f"Failed to generate opening question {pool_key}: {str(error)}")
+
+            await self.repository.create_questions(questions)
+            logger.info(f"Refilled opening question pool {pool_key}: {len(questions)} questions")
+            return len(questions)
+        finally:
+            self._refilling.discard(pool_key)
+
+    def start(self) -> None:
+        """启动后台补充任务"""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Opening question pool started, depth {self.depth}, interval {self.refill_interval_seconds}s")
+
+    async def stop(self) -> None:
+        """停止后台补充任务"""
+        tasks = list(self._refill_tasks)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._refill_tasks.clear()
+
+    @staticmethod
+    def get_pool_key(job_title: str, knowledge_points: str, difficulty: str, language: str,
+                     interview_time: int) -> str:
+        """根据面试配置计算问题池的 key，面试时间会写入 prompt，不同时长的问题不共用"""
+        configuration = [job_title.strip(), knowledge_points.strip(), difficulty.strip().lower(), language.strip().lower(),
+                         int(interview_time)]
+        return hashlib.sha1(json.dumps(configuration, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refill_interval_seconds)
+            for pool_key in list(self._configurations.keys()):
+                try:
+                    await self.refill(pool_key)
+                except Exception as e:
+                    logger.error(f"Opening question pool refill failed {pool_key}: {str(e)}")
+
+    def _schedule_refill(self, pool_key: str) -> None:
+        if pool_key in self._refilling:
+            return
+        task = asyncio.create_task(self.refill(pool_key))
+        self._refill_tasks.add(task)
+        task.add_done_callback(self._on_refill_done)
+
+    def _on_refill_done(self, task: asyncio.Task) -> None:
+        self._refill_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Opening question pool refill failed: {str(task.exception())}")
+
+    def _track(self, pool_key: str, job_title: str, knowledge_points: str,
+               difficulty: str, language: str, interview_time: int) -> None:
+        self._configurations.pop(pool_key, None)
+        self._configurations[pool_key] = {
+            "job_title": job_title,
+            "knowledge_points": knowledge_points,
+            "difficulty": difficulty,
+            "language": language,
+            "interview_time": interview_time
+        }
+        # dict 保持插入顺序，最早插入的即最久未使用的配置
+        while len(self._configurations) > self.max_configurations:
+            self._configurations.pop(next(iter(self._configurations)))
+
+    async def _generate(self, configuration: Dict[str, Any]) -> str:
+        """使用与 kickoff_interview 相同的 prompt 生成第一个问题"""
+        state = {
+            **configuration,
+            "start_time": datetime.now(),
+            "qa_history": []
+        }
+        with llm_node("question_pool"):
+            return await generate_next_question(state, {"configurable": {"model_name": self.model_name}}, "None")
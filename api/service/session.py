@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, UTC, timedelta
+from typing import Any, Dict, List, Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from loguru import logger
+
+
+class SessionManager:
+    """
+    面试会话生命周期管理
+
+    - 每轮对话结束后在后台只保留线程最新的 checkpoint，不阻塞响应
+    - 定期清理已结束（interview_result 已生成）或长时间无活动的会话
+    - 统计每个会话及全部会话占用的存储大小
+
+    checkpointer 需要实现 alist_thread_ids / aget_thread_size / aprune，
+    InterviewMemorySaver 和 MongoCheckpointSaver 均已实现
+    """
+
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        idle_ttl_minutes: int = 120,
+        finished_ttl_minutes: int = 10,
+        sweep_interval_seconds: int = 300
+    ):
+        """
+        Args:
+            checkpointer: 工作流使用的 checkpointer
+            idle_ttl_minutes: 会话无活动超过该时间后被清理
+            finished_ttl_minutes: 面试结束后保留会话的时间（用于重新进入时展示结果）
+            sweep_interval_seconds: 后台清理的执行间隔
+        """
+        self.checkpointer = checkpointer
+        self.idle_ttl = timedelta(minutes=idle_ttl_minutes)
+        self.finished_ttl = timedelta(minutes=finished_ttl_minutes)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._prunes: Dict[str, asyncio.Task] = {}
+
+    def on_turn_completed(self, thread_id: str) -> None:
+        """
+        一轮对话结束后，在后台只保留该线程最新的 checkpoint
+
+        prune 只删除早于最新 checkpoint 的记录，与下一轮对话并发执行是安全的；
+        同一线程上一次 prune 尚未完成时跳过，剩余的历史由下一轮或定期清理压缩
+        """
+        prune = self._prunes.get(thread_id)
+        if prune is None or prune.done():
+            self._prunes[thread_id] = asyncio.create_task(self._prune(thread_id))
+
+    async def _prune(self, thread_id: str) -> None:
+        try:
+            await self.checkpointer.aprune([thread_id], strategy="keep_latest")
+        except Exception as e:
+            logger.error(f"Failed to prune session {thread_id}: {str(e)}")
+        finally:
+            if self._prunes.get(thread_id) is asyncio.current_task():
+                del self._prunes[thread_id]
+
+    async def sweep(self) -> Dict[str, int]:
+        """
+        清理已结束或已过期的会话，并压缩其余会话的历史 checkpoint
+
+        Returns:
+            Dict: 本次清理的统计 {"finished": n, "expired": n, "pruned": n}
+        """
+        now = datetime.now(UTC)
+        stats = {"finished": 0, "expired": 0, "pruned": 0}
+
+        for thread_id in await self.checkpointer.alist_thread_ids():
+            checkpoint_tuple = await self.checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+            if checkpoint_tuple is None:
+                continue
+
+            values: Dict[str, Any] = checkpoint_tuple.checkpoint.get("channel_values", {})
+            last_active = self._get_last_active(checkpoint_tuple.checkpoint)
+
+            if values.get("interview_result") is not None and now - last_active > self.finished_ttl:
+                logger.info(f"Evict finished session: {thread_id}")
+                await self.checkpointer.adelete_thread(thread_id)
+                stats["finished"] += 1
+            elif self._is_expired(values, last_active, now):
+                logger.info(f"Evict expired session: {thread_id}, last active at {last_active}")
+                await self.checkpointer.adelete_thread(thread_id)
+                stats["expired"] += 1
+            else:
+                await self.checkpointer.aprune([thread_id], strategy="keep_latest")
+                stats["pruned"] += 1
+
+        logger.info(f"Session sweep completed: {stats}")
+        return stats
+
+    async def get_usage(self) -> Dict[str, Any]:
+        """
+        统计会话占用的存储大小
+
+        Returns:
+            Dict: {"total_sessions": n, "total_bytes": n, "sessions": [...]}
+        """
+        sessions: List[Dict[str, Any]] = []
+        for thread_id in await self.checkpointer.alist_thread_ids():
+            checkpoint_tuple = await self.checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+            if checkpoint_tuple is None:
+                continue
+            values = checkpoint_tuple.checkpoint.get("channel_values", {})
+            sessions.append({
+                "thread_id": thread_id,
+                "size_bytes": await self.checkpointer.aget_thread_size(thread_id),
+                "last_active": self._get_last_active(checkpoint_tuple.checkpoint),
+                "is_finished": values.get("interview_result") is not None
+            })
+
+        return {
+            "total_sessions": len(sessions),
+            "total_bytes": sum(session["size_bytes"] for session in sessions),
+            "sessions": sessions
+        }
+
+    def start(self) -> None:
+        """启动后台清理任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Session sweeper started, interval {self.sweep_interval_seconds}s")
+
+    async def stop(self) -> None:
+        """停止后台清理任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Session sweeper stopped")
+        for prune in self._prunes.values():
+            prune.cancel()
+        self._prunes.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {str(e)}")
+
+    def _is_expired(self, values: Dict[str, Any], last_active: datetime, now: datetime) -> bool:
+        """会话无活动超过 TTL，或已超出面试时间 + TTL，则视为已放弃"""
+        if now - last_active > self.idle_ttl:
+            return True
+
+        start_time: Optional[datetime] = values.get("start_time")
+        interview_time: Optional[int] = values.get("interview_time")
+        if start_time is None or interview_time is None:
+            return False
+        if start_time.tzinfo is None:
+            # start_time 在工作流中为本地时间
+            start_time = start_time.astimezone(UTC)
+        return now > start_time + timedelta(minutes=interview_time) + self.idle_ttl
+
+    def _get_last_active(self, checkpoint: Dict[str, Any]) -> datetime:
+        """checkpoint 的 ts 字段即线程最后一次写入的时间"""
+        last_active = datetime.fromisoformat(checkpoint["ts"])
+        if last_active.tzinfo is None:
+            last_active = last_active.replace(tzinfo=UTC)
+        return last_active
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from loguru import logger
+
+
+def get_answer_key(test_id: str, question_id: str, user_answer: str) -> Tuple[str, str, str]:
+    """回答请求的合并键 (test_id, question_id, 回答哈希)"""
+    return test_id, question_id, hashlib.sha1(user_answer.encode("utf-8")).hexdigest()
+
+
+class _ThreadLock:
+    """带引用计数的面试锁，没有请求持有或等待时删除"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class _SharedStream:
+    """进行中的流式请求，记录已产出的事件，后加入的订阅者先回放再继续接收"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.changed = asyncio.Condition()
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None) -> None:
+        async with self.changed:
+            self.error = error
+            self.done = True
+            self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        index = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: index < len(self.events) or self.done)
+                events = self.events[index:]
+                done, error = self.done, self.error
+            for event in events:
+                yield event
+            index += len(events)
+            if done and index >= len(self.events):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """
+    面试请求的串行化与合并
+
+    - 同一面试（thread_id）的请求按到达顺序串行执行，不会同时运行同一个工作流线程
+    - 相同合并键的重复请求（双击、前端重试）等待并共享进行中请求的结果，不会再次调用 LLM；
+      成功的结果在 result_ttl_seconds 内保留，迟到的重试直接返回该结果
+    - 请求在独立的任务中执行，发起请求的连接断开不会中断正在进行的面试轮次
+    """
+
+    def __init__(self, result_ttl_seconds: float = 30):
+        """
+        Args:
+            result_ttl_seconds: 已完成请求的结果保留时间
+        """
+        self.result_ttl_seconds = result_ttl_seconds
+        self._locks: Dict[str, _ThreadLock] = {}
+        # 合并键 -> 进行中或已完成的请求
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        # 合并键 -> 结果过期时间
+        self._expires: Dict[Hashable, float] = {}
+
+    async def run(self, thread_id: str, key: Hashable, func: Callable[[], Awaitable[Any]],
+                  keep_result: bool = True) -> Any:
+        """
+        在面试的串行队列中执行请求，相同合并键的请求共享结果
+
+        Args:
+            thread_id: 面试ID
+            key: 合并键
+            func: 实际执行请求的协程函数
+            keep_result: 完成后是否保留结果，幂等的请求可以不保留，完成后的重复请求会重新执行
+
+        Returns:
+            Any: 请求结果
+        """
+        self._expire()
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(self._serialized(thread_id, func))
+            self._calls[key] = call
+            call.add_done_callback(lambda task: self._on_done(key, task, keep_result=keep_result))
+        else:
+            logger.info(f"Coalesced duplicate request: {key}")
+        return await asyncio.shield(call)
+
+    async def stream(self, thread_id: str, key: Hashable,
+                     func: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式版本的 run，重复请求回放已产出的事件并继续接收后续事件
+
+        Args:
+            thread_id: 面试ID
+            key: 合并键
+            func: 返回事件流的函数
+
+        Yields:
+            Dict: 事件
+        """
+        self._expire()
+        shared = self._streams.get(key)
+        if shared is None:
+            shared = _SharedStream()
+            self._streams[key] = shared
+
+            async def produce() -> None:
+                try:
+                    async with self._serialize(thread_id):
+                        async for event in func():
+                            await shared.publish(event)
+                except BaseException as e:
+                    await shared.finish(e)
+                    raise
+                await shared.finish()
+
+            task = asyncio.ensure_future(produce())
+            task.add_done_callback(lambda task: self._on_done(key, task, stream=True))
+        else:
+            logger.info(f"Coalesced duplicate stream request: {key}")
+
+        async for event in shared.subscribe():
+            yield event
+
+    async def _serialized(self, thread_id: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._serialize(thread_id):
+            return await func()
+
+    @asynccontextmanager
+    async def _serialize(self, thread_id: str) -> AsyncIterator[None]:
+        """持有面试锁，锁在最后一个使用者退出后删除；期间的日志记录带有 test_id 字段"""
+        thread_lock = self._locks.setdefault(thread_id, _ThreadLock())
+        thread_lock.users += 1
+        try:
+            async with thread_lock.lock:
+                with logger.contextualize(test_id=thread_id):
+                    yield
+        finally:
+            thread_lock.users -= 1
+            if thread_lock.users == 0:
+                self._locks.pop(thread_id, None)
+
+    def _on_done(self, key: Hashable, task: asyncio.Future, stream: bool = False, keep_result: bool = True) -> None:
+        calls = self._streams if stream else self._calls
+        if task.cancelled() or task.exception() is not None or not keep_result:
+            # 失败的请求不保留结果，允许重试
+            calls.pop(key, None)
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = time.monotonic() + self.result_ttl_seconds
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, expires in self._expires.items() if expires <= now]:
+            self._expires.pop(key, None)
+            self._calls.pop(key, None)
+            self._streams.pop(key, None)
@@ -15,11 +15,17 @@ from api.constants.common import TestStatus, TestType, Language, Difficulty
 from loguru import logger
 
 class TestService:
-    def __init__(self):
-        self.repository = TestRepository()
-        self.job_repository = JobRepository()
-        self.user_repository = UserRepository()
-        self.question_repository = QuestionRepository()
+    def __init__(
+        self,
+        repository: Optional[TestRepository] = None,
+        job_repository: Optional[JobRepository] = None,
+        user_repository: Optional[UserRepository] = None,
+        question_repository: Optional[QuestionRepository] = None
+    ):
+        self.repository = repository or TestRepository()
+        self.job_repository = job_repository or JobRepository()
+        self.user_repository = user_repository or UserRepository()
+        self.question_repository = question_repository or QuestionRepository()
     
     def _generate_activate_code(self, length=4) -> str:
         """生成指定长度的数字激活码，默认为4位"""
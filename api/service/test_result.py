@@ -8,16 +8,22 @@ from api.repositories.test_repository import TestRepository
 from api.repositories.user_repository import UserRepository
 from api.utils.log_decorator import log
 from api.exceptions.api_error import NotFoundError, ValidationError
+from api.constants.common import SummaryStatus
 from loguru import logger
 
 class TestResultService:
     """测试结果服务类"""
     
-    def __init__(self):
-        """初始化测试结果服务"""
-        self.repository = TestResultRepository()
-        self.test_repository = TestRepository()
-        self.user_repository = UserRepository()
+    def __init__(
+        self,
+        repository: Optional[TestResultRepository] = None,
+        test_repository: Optional[TestRepository] = None,
+        user_repository: Optional[UserRepository] = None
+    ):
+        """初始化测试结果服务，未传入的仓储自行创建"""
+        self.repository = repository or TestResultRepository()
+        self.test_repository = test_repository or TestRepository()
+        self.user_repository = user_repository or UserRepository()
     
     @log
     async def complete_test_result(self, request: CreateTestResultRequest) -> TestResultResponse:
@@ -43,6 +49,7 @@ class TestResultService:
             existing_result.correct_number = request.correct_number
             existing_result.elapse_time = request.elapse_time
             existing_result.qa_history = request.qa_history
+            existing_result.summary_status = request.summary_status
             
             # 保存更新
             updated_result = await self.repository.create_result(existing_result)
@@ -59,7 +66,8 @@ class TestResultService:
                 question_number=request.question_number,
                 correct_number=request.correct_number,
                 elapse_time=request.elapse_time,
-                qa_history=request.qa_history
+                qa_history=request.qa_history,
+                summary_status=request.summary_status
             )
             
             # 保存到数据库
@@ -68,6 +76,30 @@ class TestResultService:
             
             return self._to_response(created_result)
 
+    @log
+    async def complete_summary(self, test_id: str, summary: str, score: float) -> None:
+        """
+        写入后台生成的面试总结，并将总结状态更新为已完成
+        
+        Args:
+            test_id: 测试ID
+            summary: 面试总结
+            score: 面试评分
+        """
+        updated = await self.repository.update_summary(test_id, summary, score, SummaryStatus.COMPLETED.value)
+        if not updated:
+            logger.warning(f"测试结果不存在，无法写入总结: {test_id}")
+
+    @log
+    async def fail_summary(self, test_id: str) -> None:
+        """
+        将总结状态更新为失败，保留本地计算的评分
+        
+        Args:
+            test_id: 测试ID
+        """
+        await self.repository.update_summary_status(test_id, SummaryStatus.FAILED.value)
+
 
     @log
     async def create_test_result(self, request: CreateTestResultRequest) -> TestResultResponse:
@@ -200,6 +232,7 @@ class TestResultService:
             question_number=test_result.question_number,
             correct_number=test_result.correct_number,
             elapse_time=test_result.elapse_time,
-            qa_history=test_result.qa_history
+            qa_history=test_result.qa_history,
+            summary_status=test_result.summary_status
         )
 
@@ -4,12 +4,12 @@ from api.model.api.user import CreateUserRequest, UpdateUserRequest, UserRespons
 from api.model.db.user import User
 from api.repositories.user_repository import UserRepository
 from api.utils.log_decorator import log
-from typing import List
+from typing import List, Optional
 from api.exceptions.api_error import ValidationError, NotFoundError, DuplicateError
 
 class UserService:
-    def __init__(self):
-        self.repository = UserRepository()
+    def __init__(self, repository: Optional[UserRepository] = None):
+        self.repository = repository or UserRepository()
     
     @log
     async def create_user(self, request: CreateUserRequest) -> UserResponse:
@@ -1,58 +1,115 @@
 import functools
+import inspect
+import random
+import reprlib
 import time
 import traceback
+from dataclasses import dataclass
 from loguru import logger
-from typing import Any, Callable
+from mongoengine.base import BaseDocument
+from mongoengine.queryset import QuerySet
+from typing import Any, Callable, Optional
+from utils.metrics import metrics_registry
 
-def log(func: Callable) -> Callable:
+CALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+call_duration = metrics_registry.histogram(
+    "method_call_duration_seconds", "Wall time of repository and service methods", ("method", "outcome"),
+    CALL_BUCKETS)
+
+
+@dataclass
+class LogSettings:
+    # level of the entry and exit records, errors are always logged as ERROR
+    level: str = "INFO"
+    # share of the calls whose entry and exit are logged
+    sample_rate: float = 1.0
+    # max length of a logged argument or result
+    max_repr_length: int = 200
+
+
+log_settings = LogSettings()
+
+
+class _SummaryRepr(reprlib.Repr):
+    """Short reprs: documents by class and id, query sets without running the query"""
+
+    def __init__(self, max_length: int):
+        super().__init__()
+        self.maxstring = max_length
+        self.maxother = max_length
+        self.maxlist = self.maxtuple = self.maxdict = self.maxset = 5
+        self.maxlevel = 3
+
+    def repr1(self, x: Any, level: int) -> str:
+        if isinstance(x, BaseDocument):
+            return f"<{type(x).__name__} {getattr(x, 'pk', None)}>"
+        if isinstance(x, QuerySet):
+            return f"<QuerySet {x._document.__name__}>"
+        if isinstance(x, (list, tuple)) and x and isinstance(x[0], BaseDocument):
+            return f"<{len(x)} {type(x[0]).__name__}>"
+        return super().repr1(x, level)
+
+
+def summarize(value: Any, max_length: Optional[int] = None) -> str:
+    """Truncated repr of an argument or result, documents are reduced to their class and id"""
+    max_length = max_length or log_settings.max_repr_length
+    text = _SummaryRepr(max_length).repr(value)
+    return text if len(text) <= max_length else text[:max_length] + "..."
+
+
+def log(func: Optional[Callable] = None, *, level: Optional[str] = None,
+        sample_rate: Optional[float] = None) -> Callable:
     """
     A decorator that logs function entry and exit with parameters and result
+
+    Arguments and results are only formatted when the level is enabled, and summarized
+    instead of dumped. Entry and exit are logged for a sample of the calls, errors always.
+    The duration of every call is recorded in method_call_duration_seconds.
+    Use as @log, or @log(level=..., sample_rate=...) to override log_settings.
     """
+    if func is None:
+        return functools.partial(log, level=level, sample_rate=sample_rate)
+
+    name = func.__qualname__
+    is_method = next(iter(inspect.signature(func).parameters), None) in ("self", "cls")
+
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
-        # Get function name and arguments
-        func_name = func.__name__
-        class_name = args[0].__class__.__name__ if args else None
-        
-        # Log function entry
-        logger.info(
-            f"Enter {class_name}.{func_name}\n"
-            f"Args: {args[1:] if class_name else args}\n"
-            f"Kwargs: {kwargs}"
-        )
-        
-        # Record start time
-        start_time = time.time()
-        
+        rate = log_settings.sample_rate if sample_rate is None else sample_rate
+        sampled = rate >= 1 or random.random() < rate
+        call_level = level or log_settings.level
+        call_args = args[1:] if is_method else args
+
+        if sampled:
+            logger.opt(lazy=True).log(
+                call_level, "Enter {}\nArgs: {}\nKwargs: {}",
+                lambda: name, lambda: summarize(call_args), lambda: summarize(kwargs)
+            )
+
+        start_time = time.perf_counter()
         try:
-            # Execute function
             result = await func(*args, **kwargs)
-            
-            # Calculate execution time
-            execution_time = time.time() - start_time
-            
-            # Log successful execution with time
-            logger.info(
-                f"Exit {class_name}.{func_name}\n"
-                f"Result: {result}\n"
-                f"Execution time: {execution_time:.3f}s"
-            )
-            return result
-            
         except Exception as e:
-            # Calculate execution time even for errors
-            execution_time = time.time() - start_time
-            
-            # Capture the stack trace
-            stack_trace = traceback.format_exc()
-            
-            # Log error with stack trace and time
-            logger.error(
-                f"Error in {class_name}.{func_name}\n"
+            execution_time = time.perf_counter() - start_time
+            call_duration.observe(execution_time, method=name, outcome="error")
+            logger.bind(method=name, duration=execution_time).error(
+                f"Error in {name}\n"
+                f"Args: {summarize(call_args)}\n"
+                f"Kwargs: {summarize(kwargs)}\n"
                 f"Error: {str(e)}\n"
-                f"Stack trace: {stack_trace}\n"
+                f"Stack trace: {traceback.format_exc()}\n"
                 f"Execution time: {execution_time:.3f}s"
             )
             raise
-    
-    return wrapper 
\ No newline at end of file
+
+        execution_time = time.perf_counter() - start_time
+        call_duration.observe(execution_time, method=name, outcome="success")
+        if sampled:
+            logger.bind(method=name, duration=execution_time).opt(lazy=True).log(
+                call_level, "Exit {}\nResult: {}\nExecution time: {}s",
+                lambda: name, lambda: summarize(result), lambda: f"{execution_time:.3f}"
+            )
+        return result
+
+    return wrapper
@@ -16,7 +16,7 @@ setup(
         "hydra-core>=1.3.2",
         "omegaconf>=2.3.0",
         "mongoengine>=0.26.0",
-        "pymongo>=4.5.0",
+        "pymongo>=4.10.0",
         "pydantic-mongoengine>=0.1.0",
         "pydantic-settings>=2.0.3",
         "pydantic-mongoengine>=0.1.0",
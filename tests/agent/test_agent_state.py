@@ -0,0 +1,64 @@
+from agent.agent_state import get_qa_history, compact_qa_history, estimate_tokens, QAHistoryDigest
+from agent.interview_response import QAResult, Question, Answer, QuestionType
+
+
+def _qa_tuple(number: int, is_correct: bool = True, knowledge_point: str = "React") -> tuple:
+    qa_result = QAResult(
+        question=Question(
+            question=f"Q{number}. What is React?",
+            question_number=number,
+            question_type=QuestionType.SINGLE_CHOICE,
+            knowledge_point=knowledge_point,
+            answer="A"
+        ),
+        answer=Answer(
+            is_valid=True,
+            giveup=False,
+            suggest_more_details=False,
+            follow_up_question="",
+            feedback="ok",
+            is_correct=is_correct,
+            analysis="",
+            score=5 if is_correct else 0
+        ),
+        is_interview_over=False,
+        summary=f"Q{number} : {knowledge_point} A Score:{5 if is_correct else 0} " + "x" * 80
+    )
+    return (qa_result.question.question, "A", qa_result)
+
+
+def test_history_within_budget_is_not_compacted():
+    qa_history = [_qa_tuple(i) for i in range(1, 4)]
+
+    assert compact_qa_history(qa_history, None, token_budget=1000) is None
+    assert get_qa_history(qa_history) == "\n".join(qa[2].summary for qa in qa_history)
+
+
+def test_history_is_bounded_by_token_budget():
+    budget = 100
+    qa_history = []
+    digest = None
+    for i in range(1, 51):
+        qa_history.append(_qa_tuple(i, is_correct=i % 2 == 0, knowledge_point=f"KP{i % 3}"))
+        digest = compact_qa_history(qa_history, digest, token_budget=budget)
+        rendered = get_qa_history(qa_history, digest)
+        assert estimate_tokens(rendered) <= budget + 50
+
+    assert digest.turns < len(qa_history)
+    assert digest.correct == sum(1 for qa in qa_history[:digest.turns] if qa[2].answer.is_correct)
+    assert sorted(digest.knowledge_points) == ["KP0", "KP1", "KP2"]
+    # the latest turn is always rendered in full after the digest
+    assert rendered.startswith(digest.text)
+    assert rendered.endswith(qa_history[-1][2].summary)
+
+
+def test_digest_is_extended_incrementally():
+    qa_history = [_qa_tuple(i) for i in range(1, 4)]
+    digest = QAHistoryDigest().fold([qa[2] for qa in qa_history[:2]])
+
+    extended = digest.fold([qa_history[2][2]])
+
+    assert extended.turns == 3
+    assert extended.score == 15
+    assert extended.text.startswith("Q1-Q3 (compacted)")
+    assert digest.turns == 2
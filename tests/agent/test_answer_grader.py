@@ -0,0 +1,87 @@
+import pytest
+from agent.answer_grader import (
+    split_answer_key,
+    grade_answer_locally,
+    normalize_choice_answer,
+    normalize_true_false_answer,
+    AnswerKeyStreamFilter
+)
+from agent.interview_response import Question, QuestionType
+
+QUESTION = "Q2. Which hook stores state? (Single Choice)\n\nA. useState\n\nB. useEffect\n\nC. useMemo\n\nD. useRef"
+
+
+def _key(question_type: QuestionType = QuestionType.SINGLE_CHOICE, answer: str = "A") -> Question:
+    return Question(question=QUESTION, question_number=2, question_type=question_type,
+                    knowledge_point="React Hooks", answer=answer)
+
+
+def test_split_answer_key():
+    text = QUESTION + '\n\n<answer_key>{"question_number": 2, "question_type": "Single Choice", "answer": "A", "knowledge_point": "React Hooks"}</answer_key>'
+
+    question, key = split_answer_key(text)
+
+    assert question == QUESTION
+    assert key.question_type == QuestionType.SINGLE_CHOICE
+    assert key.answer == "A"
+    assert key.question_number == 2
+
+
+def test_split_without_or_with_invalid_answer_key():
+    assert split_answer_key(QUESTION) == (QUESTION, None)
+    assert split_answer_key(QUESTION + "\n<answer_key>{not json</answer_key>") == (QUESTION, None)
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("A", ["A"]), ("a", ["A"]), ("Ａ", ["A"]), ("选A", ["A"]), ("答案是：B", ["B"]),
+    ("I choose C", ["C"]), ("(D)", ["D"]), ("B.", ["B"]),
+    ("A because it stores state", None), ("", None), ("A, C", None)
+])
+def test_normalize_single_choice(answer, expected):
+    assert normalize_choice_answer(answer) == expected
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("A,C", ["A", "C"]), ("c、a", ["A", "C"]), ("AC", ["A", "C"]), ("A and C", ["A", "C"]), ("Ａ，Ｃ", ["A", "C"])
+])
+def test_normalize_multiple_choice(answer, expected):
+    assert normalize_choice_answer(answer, multiple=True) == expected
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("True", True), ("对", True), ("正确", True), ("F", False), ("错误", False), ("maybe", None)
+])
+def test_normalize_true_false(answer, expected):
+    assert normalize_true_false_answer(answer) == expected
+
+
+def test_grade_single_choice_locally():
+    correct = grade_answer_locally(_key(), "选Ａ", "Chinese")
+    wrong = grade_answer_locally(_key(), "B", "English")
+
+    assert correct.answer.is_correct and correct.answer.score == 5
+    assert correct.answer.feedback == "已收到您的回答。"
+    assert correct.summary.startswith("Q2 : React Hooks")
+    assert not wrong.answer.is_correct and wrong.answer.score == 0
+
+
+def test_grade_multiple_choice_partial_score():
+    result = grade_answer_locally(_key(QuestionType.MULTIPLE_CHOICE, "A,B,C"), "A,B", "English")
+
+    assert not result.answer.is_correct
+    assert result.answer.score == 3
+
+
+def test_ambiguous_or_open_answers_need_llm():
+    assert grade_answer_locally(None, "A", "English") is None
+    assert grade_answer_locally(_key(), "I think A or B", "English") is None
+    # option E does not exist in the question
+    assert grade_answer_locally(_key(), "E", "English") is None
+    assert grade_answer_locally(_key(QuestionType.SHORT_ANSWER, "useState"), "useState", "English") is None
+
+
+def test_stream_filter_removes_answer_key():
+    stream_filter = AnswerKeyStreamFilter()
+    chunks = ["Q2. Which hook", " stores state?\n\n<ans", "wer_key>{\"answer\":", " \"A\"}</answer_key>"]
+
+    assert "".join(stream_filter.feed(chunk) for chunk in chunks) == "Q2. Which hook stores state?"
@@ -0,0 +1,50 @@
+import pytest
+from agent.answer_triage import triage_answer, is_gibberish, build_triage_result, AnswerTriage
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ("结束面试", AnswerTriage.STOP),
+    ("I want to End Interview now", AnswerTriage.STOP),
+    ("stop the interview please", AnswerTriage.STOP),
+    ("skip", AnswerTriage.GIVEUP),
+    ("Pass this question.", AnswerTriage.GIVEUP),
+    ("I don't know", AnswerTriage.GIVEUP),
+    ("不会", AnswerTriage.GIVEUP),
+    ("跳过！", AnswerTriage.GIVEUP),
+    ("Next question", AnswerTriage.GIVEUP),
+    ("下一题", AnswerTriage.GIVEUP),
+    ("", AnswerTriage.INVALID),
+    ("   ", AnswerTriage.INVALID),
+    ("???", AnswerTriage.INVALID),
+    ("adfadsfdasf", AnswerTriage.INVALID),
+    ("aaaaaa", AnswerTriage.INVALID),
+    ("A", AnswerTriage.NEEDS_LLM),
+    ("[]", AnswerTriage.NEEDS_LLM),
+    ("useState", AnswerTriage.NEEDS_LLM),
+    ("next", AnswerTriage.NEEDS_LLM),
+    ("pass", AnswerTriage.NEEDS_LLM),
+    ("过", AnswerTriage.NEEDS_LLM),
+    ("I don't know exactly, but useEffect runs after render", AnswerTriage.NEEDS_LLM),
+    ("虚拟DOM可以减少直接操作真实DOM的次数", AnswerTriage.NEEDS_LLM),
+])
+def test_triage_answer(answer, expected):
+    assert triage_answer(answer) == expected
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("adfadsfdasf", True), ("xcvbnm", True), ("asdasdasd", True), ("qwrtpsdfg", True),
+    ("strengths", False), ("rhythm", False), ("typescript", False), ("banana", False), ("o(n)", False)
+])
+def test_is_gibberish(word, expected):
+    assert is_gibberish(word) == expected
+
+
+def test_giveup_moves_on_and_invalid_repeats():
+    giveup = build_triage_result(AnswerTriage.GIVEUP, "Q3. What is JSX?", None, "skip", "English")
+    invalid = build_triage_result(AnswerTriage.INVALID, "Q3. What is JSX?", None, "asdfgh", "Chinese")
+
+    assert giveup.answer.giveup and giveup.answer.is_valid and giveup.answer.score == 0
+    assert giveup.question.question_number == 3
+    assert not invalid.answer.is_valid and not invalid.answer.giveup
+    assert invalid.answer.feedback == "没有识别到有效的回答，请重新作答。"
+    assert build_triage_result(AnswerTriage.NEEDS_LLM, "Q3. What is JSX?", None, "A", "English") is None
@@ -0,0 +1,239 @@
+import pytest
+import asyncio
+import uuid
+from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+from langchain_core.messages import AIMessage
+from langgraph.types import Command
+from agent.workflow import build_graph
+from agent.interview_response import QAResult, Question, Answer, QuestionType, GradeAndAskResult
+
+
+def _qa_result(is_over: bool = False) -> QAResult:
+    return QAResult(
+        question=Question(
+            question="Q1. What is React?",
+            question_number=1,
+            question_type=QuestionType.SINGLE_CHOICE,
+            knowledge_point="React",
+            answer="A"
+        ),
+        answer=Answer(
+            is_valid=True,
+            giveup=False,
+            suggest_more_details=False,
+            follow_up_question="",
+            feedback="ok",
+            is_correct=True,
+            analysis="",
+            score=5
+        ),
+        is_interview_over=is_over,
+        summary="Q1 : React A Score:5 ok"
+    )
+
+
+def _inputs() -> dict:
+    return {
+        "start_time": datetime.now(),
+        "end_time": datetime.now(),
+        "messages": [],
+        "job_title": "React Web Developer",
+        "knowledge_points": "React",
+        "interview_time": 30,
+        "language": "English",
+        "difficulty": "Easy"
+    }
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=AIMessage(content="Q1. What is React?"))
+    return model
+
+
+@pytest.mark.asyncio
+async def test_kickoff_interview_is_async(mock_model):
+    """kickoff_interview should await the model instead of blocking"""
+    with patch("agent.workflow.get_model", return_value=mock_model):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke(_inputs(), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.next == ("analyze_answer",)
+    assert snapshot.values["feedback"] == "Q1. What is React?"
+    mock_model.ainvoke.assert_awaited_once()
+    mock_model.invoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_answer_turn_is_async(mock_model):
+    """analyze_answer and send_next_question should both run through ainvoke"""
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result())):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke(_inputs(), config=config)
+        mock_model.ainvoke.return_value = AIMessage(content="Q2. What is JSX?")
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "A"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.next == ("analyze_answer",)
+    assert snapshot.values["feedback"] == "Q2. What is JSX?"
+    assert len(snapshot.values["qa_history"]) == 1
+    assert mock_model.ainvoke.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_speculative_next_question_runs_concurrently(mock_model):
+    """The next question is generated while the answer is analyzed and committed"""
+    generation_started = asyncio.Event()
+
+    async def generate(messages):
+        generation_started.set()
+        return AIMessage(content="Q2. What is JSX?")
+
+    async def analyze(*args, **kwargs):
+        # only completes if the next question is generated concurrently
+        await asyncio.wait_for(generation_started.wait(), timeout=1)
+        return _qa_result()
+
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=analyze):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4()), "speculative_next_question": True}}
+        await graph.ainvoke(_inputs(), config=config)
+        mock_model.ainvoke = AsyncMock(side_effect=generate)
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "A"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.values["feedback"] == "Q2. What is JSX?"
+    assert snapshot.values["prepared_question"] is None
+    # the speculative question is reused, send_next_question does not call the model again
+    mock_model.ainvoke.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_speculative_next_question_discarded_on_repeat(mock_model):
+    """The speculative question is discarded when the question has to be repeated"""
+    invalid = _qa_result()
+    invalid.answer.is_valid = False
+    invalid.answer.feedback = "Please choose one of the options"
+
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=invalid)):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4()), "speculative_next_question": True}}
+        await graph.ainvoke(_inputs(), config=config)
+        mock_model.ainvoke.return_value = AIMessage(content="Q2. What is JSX?")
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "hmm"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.values["feedback"] == "Please choose one of the options"
+    assert snapshot.values["question"] == "Q1. What is React?"
+    assert snapshot.values["prepared_question"] is None
+
+
+
+@pytest.mark.asyncio
+async def test_grade_and_ask_uses_single_call(mock_model):
+    """In grade_and_ask mode one structured call grades the answer and asks the next question"""
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock()) as analyze:
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke({**_inputs(), "answer_mode": "grade_and_ask"}, config=config)
+        snapshot = await graph.aget_state(config)
+        assert snapshot.next == ("grade_and_ask",)
+
+        mock_model.ainvoke = AsyncMock(return_value=GradeAndAskResult(
+            qa_result=_qa_result(), next_question="Q2. What is JSX?"
+        ))
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "A"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.next == ("grade_and_ask",)
+    assert snapshot.values["feedback"] == "Q2. What is JSX?"
+    assert snapshot.values["prepared_question"] is None
+    assert len(snapshot.values["qa_history"]) == 1
+    mock_model.ainvoke.assert_awaited_once()
+    analyze.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_kickoff_interview_uses_prepared_question(mock_model):
+    """A question taken from the opening question pool skips the kickoff model call"""
+    with patch("agent.workflow.get_model", return_value=mock_model):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke({**_inputs(), "prepared_question": "Q1. What is JSX?"}, config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.values["feedback"] == "Q1. What is JSX?"
+    assert snapshot.values["prepared_question"] is None
+    mock_model.ainvoke.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_choice_answer_is_graded_locally(mock_model):
+    """A choice answer is graded against the answer key without calling analyze_question_answer"""
+    kickoff = ("Q1. What is React? (Single Choice)\n\nA. A library\n\nB. A database\n\n"
+               '<answer_key>{"question_number": 1, "question_type": "Single Choice", "answer": "A", "knowledge_point": "React"}</answer_key>')
+    mock_model.ainvoke.return_value = AIMessage(content=kickoff)
+
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock()) as analyze:
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke(_inputs(), config=config)
+        snapshot = await graph.aget_state(config)
+        assert "<answer_key>" not in snapshot.values["feedback"]
+        assert snapshot.values["question_key"].answer == "A"
+
+        mock_model.ainvoke.return_value = AIMessage(content="Q2. What is JSX?")
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "选A"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    analyze.assert_not_awaited()
+    assert snapshot.values["feedback"] == "Q2. What is JSX?"
+    assert snapshot.values["qa_history"][0][2].answer.is_correct
+    assert snapshot.values["question_key"] is None
+
+
+@pytest.mark.asyncio
+async def test_gibberish_answer_is_repeated_without_llm(mock_model):
+    """Keyboard mashing is triaged locally and the question is repeated"""
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock()) as analyze:
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        await graph.ainvoke(_inputs(), config=config)
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "adfadsfdasf"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    analyze.assert_not_awaited()
+    mock_model.ainvoke.assert_awaited_once()
+    assert snapshot.next == ("analyze_answer",)
+    assert snapshot.values["question"] == "Q1. What is React?"
+    assert snapshot.values["feedback"] == "Your answer could not be recognized, please answer the question again."
+
+
+@pytest.mark.asyncio
+async def test_deferred_summary_skips_llm(mock_model):
+    """With deferred_summary the final turn scores locally and leaves the summary pending"""
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result(is_over=True))):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": str(uuid.uuid4()), "deferred_summary": True}}
+        await graph.ainvoke(_inputs(), config=config)
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "A"}), config=config)
+        snapshot = await graph.aget_state(config)
+
+    assert snapshot.next == ()
+    assert snapshot.values["summary_pending"] is True
+    assert snapshot.values["interview_result"].total_question_number == 1
+    assert snapshot.values["interview_result"].score == 10
+    # only the kickoff question called the model
+    mock_model.ainvoke.assert_awaited_once()
@@ -289,3 +289,87 @@ class TestChatAPI:
         # 验证 workflow 调用
         mock_build_graph.assert_called_once()
         mock_graph.assert_called_once()
+
+    @patch("api.service.chat.ChatService.process_answer_stream")
+    def test_answer_question_stream(self, mock_process_answer_stream):
+        """测试流式回答问题接口"""
+        question_id = str(uuid.uuid4())
+
+        async def events(*args, **kwargs):
+            yield {"event": "token", "data": {"content": "Q2. "}}
+            yield {"event": "token", "data": {"content": "什么是装饰器？"}}
+            yield {"event": "feedback", "data": {"node": "send_next_question", "feedback": "Q2. 什么是装饰器？"}}
+            yield {"event": "done", "data": {"feedback": "Q2. 什么是装饰器？", "question_id": question_id, "type": "question", "is_over": False}}
+
+        mock_process_answer_stream.side_effect = events
+
+        # 发送请求
+        response = client.post(
+            "/api/v1/chat/answer/stream",
+            json={
+                "user_id": str(uuid.uuid4()),
+                "test_id": str(uuid.uuid4()),
+                "question_id": str(uuid.uuid4()),
+                "user_answer": "A"
+            }
+        )
+
+        # 验证响应
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.text
+        assert body.index("event: token") < body.index("event: feedback") < body.index("event: done")
+        assert 'data: {"content": "Q2. "}' in body
+        assert f'"question_id": "{question_id}"' in body
+        assert '"is_over": false' in body
+
+    @patch("api.service.chat.ChatService.process_answer_stream")
+    def test_answer_question_stream_error(self, mock_process_answer_stream):
+        """测试流式回答问题接口的错误事件"""
+        async def events(*args, **kwargs):
+            yield {"event": "token", "data": {"content": "Q2"}}
+            raise Exception("Workflow error")
+
+        mock_process_answer_stream.side_effect = events
+
+        # 发送请求
+        response = client.post(
+            "/api/v1/chat/answer/stream",
+            json={
+                "user_id": str(uuid.uuid4()),
+                "test_id": str(uuid.uuid4()),
+                "question_id": str(uuid.uuid4()),
+                "user_answer": "A"
+            }
+        )
+
+        # 验证响应 - 错误以 error 事件推送
+        assert response.status_code == 200
+        assert "event: error" in response.text
+        assert "Workflow error" in response.text
+
+    @patch("api.service.session.SessionManager.get_usage")
+    def test_get_session_usage(self, mock_get_usage):
+        """测试获取会话占用统计接口"""
+        thread_id = str(uuid.uuid4())
+        mock_get_usage.return_value = {
+            "total_sessions": 1,
+            "total_bytes": 2048,
+            "sessions": [{
+                "thread_id": thread_id,
+                "size_bytes": 2048,
+                "last_active": datetime.now().isoformat(),
+                "is_finished": False
+            }]
+        }
+
+        # 发送请求
+        response = client.get("/api/v1/chat/sessions")
+
+        # 验证响应
+        assert response.status_code == 200
+        data = response.json()
+        assert data["code"] == "0"
+        assert data["data"]["total_sessions"] == 1
+        assert data["data"]["total_bytes"] == 2048
+        assert data["data"]["sessions"][0]["thread_id"] == thread_id
@@ -0,0 +1,78 @@
+import pytest
+import uuid
+from langgraph.checkpoint.base import empty_checkpoint, create_checkpoint
+from api.infra.mongo.checkpointer import MongoCheckpointSaver
+
+
+@pytest.fixture
+def saver():
+    saver = MongoCheckpointSaver(
+        checkpoint_collection="ai_checkpoint_test",
+        writes_collection="ai_checkpoint_write_test"
+    )
+    yield saver
+    saver.checkpoints.drop()
+    saver.writes.drop()
+
+
+def _config(thread_id: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+@pytest.mark.asyncio
+async def test_put_and_get_latest_checkpoint(saver):
+    """Test the latest checkpoint of a thread is returned"""
+    thread_id = str(uuid.uuid4())
+    first = empty_checkpoint()
+    first["channel_values"] = {"feedback": "Q1"}
+    first_config = await saver.aput(_config(thread_id), first, {"step": 0}, {})
+
+    second = create_checkpoint(first, None, 1)
+    second["channel_values"] = {"feedback": "Q2"}
+    await saver.aput(first_config, second, {"step": 1}, {})
+
+    result = await saver.aget_tuple(_config(thread_id))
+    assert result.checkpoint["id"] == second["id"]
+    assert result.checkpoint["channel_values"]["feedback"] == "Q2"
+    assert result.metadata["step"] == 1
+    assert result.parent_config["configurable"]["checkpoint_id"] == first["id"]
+
+    result = await saver.aget_tuple(_config(thread_id, first["id"]))
+    assert result.checkpoint["channel_values"]["feedback"] == "Q1"
+
+
+@pytest.mark.asyncio
+async def test_put_writes_are_returned_as_pending_writes(saver):
+    """Test pending writes are loaded with their checkpoint"""
+    thread_id = str(uuid.uuid4())
+    checkpoint = empty_checkpoint()
+    config = await saver.aput(_config(thread_id), checkpoint, {"step": 0}, {})
+
+    await saver.aput_writes(config, [("user_answer", "A")], task_id="task-1")
+    # duplicated regular writes are ignored
+    await saver.aput_writes(config, [("user_answer", "B")], task_id="task-1")
+
+    result = await saver.aget_tuple(config)
+    assert result.pending_writes == [("task-1", "user_answer", "A")]
+
+
+@pytest.mark.asyncio
+async def test_list_and_delete_thread(saver):
+    """Test listing checkpoints newest first and deleting a thread"""
+    thread_id = str(uuid.uuid4())
+    first = empty_checkpoint()
+    first_config = await saver.aput(_config(thread_id), first, {"step": 0}, {})
+    second = create_checkpoint(first, None, 1)
+    await saver.aput(first_config, second, {"step": 1}, {})
+
+    checkpoints = [c async for c in saver.alist(_config(thread_id))]
+    assert [c.checkpoint["id"] for c in checkpoints] == [second["id"], first["id"]]
+
+    checkpoints = [c async for c in saver.alist(_config(thread_id), limit=1)]
+    assert len(checkpoints) == 1
+
+    await saver.adelete_thread(thread_id)
+    assert await saver.aget_tuple(_config(thread_id)) is None
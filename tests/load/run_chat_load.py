@@ -0,0 +1,219 @@
+"""
+Concurrent interview load test
+
+Simulates candidates going through /chat/start and /chat/answer until their interview is over,
+and reports throughput, per-turn latency percentiles and memory per session.
+
+Offline, against the in-process app and the fake chat model:
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_SECONDS=0.8 python -m tests.load.run_chat_load --sessions 200 --concurrency 50
+
+Against a running server (memory per session is not measured):
+    python -m tests.load.run_chat_load --base-url http://localhost:8000 --sessions 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import resource
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+OPTION_PATTERN = re.compile(r"^\s*([A-H])[.、)）:：]", re.MULTILINE)
+TRUE_FALSE_PATTERN = re.compile(r"True False|True/False|判断题|对错", re.IGNORECASE)
+
+
+@dataclass
+class LoadStats:
+    # endpoint -> turn latencies in seconds
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    completed_sessions: int = 0
+    turns: int = 0
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def get_rss_bytes() -> int:
+    """Current resident memory of this process, the peak if /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def build_answer(question: str, rng: random.Random) -> str:
+    """Answer like a candidate: a letter for choice questions, true/false, otherwise a short text"""
+    options = OPTION_PATTERN.findall(question)
+    if options:
+        return rng.choice(options)
+    if TRUE_FALSE_PATTERN.search(question):
+        return rng.choice(("True", "False"))
+    return "I would use a context manager so that the resource is always released, even on errors."
+
+
+async def post(client: httpx.AsyncClient, stats: LoadStats, endpoint: str, payload: Dict[str, Any],
+               stream: bool) -> Optional[Dict[str, Any]]:
+    """Send one turn and record its latency, the data of the response or None on failure"""
+    started = time.perf_counter()
+    try:
+        if stream:
+            data = await post_stream(client, endpoint, payload)
+        else:
+            response = await client.post(f"/api/v1/chat/{endpoint}", json=payload)
+            response.raise_for_status()
+            data = response.json()["data"]
+    except Exception as e:
+        stats.errors[f"{endpoint}: {type(e).__name__}"] += 1
+        return None
+    stats.latencies[endpoint].append(time.perf_counter() - started)
+    stats.turns += 1
+    return data
+
+
+async def post_stream(client: httpx.AsyncClient, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Read the SSE answer stream, the question is the concatenation of the token events"""
+    tokens: List[str] = []
+    done: Dict[str, Any] = {}
+    async with client.stream("POST", f"/api/v1/chat/{endpoint}/stream", json=payload) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    tokens.append(data["content"])
+                elif event == "done":
+                    done = data
+                elif event == "error":
+                    raise RuntimeError(data)
+    return {**done, "feedback": "".join(tokens) or done.get("feedback")}
+
+
+async def run_session(client: httpx.AsyncClient, stats: LoadStats, args: argparse.Namespace, index: int) -> None:
+    rng = random.Random(f"{args.seed}:{index}")
+    user_id, test_id = str(uuid4()), str(uuid4())
+    data = await post(client, stats, "start", {
+        "user_id": user_id,
+        "test_id": test_id,
+        "job_title": "Python Developer",
+        "examination_points": "Python, Concurrency, Databases",
+        "test_time": args.test_time,
+        "language": args.language,
+        "difficulty": "medium",
+        "answer_mode": args.answer_mode
+    }, stream=False)
+
+    for _ in range(args.max_turns):
+        if data is None or data.get("is_over"):
+            break
+        await asyncio.sleep(args.think_time * rng.random())
+        data = await post(client, stats, "answer", {
+            "user_id": user_id,
+            "test_id": test_id,
+            "question_id": data.get("question_id") or str(uuid4()),
+            "user_answer": build_answer(data.get("feedback") or "", rng)
+        }, stream=args.stream)
+
+    if data is not None and data.get("is_over"):
+        stats.completed_sessions += 1
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    stats = LoadStats()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(client: httpx.AsyncClient, index: int) -> None:
+        async with semaphore:
+            await run_session(client, stats, args, index)
+
+    async def drive(client: httpx.AsyncClient) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*[limited(client, i) for i in range(args.sessions)])
+        return time.perf_counter() - started
+
+    timeout = httpx.Timeout(args.timeout)
+    rss_before = rss_after = None
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            elapsed = await drive(client)
+    else:
+        from api.main import app
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+                rss_before = get_rss_bytes()
+                elapsed = await drive(client)
+                rss_after = get_rss_bytes()
+
+    report: Dict[str, Any] = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "completed_sessions": stats.completed_sessions,
+        "turns": stats.turns,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(stats.turns / elapsed, 2) if elapsed else 0,
+        "sessions_per_second": round(stats.completed_sessions / elapsed, 2) if elapsed else 0,
+        "latency_seconds": {
+            endpoint: {f"p{int(p * 100)}": round(percentile(values, p), 3) for p in (0.5, 0.9, 0.95, 0.99)}
+            | {"count": len(values), "max": round(max(values), 3)}
+            for endpoint, values in stats.latencies.items()
+        },
+        "errors": dict(stats.errors),
+    }
+    if rss_before is not None:
+        report["memory_per_session_kb"] = round((rss_after - rss_before) / 1024 / args.sessions, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate concurrent interviews through the chat API")
+    parser.add_argument("--sessions", type=int, default=50, help="number of simulated candidates")
+    parser.add_argument("--concurrency", type=int, default=None, help="candidates in flight at once, all by default")
+    parser.add_argument("--base-url", default=None, help="running server, the in-process app if omitted")
+    parser.add_argument("--answer-mode", default=None, choices=["two_step", "grade_and_ask"])
+    parser.add_argument("--stream", action="store_true", help="answer through /chat/answer/stream")
+    parser.add_argument("--test-time", type=int, default=30, help="interview time in minutes")
+    parser.add_argument("--language", default="English")
+    parser.add_argument("--max-turns", type=int, default=30, help="answers per candidate at most")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max seconds a candidate waits before answering")
+    parser.add_argument("--timeout", type=float, default=300.0, help="HTTP timeout per turn in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or args.sessions
+
+    report = asyncio.run(run_load(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"sessions {report['completed_sessions']}/{report['sessions']} completed, concurrency {report['concurrency']}")
+    print(f"{report['turns']} turns in {report['elapsed_seconds']}s: "
+          f"{report['turns_per_second']} turns/s, {report['sessions_per_second']} sessions/s")
+    for endpoint, latency in report["latency_seconds"].items():
+        print(f"{endpoint:>8}: " + " ".join(f"{name}={value}" for name, value in latency.items()))
+    if "memory_per_session_kb" in report:
+        print(f"memory per session: {report['memory_per_session_kb']} KB")
+    for error, count in report["errors"].items():
+        print(f"error {error}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from loguru import logger
+from api.middleware.logging import LoggingMiddleware, write_record
+
+
+@pytest.fixture
+def records(monkeypatch):
+    records = []
+    monkeypatch.setattr("api.middleware.logging.write_record", records.append)
+    return records
+
+
+async def echo(request: Request):
+    return JSONResponse({"echo": (await request.json())["text"]})
+
+
+async def events(request: Request):
+    async def generate():
+        for i in range(3):
+            yield f"data: {i}\n\n"
+            await asyncio.sleep(0)
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+async def fail(request: Request):
+    raise RuntimeError("boom")
+
+
+def create_app(**kwargs):
+    app = Starlette(routes=[
+        Route("/echo", echo, methods=["POST"]),
+        Route("/events", events),
+        Route("/fail", fail),
+        Route("/health", lambda request: JSONResponse({"status": "ok"})),
+    ])
+    app.add_middleware(LoggingMiddleware, **kwargs)
+    return app
+
+
+async def request(app, method, path, **kwargs):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_passed_through_and_captured(records):
+    app = create_app()
+
+    response = await request(app, "POST", "/echo?x=1", json={"text": "hello"})
+
+    assert response.json() == {"echo": "hello"}
+    record, = records
+    assert (record["method"], record["path"], record["query"], record["status"]) == ("POST", "/echo", "x=1", 200)
+    assert json.loads(b"".join(record["request_body"])) == {"text": "hello"}
+    assert json.loads(b"".join(record["response_body"])) == {"echo": "hello"}
+    assert not record["request_truncated"] and not record["response_truncated"]
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_capped(records):
+    app = create_app(max_body_bytes=8)
+
+    response = await request(app, "POST", "/echo", json={"text": "x" * 100})
+
+    assert response.json() == {"echo": "x" * 100}
+    record, = records
+    assert len(b"".join(record["request_body"])) == 8
+    assert len(b"".join(record["response_body"])) == 8
+    assert record["request_truncated"] and record["response_truncated"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_forwarded(records):
+    app = create_app()
+
+    response = await request(app, "GET", "/events")
+
+    assert response.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+    assert b"".join(records[0]["response_body"]) == response.content
+
+
+@pytest.mark.asyncio
+async def test_excluded_paths_and_sampling(records):
+    await request(create_app(exclude_paths=["/health"]), "GET", "/health")
+    await request(create_app(sample_rate=0), "POST", "/echo", json={"text": "hello"})
+
+    assert records == []
+
+
+@pytest.mark.asyncio
+async def test_errors_are_recorded(records):
+    app = create_app()
+
+    response = await request(app, "GET", "/fail")
+
+    assert response.status_code == 500
+    assert records[0]["error"] == "boom"
+
+
+def test_write_record_binds_raw_bodies():
+    messages = []
+    sink = logger.add(messages.append, format="{message}")
+    try:
+        write_record({
+            "method": "POST", "path": "/echo", "query": "", "status": 200, "error": None, "duration": 0.01,
+            "request_body": [b'{"text": "hi"}'], "request_truncated": False,
+            "response_body": [b'{"echo": '], "response_truncated": True,
+        })
+    finally:
+        logger.remove(sink)
+
+    extra = messages[0].record["extra"]
+    assert messages[0].record["message"] == "Request: POST /echo -> 200 in 0.010s"
+    assert extra["request_body"] == '{"text": "hi"}'
+    assert extra["response_body"] == '{"echo": ...(truncated)'
+    assert extra["status"] == 200
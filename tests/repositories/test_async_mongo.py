@@ -0,0 +1,112 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from mongoengine import NotUniqueError
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from api.constants.common import TestStatus
+from api.model.db.job import Job
+from api.model.db.test import Test
+from api.repositories.async_mongo import AsyncJobRepository, AsyncTestRepository, AsyncTestResultRepository
+
+
+def _repository(repository_class, collection):
+    return repository_class(database={repository_class.document._get_collection_name(): collection})
+
+
+def _job() -> Job:
+    return Job(job_id="job001", job_title="Python Dev", job_description="Backend services",
+               technical_skills=["Python"], soft_skills=["Communication"])
+
+
+def _test_son(**fields):
+    return {"_id": ObjectId(), "test_id": "test001", "activate_code": "1234", "user_id": "user001",
+            "job_id": "job001", "type": "coding", "language": "python", "difficulty": "medium",
+            "test_time": 30, "status": TestStatus.OPEN.value, **fields}
+
+
+@pytest.mark.asyncio
+async def test_get_test_by_id_returns_document():
+    collection = MagicMock(find_one=AsyncMock(return_value=_test_son()))
+    repo = _repository(AsyncTestRepository, collection)
+
+    test = await repo.get_test_by_id("test001")
+
+    collection.find_one.assert_awaited_once_with({"test_id": "test001"})
+    assert isinstance(test, Test) and test.job_id == "job001"
+
+
+@pytest.mark.asyncio
+async def test_get_test_by_id_not_found():
+    repo = _repository(AsyncTestRepository, MagicMock(find_one=AsyncMock(return_value=None)))
+
+    assert await repo.get_test_by_id("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_search_jobs_pages_with_case_insensitive_match():
+    cursor = MagicMock()
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=[{"_id": ObjectId(), "job_id": "job001", "job_title": "Python Dev"}])
+    collection = MagicMock(find=MagicMock(return_value=cursor))
+    repo = _repository(AsyncJobRepository, collection)
+
+    jobs = await repo.search_jobs("python.", skip=10, limit=5)
+
+    collection.find.assert_called_once_with({"job_title": {"$regex": "python\\.", "$options": "i"}})
+    cursor.skip.assert_called_once_with(10)
+    cursor.limit.assert_called_once_with(5)
+    assert [job.job_title for job in jobs] == ["Python Dev"]
+
+
+@pytest.mark.asyncio
+async def test_create_inserts_and_update_replaces():
+    inserted_id = ObjectId()
+    collection = MagicMock(insert_one=AsyncMock(return_value=MagicMock(inserted_id=inserted_id)),
+                           replace_one=AsyncMock())
+    repo = _repository(AsyncJobRepository, collection)
+    job = _job()
+
+    assert (await repo.create_job(job)).pk == inserted_id
+    assert collection.insert_one.await_args.args[0]["job_id"] == "job001"
+
+    job.job_title = "Senior Python Dev"
+    await repo.update_job(job)
+    (query, son), kwargs = collection.replace_one.await_args
+    assert query == {"_id": inserted_id} and son["job_title"] == "Senior Python Dev" and kwargs == {"upsert": True}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_key_raises_not_unique():
+    collection = MagicMock(insert_one=AsyncMock(side_effect=DuplicateKeyError("E11000 duplicate key")))
+    repo = _repository(AsyncJobRepository, collection)
+
+    with pytest.raises(NotUniqueError):
+        await repo.create_job(_job())
+
+
+@pytest.mark.asyncio
+async def test_update_test_status_in_one_round_trip():
+    collection = MagicMock(find_one_and_update=AsyncMock(
+        return_value=_test_son(status=TestStatus.COMPLETED.value, close_date=datetime.now(UTC))))
+    repo = _repository(AsyncTestRepository, collection)
+
+    test = await repo.update_test_status("test001", TestStatus.COMPLETED)
+
+    query, update = collection.find_one_and_update.await_args.args
+    assert query == {"test_id": "test001"}
+    assert update["$set"]["status"] == TestStatus.COMPLETED.value and "close_date" in update["$set"]
+    assert collection.find_one_and_update.await_args.kwargs == {"return_document": ReturnDocument.AFTER}
+    assert test.status == TestStatus.COMPLETED.value
+
+
+@pytest.mark.asyncio
+async def test_update_summary():
+    collection = MagicMock(update_one=AsyncMock(return_value=MagicMock(matched_count=1)))
+    repo = _repository(AsyncTestResultRepository, collection)
+
+    assert await repo.update_summary("test001", "Good", 80, "completed")
+    collection.update_one.assert_awaited_once_with(
+        {"test_id": "test001"}, {"$set": {"summary": "Good", "score": 80, "summary_status": "completed"}})
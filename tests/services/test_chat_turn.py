@@ -0,0 +1,200 @@
+import asyncio
+import pytest
+import uuid
+from datetime import datetime
+from unittest.mock import patch, MagicMock, AsyncMock
+from langchain_core.messages import AIMessage
+from langgraph.types import Command
+from agent.workflow import build_graph
+from agent.memory_saver import InterviewMemorySaver
+from agent.interview_response import QAResult, Question, Answer, QuestionType
+from api.exceptions.api_error import DuplicateError
+from api.service.chat import ChatService
+from api.service.single_flight import SingleFlight
+
+
+def _qa_result(is_over: bool = False) -> QAResult:
+    return QAResult(
+        question=Question(question="Q1", question_number=1, question_type=QuestionType.SHORT_ANSWER,
+                          knowledge_point="React", answer=""),
+        answer=Answer(is_valid=True, giveup=False, suggest_more_details=False, follow_up_question="",
+                      feedback="ok", is_correct=True, analysis="", score=5),
+        is_interview_over=is_over,
+        summary="Q1 : React Score:5 ok"
+    )
+
+
+@pytest.fixture
+def chat_service():
+    """ChatService with an in-memory workflow, without loading the configuration"""
+    service = ChatService.__new__(ChatService)
+    service.workflow = build_graph(checkpointer=InterviewMemorySaver(), on_interview_over=service._on_interview_over)
+    service.completion_outbox = MagicMock(enqueue=AsyncMock())
+    service.model_name = "fake"
+    service.answer_mode = "two_step"
+    service.speculative_next_question = service.deferred_summary = False
+    service.qa_history_token_budget = 1500
+    service.llm_policies = {}
+    service.single_flight = SingleFlight(result_ttl_seconds=0)
+    service.session_manager = MagicMock()
+    return service
+
+
+def _inputs() -> dict:
+    return {"start_time": datetime.now(), "end_time": datetime.now(), "messages": [], "job_title": "React",
+            "knowledge_points": "React", "interview_time": 30, "language": "English", "difficulty": "Easy"}
+
+
+async def test_turn_result_taken_from_updates(chat_service):
+    """Test the question and the interrupt come from the run updates, without reading the checkpoint"""
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    inputs = _inputs()
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=[AIMessage(content="Q1 What is JSX?"), AIMessage(content="Q2 What is a hook?")])
+
+    with patch("agent.workflow.get_model", return_value=model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result())), \
+         patch.object(chat_service.workflow, "aget_state", wraps=chat_service.workflow.aget_state) as aget_state:
+        changes, interrupted = await chat_service._run_workflow(inputs, config)
+        assert interrupted
+        assert await chat_service._finish_turn(config, changes, interrupted) == ("Q1 What is JSX?", False)
+
+        changes, interrupted = await chat_service._run_workflow(
+            Command(resume="Go ahead", update={"user_answer": "JSX is a syntax extension"}), config
+        )
+        assert interrupted
+        assert await chat_service._finish_turn(config, changes, interrupted) == ("Q2 What is a hook?", False)
+        aget_state.assert_not_called()
+
+    chat_service.completion_outbox.enqueue.assert_not_called()
+
+
+async def test_finished_run_reads_state_only_without_feedback(chat_service):
+    """Test the final state is read only when the run wrote no feedback"""
+    chat_service.workflow = MagicMock()
+    chat_service.workflow.aget_state = AsyncMock(return_value=MagicMock(values={"feedback": "bye"}))
+
+    assert await chat_service._finish_turn({}, {"interview_result": object(), "feedback": "thanks"}, False) == \
+        ("thanks", True)
+    chat_service.workflow.aget_state.assert_not_awaited()
+    assert await chat_service._finish_turn({}, {"interview_result": object()}, False) == ("bye", True)
+    chat_service.workflow.aget_state.assert_awaited_once()
+
+
+async def test_completion_event_is_written_before_the_final_checkpoint(chat_service):
+    """Test the completion event is enqueued by summarize_interview, a failed enqueue is retried on resume"""
+    config = {"configurable": {"thread_id": str(uuid.uuid4()), "user_id": "u", "deferred_summary": True}}
+    chat_service.completion_outbox.enqueue = AsyncMock(side_effect=[RuntimeError("mongo down"), None])
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=AIMessage(content="Q1 What is JSX?"))
+
+    with patch("agent.workflow.get_model", return_value=model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result(is_over=True))):
+        await chat_service._run_workflow(_inputs(), config)
+        with pytest.raises(RuntimeError):
+            await chat_service._run_workflow(
+                Command(resume="Go ahead", update={"user_answer": "JSX is a syntax extension"}), config
+            )
+        # the interview is not over until the event is written
+        assert (await chat_service.workflow.aget_state(config)).next == ("summarize_interview",)
+
+        changes, interrupted = await chat_service._run_workflow(None, config)
+
+    assert not interrupted and "interview_result" in changes
+    request, summary_pending, values = chat_service.completion_outbox.enqueue.await_args.args
+    assert request.test_id == config["configurable"]["thread_id"]
+    assert request.user_id == "u"
+    assert summary_pending
+    assert values["interview_result"] == changes["interview_result"]
+
+
+def test_collect_updates():
+    """Test node updates are merged and the interrupt marker is detected"""
+    changes = {}
+    assert not ChatService._collect_updates({"kickoff_interview": {"feedback": "Q1", "question": "Q1"}}, changes)
+    assert ChatService._collect_updates({"__interrupt__": ()}, changes)
+    assert changes == {"feedback": "Q1", "question": "Q1"}
+
+
+async def test_start_returns_stored_result_after_session_is_evicted(chat_service):
+    """Test a completed test whose session was swept is not started again"""
+    qa_history = [{"question": "Q1", "answer": "A", "summary": "Q1 : React Score:5 ok"}]
+    chat_service.test_result_service = MagicMock(
+        repository=MagicMock(get_result_by_test_id=AsyncMock(return_value=MagicMock(qa_history=qa_history))))
+    chat_service.question_pool = MagicMock(pop=AsyncMock())
+
+    result = await chat_service._start_chat("u", str(uuid.uuid4()), "React", "React", 30, "English", "Easy")
+
+    assert result["is_over"] is True
+    assert result["qa_history"] == qa_history
+    chat_service.question_pool.pop.assert_not_awaited()
+
+
+async def test_completed_test_is_detected_from_event_or_status(chat_service):
+    """Test a pending completion event or a completed test status also count as completed"""
+    chat_service.test_result_service = MagicMock(repository=MagicMock(get_result_by_test_id=AsyncMock(return_value=None)))
+    chat_service.completion_outbox = MagicMock(get_test_result=AsyncMock(return_value={"qa_history": [{"question": "Q1"}]}))
+    chat_service.test_service = MagicMock(repository=MagicMock(get_test_by_id=AsyncMock(return_value=None)))
+    assert (await chat_service._get_completed_test("t"))["qa_history"] == [{"question": "Q1"}]
+
+    chat_service.completion_outbox.get_test_result = AsyncMock(return_value=None)
+    assert await chat_service._get_completed_test("t") is None
+
+    chat_service.test_service.repository.get_test_by_id = AsyncMock(return_value=MagicMock(status="completed"))
+    assert (await chat_service._get_completed_test("t"))["is_over"] is True
+
+
+async def test_answer_to_another_question_is_rejected(chat_service):
+    """Test a late retry of an answered question is not applied to the next question"""
+    chat_service.test_result_service = MagicMock(repository=MagicMock(get_result_by_test_id=AsyncMock(return_value=None)))
+    chat_service.completion_outbox.get_test_result = AsyncMock(return_value=None)
+    chat_service.test_service = MagicMock(repository=MagicMock(get_test_by_id=AsyncMock(return_value=None)))
+    chat_service.question_pool = MagicMock(pop=AsyncMock(return_value=None))
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=[AIMessage(content="Q1 What is JSX?"), AIMessage(content="Q2 What is a hook?")])
+    test_id = str(uuid.uuid4())
+
+    with patch("agent.workflow.get_model", return_value=model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result())):
+        first = await chat_service._start_chat("u", test_id, "React", "React", 30, "English", "Easy")
+        with pytest.raises(DuplicateError):
+            await chat_service.process_answer("u", test_id, "unknown", "JSX is a syntax extension")
+        with pytest.raises(DuplicateError):
+            async for _ in chat_service.process_answer_stream("u", test_id, "unknown", "JSX"):
+                pass
+        # the answer node rejected the answers without changing the interview
+        snapshot = await chat_service.workflow.aget_state(chat_service._build_config("u", test_id))
+        assert snapshot.next == ("analyze_answer",)
+        assert snapshot.values["question_id"] == first["question_id"]
+        assert snapshot.values["qa_history"] == []
+
+        second = await chat_service.process_answer("u", test_id, first["question_id"], "JSX is a syntax extension")
+        assert second["feedback"] == "Q2 What is a hook?"
+        assert second["question_id"] != first["question_id"]
+        # the retry arrives after the result expired
+        await asyncio.sleep(0.01)
+        with pytest.raises(DuplicateError):
+            await chat_service.process_answer("u", test_id, first["question_id"], "JSX is a syntax extension")
+
+    restarted = await chat_service._start_chat("u", test_id, "React", "React", 30, "English", "Easy")
+    assert restarted["question_id"] == second["question_id"]
+
+
+async def test_duplicate_answers_coalesce_across_endpoints(chat_service):
+    """Test a streamed answer and a retry of it on the non-streaming endpoint run the turn once"""
+    calls = []
+
+    async def turn(*args):
+        calls.append(args)
+        yield {"event": "token", "data": {"content": "Q2"}}
+        yield {"event": "done", "data": {"feedback": "Q2", "question_id": "q2", "type": "question", "is_over": False}}
+
+    chat_service._process_answer_stream = turn
+    chat_service._process_answer = turn
+    chat_service.single_flight = SingleFlight(result_ttl_seconds=30)
+
+    events = [event async for event in chat_service.process_answer_stream("u", "t", "q1", "A")]
+    result = await chat_service.process_answer("u", "t", "q1", "A")
+
+    assert len(calls) == 1
+    assert events[-1]["data"] == result
@@ -0,0 +1,172 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from agent.interview_response import QAResult, Question, Answer, QuestionType
+from api.model.api.test_result import CreateTestResultRequest
+from api.model.db.completion_outbox import CompletionOutbox
+from api.service.completion_outbox import CompletionOutboxService, dump_summary_state, load_summary_state
+
+
+def _qa_result() -> QAResult:
+    return QAResult(
+        question=Question(question="Q1", question_number=1, question_type=QuestionType.SINGLE_CHOICE,
+                          knowledge_point="React", answer="A"),
+        answer=Answer(is_valid=True, giveup=False, suggest_more_details=False, follow_up_question="",
+                      feedback="ok", is_correct=True, analysis="", score=5),
+        is_interview_over=True,
+        summary="Q1 : React A Score:5 ok"
+    )
+
+
+def _values() -> dict:
+    return {
+        "job_title": "React Web Developer",
+        "knowledge_points": "React",
+        "interview_time": 30,
+        "language": "English",
+        "qa_history": [("Q1", "A", _qa_result())]
+    }
+
+
+def _request() -> CreateTestResultRequest:
+    return CreateTestResultRequest(test_id="test001", user_id="user001", summary="pending", score=10,
+                                   question_number=1, correct_number=1, elapse_time=5,
+                                   qa_history=[{"question": "Q1", "answer": "A", "summary": _qa_result()}],
+                                   summary_status="pending")
+
+
+def _event(attempts: int = 1, summary_pending: bool = True, applied: bool = False) -> CompletionOutbox:
+    return CompletionOutbox(test_id="test001", user_id="user001", test_result=_request().model_dump(mode="json"),
+                            summary_pending=summary_pending, summary_state=dump_summary_state(_values()),
+                            attempts=attempts, applied=applied)
+
+
+def _service(events: list, test_result_service: MagicMock = None, **kwargs) -> CompletionOutboxService:
+    service = CompletionOutboxService(MagicMock(update_test_status_to_completed=AsyncMock()),
+                                      MagicMock(is_running=MagicMock(return_value=False)),
+                                      test_result_service or MagicMock(), max_attempts=3, **kwargs)
+    service.repository = MagicMock(enqueue=AsyncMock(return_value=True),
+                                   claim_batch=AsyncMock(return_value=events),
+                                   renew_lease=AsyncMock(return_value=True),
+                                   mark_applied=AsyncMock(),
+                                   mark_done=AsyncMock(),
+                                   mark_failed=AsyncMock())
+    return service
+
+
+@pytest.mark.asyncio
+async def test_enqueue_serializes_the_completion_event():
+    service = _service([])
+
+    await service.enqueue(_request(), True, _values())
+
+    kwargs = service.repository.enqueue.await_args.kwargs
+    assert kwargs["test_id"] == "test001"
+    assert kwargs["test_result"]["qa_history"][0]["summary"]["question"]["question_type"] == "Single Choice"
+    assert kwargs["summary_state"]["qa_history"][0]["qa_result"]["answer"]["score"] == 5
+
+
+@pytest.mark.asyncio
+async def test_dispatch_applies_event_then_schedules_summary():
+    test_result_service = MagicMock(complete_test_result=AsyncMock())
+    service = _service([_event()], test_result_service)
+
+    stats = await service.dispatch_batch()
+
+    assert stats == {"done": 0, "summarizing": 1, "retried": 0, "failed": 0}
+    assert test_result_service.complete_test_result.await_args.args[0].summary_status == "pending"
+    service.test_service.update_test_status_to_completed.assert_awaited_once_with("test001")
+    service.repository.mark_applied.assert_awaited_once_with("test001")
+    test_id, values = service.summary_service.schedule.call_args.args
+    assert test_id == "test001"
+    assert values["qa_history"][0][2] == _qa_result()
+
+    # the event stays leased until the summary is written
+    service.repository.mark_done.assert_not_awaited()
+    await service.summary_service.schedule.call_args.kwargs["on_finished"]()
+    service.repository.mark_done.assert_awaited_once_with("test001")
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_without_summary_is_done():
+    service = _service([_event(summary_pending=False)], MagicMock(complete_test_result=AsyncMock()))
+
+    assert await service.dispatch_batch() == {"done": 1, "summarizing": 0, "retried": 0, "failed": 0}
+    service.repository.mark_done.assert_awaited_once_with("test001")
+    service.repository.mark_applied.assert_not_awaited()
+    service.summary_service.schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reclaimed_applied_event_only_resumes_summary():
+    """Test an event whose lease expired before the summary was written only schedules the summary again"""
+    test_result_service = MagicMock(complete_test_result=AsyncMock())
+    service = _service([_event(attempts=2, applied=True)], test_result_service)
+
+    assert (await service.dispatch_batch())["summarizing"] == 1
+    test_result_service.complete_test_result.assert_not_awaited()
+    service.test_service.update_test_status_to_completed.assert_not_awaited()
+    assert service.summary_service.schedule.call_args.args[0] == "test001"
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_summary_is_slow():
+    """Test the lease of an event is renewed past its expiry while the summary runs, then no longer"""
+    summary = asyncio.Event()
+    summary_task = None
+
+    def schedule(test_id, values, on_finished=None):
+        nonlocal summary_task
+        summary_task = asyncio.create_task(summary.wait())
+
+    service = _service([_event()], MagicMock(complete_test_result=AsyncMock()), lease_seconds=0.03)
+    service.summary_service.schedule = schedule
+    service.summary_service.is_running = lambda test_id: not summary_task.done()
+
+    assert (await service.dispatch_batch())["summarizing"] == 1
+    # the summary outlives several leases
+    await asyncio.sleep(0.1)
+    renewed = service.repository.renew_lease.await_count
+    assert renewed >= 2
+    service.repository.renew_lease.assert_awaited_with("test001", 0.03)
+
+    summary.set()
+    await asyncio.sleep(0.05)
+    assert service.repository.renew_lease.await_count == renewed
+    assert service._heartbeats == {}
+
+
+@pytest.mark.asyncio
+async def test_reclaimed_summary_gives_up_after_max_attempts():
+    """Test an event re-claimed more than max_attempts times while its summary is pending is marked failed"""
+    test_result_service = MagicMock(fail_summary=AsyncMock())
+    service = _service([_event(attempts=4, applied=True)], test_result_service)
+
+    assert await service.dispatch_batch() == {"done": 0, "summarizing": 0, "retried": 0, "failed": 1}
+    service.summary_service.schedule.assert_not_called()
+    test_result_service.fail_summary.assert_awaited_once_with("test001")
+    assert service.repository.mark_failed.await_args.args[2] is None
+
+
+@pytest.mark.asyncio
+async def test_dispatch_retries_then_gives_up():
+    test_result_service = MagicMock(complete_test_result=AsyncMock(side_effect=RuntimeError("mongo down")))
+
+    retried = _service([_event(attempts=1)], test_result_service)
+    assert (await retried.dispatch_batch())["retried"] == 1
+    failed = _service([_event(attempts=3)], test_result_service)
+    assert (await failed.dispatch_batch())["failed"] == 1
+
+    assert retried.repository.mark_failed.await_args.args[2] is not None
+    assert failed.repository.mark_failed.await_args.args[2] is None
+    retried.repository.mark_done.assert_not_awaited()
+    retried.summary_service.schedule.assert_not_called()
+
+
+def test_summary_state_round_trip():
+    values = load_summary_state(dump_summary_state(_values()))
+
+    assert values["qa_history"] == _values()["qa_history"]
+    assert values["qa_history_digest"] is None
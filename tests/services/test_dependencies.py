@@ -0,0 +1,25 @@
+import mongomock
+import pytest
+from mongoengine import connect, disconnect
+
+from api.dependencies import get_test_result_service, get_test_service, get_user_service
+
+
+@pytest.fixture(autouse=True)
+def mongo():
+    connect("ai_talent_test", alias="default", mongo_client_class=mongomock.MongoClient)
+    yield
+    disconnect(alias="default")
+
+
+def test_services_are_application_scoped():
+    assert get_test_service() is get_test_service()
+    assert get_test_result_service() is get_test_result_service()
+
+
+def test_services_share_repositories():
+    test_service = get_test_service()
+    test_result_service = get_test_result_service()
+
+    assert test_result_service.test_repository is test_service.repository
+    assert test_result_service.user_repository is test_service.user_repository is get_user_service().repository
@@ -0,0 +1,79 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock, AsyncMock
+from agent.workflow import compute_interview_result
+from agent.interview_response import QAResult, Question, Answer, QuestionType, InterviewResult
+from api.service.interview_summary import InterviewSummaryService
+
+
+def _qa_result(is_valid: bool = True, is_correct: bool = True, score: int = 5, giveup: bool = False) -> QAResult:
+    return QAResult(
+        question=Question(question="Q1", question_number=1, question_type=QuestionType.SINGLE_CHOICE,
+                          knowledge_point="React", answer="A"),
+        answer=Answer(is_valid=is_valid, giveup=giveup, suggest_more_details=False, follow_up_question="",
+                      feedback="ok", is_correct=is_correct, analysis="", score=score),
+        is_interview_over=False,
+        summary="Q1 : React A Score:5 ok"
+    )
+
+
+def _values() -> dict:
+    start_time = datetime.now() - timedelta(minutes=12)
+    return {
+        "start_time": start_time,
+        "end_time": start_time + timedelta(minutes=10),
+        "job_title": "React Web Developer",
+        "knowledge_points": "React",
+        "interview_time": 30,
+        "language": "English",
+        "qa_history": [
+            ("Q1", "asdfgh", _qa_result(is_valid=False, is_correct=False, score=0)),
+            ("Q1", "A", _qa_result()),
+            ("Q2", "B", _qa_result(is_correct=False, score=1)),
+            ("Q3", "skip", _qa_result(is_correct=False, score=0, giveup=True)),
+        ]
+    }
+
+
+def test_compute_interview_result_locally():
+    result = compute_interview_result(_values())
+
+    # the invalid answer of Q1 is not counted
+    assert result.total_question_number == 3
+    assert result.correct_question_number == 1
+    assert result.score == 4
+    assert result.interview_time == 10
+
+
+@pytest.mark.asyncio
+async def test_summary_completes_in_background():
+    test_result_service = MagicMock(complete_summary=AsyncMock(), fail_summary=AsyncMock())
+    service = InterviewSummaryService(test_result_service=test_result_service)
+    result = InterviewResult(summary="Solid React basics", total_question_number=3,
+                             correct_question_number=1, score=5, interview_time=10)
+
+    on_finished = AsyncMock()
+
+    with patch("api.service.interview_summary.generate_interview_summary", new=AsyncMock(return_value=result)):
+        service.schedule("test001", _values(), on_finished=on_finished)
+        assert service.is_running("test001")
+        await service._tasks["test001"]
+
+    test_result_service.complete_summary.assert_awaited_once_with("test001", "Solid React basics", 5)
+    test_result_service.fail_summary.assert_not_awaited()
+    on_finished.assert_awaited_once()
+    assert not service.is_running("test001")
+
+
+@pytest.mark.asyncio
+async def test_summary_failure_is_recorded():
+    test_result_service = MagicMock(complete_summary=AsyncMock(), fail_summary=AsyncMock())
+    service = InterviewSummaryService(test_result_service=test_result_service)
+
+    with patch("api.service.interview_summary.generate_interview_summary",
+               new=AsyncMock(side_effect=RuntimeError("upstream error"))):
+        service.schedule("test001", _values())
+        await service._tasks["test001"]
+
+    test_result_service.fail_summary.assert_awaited_once_with("test001")
@@ -0,0 +1,74 @@
+import pytest
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+from api.model.db.opening_question import OpeningQuestion
+from api.service.question_pool import QuestionPoolService
+
+
+CONFIGURATION = ("React Web Developer", "React", "Easy", "English", 30)
+
+
+def _pool(questions: list, **kwargs) -> QuestionPoolService:
+    """Question pool backed by an in-memory list instead of MongoDB"""
+    pool = QuestionPoolService(enabled=True, **kwargs)
+    repository = MagicMock()
+    repository.pop_question = AsyncMock(side_effect=lambda key: questions.pop(0) if questions else None)
+    repository.count_questions = AsyncMock(side_effect=lambda key: len(questions))
+    repository.create_questions = AsyncMock(side_effect=lambda new: questions.extend(new) or new)
+    pool.repository = repository
+    return pool
+
+
+def _question(text: str) -> OpeningQuestion:
+    pool_key = QuestionPoolService.get_pool_key(*CONFIGURATION)
+    return OpeningQuestion(pool_key=pool_key, job_title="React Web Developer", knowledge_points="React",
+                           difficulty="Easy", language="English", interview_time=30, question=text)
+
+
+@pytest.mark.asyncio
+async def test_pop_returns_pooled_question():
+    questions = [_question("Q1. What is React?"), _question("Q1. What is JSX?"), _question("Q1. What is a hook?")]
+    pool = _pool(questions, depth=3, refill_threshold=1)
+
+    with patch("api.service.question_pool.generate_next_question", new=AsyncMock()) as generate:
+        assert await pool.pop(*CONFIGURATION) == "Q1. What is React?"
+        await asyncio.sleep(0)
+
+    # enough questions remain, no refill
+    generate.assert_not_awaited()
+    assert len(questions) == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_pool_falls_back_and_refills():
+    questions = []
+    pool = _pool(questions, depth=3, refill_threshold=2)
+
+    with patch("api.service.question_pool.generate_next_question",
+               new=AsyncMock(return_value="Q1. What is React?")) as generate:
+        assert await pool.pop(*CONFIGURATION) is None
+        await asyncio.gather(*pool._refill_tasks)
+
+    assert generate.await_count == 3
+    assert [q.question for q in questions] == ["Q1. What is React?"] * 3
+    assert await pool.pop(*CONFIGURATION) == "Q1. What is React?"
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_is_not_used():
+    questions = [_question("Q1. What is React?")]
+    pool = _pool(questions)
+    pool.enabled = False
+
+    assert await pool.pop(*CONFIGURATION) is None
+    pool.repository.pop_question.assert_not_awaited()
+
+
+def test_pool_key_ignores_case_and_whitespace():
+    assert QuestionPoolService.get_pool_key("React Web Developer", "React", "Easy", "English", 30) == \
+        QuestionPoolService.get_pool_key(" React Web Developer", "React ", "easy", "ENGLISH", 30)
+
+
+def test_pool_key_depends_on_interview_time():
+    assert QuestionPoolService.get_pool_key("React Web Developer", "React", "Easy", "English", 30) != \
+        QuestionPoolService.get_pool_key("React Web Developer", "React", "Easy", "English", 60)
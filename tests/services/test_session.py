@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock, AsyncMock
+from langchain_core.messages import AIMessage
+from langgraph.types import Command
+from agent.workflow import build_graph
+from agent.memory_saver import InterviewMemorySaver
+from agent.interview_response import QAResult, Question, Answer, QuestionType, InterviewResult
+from api.service.session import SessionManager
+
+
+def _qa_result(is_over: bool = False) -> QAResult:
+    return QAResult(
+        question=Question(question="Q1", question_number=1, question_type=QuestionType.SINGLE_CHOICE,
+                          knowledge_point="React", answer="A"),
+        answer=Answer(is_valid=True, giveup=False, suggest_more_details=False, follow_up_question="",
+                      feedback="ok", is_correct=True, analysis="", score=5),
+        is_interview_over=is_over,
+        summary="Q1 : React A Score:5 ok"
+    )
+
+
+def _inputs(start_time: datetime | None = None) -> dict:
+    return {
+        "start_time": start_time or datetime.now(),
+        "end_time": datetime.now(),
+        "messages": [],
+        "job_title": "React Web Developer",
+        "knowledge_points": "React",
+        "interview_time": 30,
+        "language": "English",
+        "difficulty": "Easy"
+    }
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=AIMessage(content="Q1"))
+    model.with_structured_output.return_value = model
+    return model
+
+
+async def _start(graph, thread_id: str, start_time: datetime | None = None) -> dict:
+    config = {"configurable": {"thread_id": thread_id}}
+    await graph.ainvoke(_inputs(start_time), config=config)
+    return config
+
+
+@pytest.mark.asyncio
+async def test_on_turn_completed_keeps_latest_checkpoint(mock_model):
+    """Test only the latest checkpoint is kept after a turn, pruned in the background"""
+    saver = InterviewMemorySaver()
+    manager = SessionManager(saver)
+    with patch("agent.workflow.get_model", return_value=mock_model), \
+         patch("agent.workflow.analyze_question_answer", new=AsyncMock(return_value=_qa_result())):
+        graph = build_graph(checkpointer=saver)
+        thread_id = str(uuid.uuid4())
+        config = await _start(graph, thread_id)
+        await graph.ainvoke(Command(resume="Go ahead", update={"user_answer": "A"}), config=config)
+        assert len(list(saver.list(config))) > 1
+
+        manager.on_turn_completed(thread_id)
+        await asyncio.gather(*manager._prunes.values())
+
+        assert manager._prunes == {}
+        assert len(list(saver.list(config))) == 1
+        snapshot = await graph.aget_state(config)
+        assert snapshot.next == ("analyze_answer",)
+        assert len(snapshot.values["qa_history"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_evicts_finished_and_expired_sessions(mock_model):
+    """Test finished and expired sessions are evicted while active ones are kept"""
+    saver = InterviewMemorySaver()
+    manager = SessionManager(saver, idle_ttl_minutes=60, finished_ttl_minutes=0)
+    with patch("agent.workflow.get_model", return_value=mock_model):
+        graph = build_graph(checkpointer=saver)
+        active = str(uuid.uuid4())
+        expired = str(uuid.uuid4())
+        finished = str(uuid.uuid4())
+        await _start(graph, active)
+        await _start(graph, expired, start_time=datetime.now() - timedelta(hours=3))
+        finished_config = await _start(graph, finished)
+        await graph.aupdate_state(finished_config, {"interview_result": InterviewResult(
+            summary="good", total_question_number=1, correct_question_number=1, score=8, interview_time=5
+        )})
+
+    stats = await manager.sweep()
+
+    assert stats == {"finished": 1, "expired": 1, "pruned": 1}
+    assert saver.list_thread_ids() == [active]
+
+
+@pytest.mark.asyncio
+async def test_get_usage(mock_model):
+    """Test per-session and total usage is reported"""
+    saver = InterviewMemorySaver()
+    manager = SessionManager(saver)
+    with patch("agent.workflow.get_model", return_value=mock_model):
+        graph = build_graph(checkpointer=saver)
+        first = str(uuid.uuid4())
+        second = str(uuid.uuid4())
+        await _start(graph, first)
+        await _start(graph, second)
+
+    usage = await manager.get_usage()
+
+    assert usage["total_sessions"] == 2
+    assert {s["thread_id"] for s in usage["sessions"]} == {first, second}
+    assert all(s["size_bytes"] > 0 and not s["is_finished"] for s in usage["sessions"])
+    assert usage["total_bytes"] == sum(s["size_bytes"] for s in usage["sessions"])
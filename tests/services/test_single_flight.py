@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from api.service.single_flight import SingleFlight, get_answer_key
+
+
+@pytest.mark.asyncio
+async def test_duplicates_share_in_flight_result():
+    """Test duplicate requests wait for and share the in-flight result"""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def answer():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"feedback": "Q2"}
+
+    key = get_answer_key("test-1", "q1", "A")
+    results = await asyncio.gather(*[single_flight.run("test-1", key, answer) for _ in range(3)])
+    assert results == [{"feedback": "Q2"}] * 3
+    assert calls == 1
+
+    # a late retry within the ttl gets the same result
+    assert await single_flight.run("test-1", key, answer) == {"feedback": "Q2"}
+    assert calls == 1
+    assert get_answer_key("test-1", "q1", "B") != key
+
+
+@pytest.mark.asyncio
+async def test_requests_of_one_interview_are_serialized_in_order():
+    """Test different requests of the same interview never overlap and run in arrival order"""
+    single_flight = SingleFlight()
+    running, order = set(), []
+
+    async def request(name: str):
+        assert "test-1" not in running
+        running.add("test-1")
+        await asyncio.sleep(0.01)
+        order.append(name)
+        running.discard("test-1")
+
+    await asyncio.gather(*[single_flight.run("test-1", name, lambda name=name: request(name)) for name in "abc"])
+    assert order == ["a", "b", "c"]
+    assert single_flight._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_failures_and_unkept_results_are_not_cached():
+    """Test failed requests can be retried and keep_result=False requests run again once done"""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("upstream")
+
+    with pytest.raises(RuntimeError):
+        await single_flight.run("test-1", "answer", fail)
+    with pytest.raises(RuntimeError):
+        await single_flight.run("test-1", "answer", fail)
+    assert calls == 2
+
+    async def start():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.run("test-1", "start", start, keep_result=False) == 3
+    assert await single_flight.run("test-1", "start", start, keep_result=False) == 4
+
+
+@pytest.mark.asyncio
+async def test_disconnected_requester_does_not_cancel_the_turn():
+    """Test the turn keeps running for the duplicates when the first requester goes away"""
+    single_flight = SingleFlight()
+
+    async def answer():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(single_flight.run("test-1", "key", answer))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await single_flight.run("test-1", "key", answer) == "done"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_stream_replays_events():
+    """Test a duplicate stream request replays the events already sent, then follows the stream"""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def events():
+        nonlocal calls
+        calls += 1
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield {"event": "token", "data": {"content": str(i)}}
+        yield {"event": "done", "data": {}}
+
+    async def collect():
+        return [event async for event in single_flight.stream("test-1", "key", events)]
+
+    first = asyncio.create_task(collect())
+    await asyncio.sleep(0.025)
+    second = await collect()
+    assert await first == second
+    assert [event["event"] for event in second] == ["token", "token", "token", "done"]
+    assert calls == 1
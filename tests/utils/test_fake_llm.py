@@ -0,0 +1,60 @@
+import pytest
+from langchain_core.messages import HumanMessage
+from agent.answer_grader import split_answer_key
+from agent.interview_response import QAResult, InterviewResult, GradeAndAskResult
+from utils.fake_llm import FakeInterviewChatModel, FakeLLMError, INTERVIEW_OVER
+from utils import llm
+
+
+def _model(**kwargs) -> FakeInterviewChatModel:
+    return FakeInterviewChatModel(**{"latency_seconds": 0.001, "latency_sigma": 0, "tokens_per_second": 0, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_questions_are_deterministic_and_carry_answer_key():
+    """Test the same prompt gives the same question, numbered after the history, until the interview is over"""
+    model = _model(questions_per_interview=3)
+    first = await model.ainvoke([HumanMessage(content="history: Q1 : Python Score:5")])
+    again = await model.ainvoke([HumanMessage(content="history: Q1 : Python Score:5")])
+    assert first.content == again.content
+
+    question, question_key = split_answer_key(first.content)
+    assert question.startswith("Q2")
+    assert question_key is not None and question_key.question_number == 2
+
+    over = await model.ainvoke([HumanMessage(content="Q1 Q2 Q3")])
+    assert over.content == INTERVIEW_OVER
+
+
+@pytest.mark.asyncio
+async def test_structured_output_is_schema_valid():
+    """Test structured output calls return the workflow schemas"""
+    model = _model()
+    prompt = [HumanMessage(content="Q1 : Python Score:3\nQ2 : Testing Score:5")]
+    assert isinstance(await model.with_structured_output(QAResult).ainvoke(prompt), QAResult)
+    result = await model.with_structured_output(InterviewResult).ainvoke(prompt)
+    assert result.total_question_number == 2
+    grade_and_ask = await model.with_structured_output(GradeAndAskResult).ainvoke(prompt)
+    assert grade_and_ask.next_question.startswith("Q3")
+
+
+@pytest.mark.asyncio
+async def test_streaming_and_errors():
+    """Test the question is streamed in chunks and error_rate injects failures"""
+    chunks = [chunk.content async for chunk in _model(tokens_per_second=1000).astream([HumanMessage(content="Q1")])]
+    assert len(chunks) > 1
+
+    with pytest.raises(FakeLLMError):
+        await _model(error_rate=1.0).ainvoke([HumanMessage(content="Q1")])
+
+
+@pytest.mark.asyncio
+async def test_get_model_fake_backend(monkeypatch):
+    """Test LLM_BACKEND=fake swaps in the fake chat model"""
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY_SECONDS", "0")
+    try:
+        model = llm.get_model(model="fake-test", output_schema=QAResult)
+        assert isinstance(await model.ainvoke([HumanMessage(content="Q1")]), QAResult)
+    finally:
+        await llm.close_clients()
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import BaseModel
+from langchain_core.tools import tool
+from utils.llm import get_model, get_http_clients, warmup_models, close_clients
+from utils import llm
+
+
+class Result(BaseModel):
+    score: int
+
+
+@tool
+def lookup(keyword: str) -> str:
+    """Lookup a keyword"""
+    return keyword
+
+
+@pytest.fixture(autouse=True)
+async def reset_registry():
+    yield
+    await close_clients()
+
+
+def test_get_model_returns_cached_instance():
+    """Test the same key returns the same model instance"""
+    assert get_model(model="gpt-4o") is get_model(model="gpt-4o")
+    assert get_model(model="gpt-4o", output_schema=Result) is get_model(model="gpt-4o", output_schema=Result)
+    assert get_model(model="gpt-4o", tools=[lookup]) is get_model(model="gpt-4o", tools=[lookup])
+
+
+def test_get_model_keys():
+    """Test model, temperature, tools and output schema are all part of the key"""
+    base = get_model(model="gpt-4o")
+    assert get_model(model="gpt-4o-mini") is not base
+    assert get_model(model="gpt-4o", temperature=0) is not base
+    assert get_model(model="gpt-4o", tools=[lookup]) is not base
+    assert get_model(model="gpt-4o", output_schema=Result) is not base
+
+
+def test_models_share_http_clients():
+    """Test all models share the same connection pools"""
+    http_client, http_async_client = get_http_clients()
+    first = get_model(model="gpt-4o")
+    second = get_model(model="gpt-4o-mini")
+    assert first.http_client is second.http_client is http_client
+    assert first.http_async_client is second.http_async_client is http_async_client
+
+
+@pytest.mark.asyncio
+async def test_warmup_and_close():
+    """Test warmup fills the registry and close clears it"""
+    warmup_models([{"model": "gpt-4o"}, {"model": "gpt-4o", "output_schema": Result}])
+    assert len(llm._models) == 2
+
+    await close_clients()
+    assert len(llm._models) == 0
+    assert llm._http_client is None
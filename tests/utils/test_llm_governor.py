@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.graph import StateGraph, START, END
+from typing_extensions import TypedDict
+from utils.llm_metrics import llm_node
+from utils.llm_governor import ModelLimiter, LLMPriority, GovernedModel, get_priority, llm_governor, llm_queue_wait
+
+
+@pytest.mark.asyncio
+async def test_limiter_serves_waiters_by_priority():
+    """Test waiting live calls are served before earlier kickoff and background calls"""
+    limiter = ModelLimiter("test", max_concurrency=1)
+    await limiter.acquire(LLMPriority.LIVE)
+    order = []
+
+    async def call(priority: LLMPriority):
+        await limiter.acquire(priority)
+        order.append(priority)
+        limiter.release()
+
+    tasks = [asyncio.create_task(call(p)) for p in (LLMPriority.BACKGROUND, LLMPriority.KICKOFF, LLMPriority.LIVE)]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert order == [LLMPriority.LIVE, LLMPriority.KICKOFF, LLMPriority.BACKGROUND]
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_reserves_slots_for_live_calls():
+    """Test background calls only use their share of the concurrency"""
+    limiter = ModelLimiter("test", max_concurrency=4)
+    await limiter.acquire(LLMPriority.BACKGROUND)
+    await limiter.acquire(LLMPriority.BACKGROUND)
+
+    background = asyncio.create_task(limiter.acquire(LLMPriority.BACKGROUND))
+    await asyncio.sleep(0)
+    assert not background.done()
+
+    # live calls still get the reserved slots
+    await asyncio.wait_for(limiter.acquire(LLMPriority.LIVE), timeout=1)
+    assert limiter.active == 3
+
+    # the waiting background call runs once background calls are below their share again
+    limiter.release()
+    await asyncio.sleep(0)
+    assert not background.done()
+    limiter.release()
+    await asyncio.wait_for(background, timeout=1)
+    assert limiter.active == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_token_bucket_and_cancellation():
+    """Test the token bucket spaces out calls and cancelled waiters give their place back"""
+    limiter = ModelLimiter("test", max_concurrency=10, requests_per_second=20, burst=1)
+    await limiter.acquire(LLMPriority.LIVE)
+
+    cancelled = asyncio.create_task(limiter.acquire(LLMPriority.LIVE))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    started = asyncio.get_running_loop().time()
+    await asyncio.wait_for(limiter.acquire(LLMPriority.LIVE), timeout=1)
+    assert asyncio.get_running_loop().time() - started >= 0.03
+    assert limiter.active == 2
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_governed_model_priority_from_workflow_node():
+    """Test calls inside a workflow node are live, kickoff is lower and calls outside the graph are background"""
+    model = GovernedModel(bound=FakeListChatModel(responses=["ok"] * 3), model_name="governor-test")
+    priorities = []
+
+    class State(TypedDict):
+        answer: str
+
+    async def analyze_answer(state: State):
+        priorities.append(get_priority())
+        return {"answer": (await model.ainvoke("hi")).content}
+
+    async def kickoff_interview(state: State):
+        priorities.append(get_priority())
+        return {"answer": (await model.ainvoke("hi")).content}
+
+    async def summarize_interview(state: State):
+        priorities.append(get_priority())
+        return {"answer": (await model.ainvoke("hi")).content}
+
+    builder = StateGraph(State)
+    builder.add_node("kickoff_interview", kickoff_interview)
+    builder.add_node("analyze_answer", analyze_answer)
+    builder.add_edge(START, "kickoff_interview")
+    builder.add_edge("kickoff_interview", "analyze_answer")
+    builder.add_node("summarize_interview", summarize_interview)
+    builder.add_edge("analyze_answer", "summarize_interview")
+    builder.add_edge("summarize_interview", END)
+    assert (await builder.compile().ainvoke({"answer": ""}))["answer"] == "ok"
+
+    assert (await model.ainvoke("hi")).content == "ok"
+    assert priorities == [LLMPriority.KICKOFF, LLMPriority.LIVE, LLMPriority.BACKGROUND]
+    assert llm_queue_wait.get_count(model="governor-test", priority="background") == 2
+    assert llm_queue_wait.get_count(model="governor-test", priority="live") == 1
+    assert llm_governor.get_limiter("governor-test").active == 0
+
+
+def test_configured_limits_per_model():
+    """Test configure replaces the limiters with the default limits and the per model overrides"""
+    before = llm_governor.get_limiter("governor-test")
+    try:
+        llm_governor.configure(default={"max_concurrency": 8, "requests_per_second": 2},
+                               models={"governor-test": {"max_concurrency": 3}})
+        limiter = llm_governor.get_limiter("governor-test")
+        assert limiter is not before
+        assert (limiter.max_concurrency, limiter.requests_per_second, limiter.burst) == (3, 2, 2)
+        other = llm_governor.get_limiter("governor-other")
+        assert (other.max_concurrency, other.requests_per_second) == (8, 2)
+    finally:
+        llm_governor.configure()
+    assert llm_governor.get_limiter("governor-test").max_concurrency == 50
+
+
+def test_deferred_summary_label_is_background():
+    """Test the llm_node label of the deferred summary overrides the workflow node"""
+    with llm_node("summarize_interview"):
+        assert get_priority({"metadata": {"langgraph_node": "analyze_answer"}}) == LLMPriority.BACKGROUND
+    with llm_node("question_pool"):
+        assert get_priority() == LLMPriority.BACKGROUND
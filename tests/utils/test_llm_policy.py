@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from typing import Any, List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from utils.llm_governor import GovernedModel, llm_governor
+from utils.llm_policy import (
+    LLMCallPolicy, LLMDeadlineExceeded, FirstTokenLatencies, first_token_latencies, get_call_policy, llm_deadline,
+    llm_hedged, llm_hedge_wins, llm_deadline_exceeded
+)
+
+
+class DelayedChatModel(BaseChatModel):
+    """Answers the n-th call after delays[n] seconds"""
+
+    delays: List[float]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed"
+
+    def _generate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        call = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.delays[call])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"call {call}"))])
+
+
+def _config(**policy) -> dict:
+    return {"configurable": {"llm_policies": {"default": policy}}}
+
+
+def test_call_policy_per_node_and_deadline():
+    """Test policies are looked up by node and the deadline follows the remaining interview time"""
+    config = {"configurable": {"llm_policies": {"default": {"timeout_seconds": 120},
+                                                "send_next_question": {"timeout_seconds": 60, "min_timeout_seconds": 15}}},
+              "metadata": {"langgraph_node": "send_next_question"}}
+    policy = get_call_policy(config)
+    assert policy == LLMCallPolicy(timeout_seconds=60, min_timeout_seconds=15)
+    assert get_call_policy({"metadata": {"langgraph_node": "analyze_answer"}, **config}).timeout_seconds == 60
+    assert get_call_policy({}).timeout_seconds is None
+
+    assert policy.get_timeout() == 60
+    with llm_deadline(30):
+        assert policy.get_timeout() == 30
+    with llm_deadline(0):
+        assert policy.get_timeout() == 15
+
+
+def test_first_token_latencies_percentile():
+    """Test the hedging delay is learned only once enough calls were observed"""
+    latencies = FirstTokenLatencies(window=100, min_samples=10)
+    for i in range(9):
+        latencies.observe("gpt-4o", i / 10)
+    assert latencies.percentile("gpt-4o", 0.9) is None
+    latencies.observe("gpt-4o", 0.9)
+    assert latencies.percentile("gpt-4o", 0.9) == 0.9
+    assert latencies.percentile("gpt-4o", 0.5) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_returns_first_response():
+    """Test a late call is hedged, the duplicate wins and the slow request is cancelled"""
+    model_name = "hedge-test"
+    for _ in range(first_token_latencies.min_samples):
+        first_token_latencies.observe(model_name, 0.01)
+    bound = DelayedChatModel(delays=[5, 0.01])
+    model = GovernedModel(bound=bound, model_name=model_name)
+    labels = {"node": "other", "model": model_name}
+    hedged, wins = llm_hedged.get(**labels), llm_hedge_wins.get(**labels)
+
+    response = await asyncio.wait_for(model.ainvoke("hi", _config(hedge=True, hedge_min_delay_seconds=0.05)), timeout=2)
+
+    assert response.content == "call 1"
+    assert bound.calls == 2
+    assert llm_hedged.get(**labels) == hedged + 1
+    assert llm_hedge_wins.get(**labels) == wins + 1
+    # the primary slot and the hedge slot are both released
+    assert llm_governor.get_limiter(model_name).active == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    """Test no duplicate request is sent when the first token arrives before the hedging delay"""
+    model_name = "hedge-fast-test"
+    for _ in range(first_token_latencies.min_samples):
+        first_token_latencies.observe(model_name, 0.2)
+    bound = DelayedChatModel(delays=[0.01])
+    model = GovernedModel(bound=bound, model_name=model_name)
+
+    response = await model.ainvoke("hi", _config(hedge=True))
+    await asyncio.sleep(0.3)
+
+    assert response.content == "call 0"
+    assert bound.calls == 1
+    assert llm_hedged.get(node="other", model=model_name) == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded():
+    """Test a call is cancelled at the node deadline bounded by the remaining interview time"""
+    model_name = "deadline-test"
+    model = GovernedModel(bound=DelayedChatModel(delays=[5]), model_name=model_name)
+
+    with llm_deadline(0):
+        with pytest.raises(LLMDeadlineExceeded):
+            await model.ainvoke("hi", _config(timeout_seconds=60, min_timeout_seconds=0.05))
+
+    assert llm_deadline_exceeded.get(node="other", model=model_name) == 1
+    assert llm_governor.get_limiter(model_name).active == 0
@@ -0,0 +1,91 @@
+import pytest
+from loguru import logger
+from mongoengine import Document, StringField
+from mongoengine.queryset import QuerySet
+
+from api.utils.log_decorator import call_duration, log, log_settings, summarize
+
+
+class Note(Document):
+    meta = {"collection": "log_decorator_notes"}
+    text = StringField()
+
+
+class NoteService:
+    @log
+    async def get_notes(self, limit: int = 10):
+        return [Note(text="x" * 1000) for _ in range(limit)]
+
+    @log(sample_rate=0)
+    async def count(self):
+        return 3
+
+    @log
+    async def fail(self):
+        raise ValueError("boom")
+
+
+@pytest.fixture
+def messages():
+    records = []
+    sink = logger.add(lambda message: records.append(message.record), level="DEBUG", format="{message}")
+    yield records
+    logger.remove(sink)
+
+
+def test_summarize_reduces_documents_and_truncates():
+    assert summarize([Note(text="x" * 1000) for _ in range(50)]) == "<50 Note>"
+    assert len(summarize("y" * 1000, max_length=20)) <= 23
+    assert summarize({"a": 1}) == "{'a': 1}"
+
+
+def test_summarize_does_not_run_query_sets(monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError("query executed")
+    monkeypatch.setattr(QuerySet, "__iter__", forbidden)
+    monkeypatch.setattr(QuerySet, "__repr__", forbidden)
+    assert summarize(QuerySet(Note, None)) == "<QuerySet Note>"
+
+
+@pytest.mark.asyncio
+async def test_entry_and_exit_are_summarized(messages):
+    result = await NoteService().get_notes(limit=30)
+
+    assert len(result) == 30
+    enter, exit_ = [record["message"] for record in messages]
+    assert enter.startswith("Enter NoteService.get_notes") and "'limit': 30" in enter
+    assert "Result: <30 Note>" in exit_
+    assert "x" * 100 not in exit_
+
+
+@pytest.mark.asyncio
+async def test_arguments_are_not_formatted_when_level_is_disabled(messages, monkeypatch):
+    formatted = []
+    monkeypatch.setattr("api.utils.log_decorator.summarize", lambda value: formatted.append(value) or "")
+    monkeypatch.setattr(log_settings, "level", "TRACE")
+
+    await NoteService().get_notes(limit=1)
+
+    assert formatted == [] and messages == []
+
+
+@pytest.mark.asyncio
+async def test_unsampled_calls_are_timed_but_not_logged(messages):
+    before = call_duration.get_count(method="NoteService.count", outcome="success")
+
+    assert await NoteService().count() == 3
+
+    assert messages == []
+    assert call_duration.get_count(method="NoteService.count", outcome="success") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_always_logged(messages, monkeypatch):
+    monkeypatch.setattr(log_settings, "sample_rate", 0)
+
+    with pytest.raises(ValueError):
+        await NoteService().fail()
+
+    record, = messages
+    assert record["level"].name == "ERROR" and "Error in NoteService.fail" in record["message"]
+    assert call_duration.get_count(method="NoteService.fail", outcome="error") >= 1
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import threading
+import pytest
+from loguru import logger
+
+from utils.log_sink import BatchedJsonSink, log_records_dropped, parse_size
+from utils.log_utils import add_workflow_node, configure_json_logging, setup_logger
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def add_sink():
+    handlers = []
+
+    def add(sink, level="DEBUG"):
+        handlers.append(logger.add(sink, level=level, format=lambda record: ""))
+        return sink
+
+    yield add
+    for handler in handlers:
+        logger.remove(handler)
+
+
+def test_parse_size():
+    assert parse_size("500 MB") == 500 * 1024 ** 2
+    assert parse_size("1.5kb") == 1536
+    assert parse_size("42") == 42
+    with pytest.raises(ValueError):
+        parse_size("big")
+
+
+def test_records_are_written_as_json_lines_with_bound_fields(tmp_path, add_sink):
+    sink = add_sink(BatchedJsonSink(str(tmp_path / "app_{pid}.jsonl")))
+
+    with logger.contextualize(test_id="t1"):
+        logger.bind(duration=0.25).info("turn finished")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    sink.stop()
+
+    finished, failed = read_lines(tmp_path / f"app_{os.getpid()}.jsonl")
+    assert finished["message"] == "turn finished" and finished["level"] == "INFO"
+    assert finished["test_id"] == "t1" and finished["duration"] == 0.25
+    assert failed["level"] == "ERROR" and "ValueError: boom" in failed["exception"]
+
+
+def test_full_queue_drops_records_without_blocking(tmp_path, add_sink, monkeypatch):
+    release = threading.Event()
+    write_batch = BatchedJsonSink._write_batch
+
+    def blocked_write(self, records):
+        release.wait(5)
+        write_batch(self, records)
+
+    monkeypatch.setattr(BatchedJsonSink, "_write_batch", blocked_write)
+    sink = add_sink(BatchedJsonSink(str(tmp_path / "app.jsonl"), queue_size=2))
+    before = log_records_dropped.get(sink="app.jsonl")
+
+    for i in range(10):
+        logger.info(f"record {i}")
+    release.set()
+    sink.stop()
+
+    lines = read_lines(tmp_path / "app.jsonl")
+    assert sink.dropped > 0
+    assert log_records_dropped.get(sink="app.jsonl") - before == sink.dropped
+    records = [line for line in lines if "dropped" not in line]
+    assert [line["dropped"] for line in lines if "dropped" in line] == [sink.dropped]
+    assert len(records) + sink.dropped == 10
+
+
+def test_rotation_compresses_and_keeps_retention(tmp_path, add_sink, monkeypatch):
+    # every rotation gets its own timestamp
+    stamps = iter(range(100))
+    monkeypatch.setattr("utils.log_sink.time.strftime", lambda fmt: f"2026{next(stamps):04d}")
+    sink = add_sink(BatchedJsonSink(str(tmp_path / "app.jsonl"), rotation="100 B", retention=2, batch_size=1))
+
+    for i in range(5):
+        logger.info(f"record {i} " + "x" * 100)
+    sink.stop()
+
+    rotated = sorted(name for name in os.listdir(tmp_path) if name.endswith(".gz"))
+    assert len(rotated) == 2
+    with gzip.open(tmp_path / rotated[-1], "rt", encoding="utf-8") as f:
+        assert json.loads(f.readline())["message"].startswith("record 4")
+
+
+def test_workflow_node_is_added_from_the_runnable_config():
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    token = var_child_runnable_config.set({"metadata": {"langgraph_node": "analyze_answer"}})
+    try:
+        record = {"extra": {}}
+        add_workflow_node(record)
+    finally:
+        var_child_runnable_config.reset(token)
+    assert record["extra"] == {"node": "analyze_answer"}
+
+    record = {"extra": {}}
+    add_workflow_node(record)
+    assert record["extra"] == {}
+
+
+def test_api_logging_uses_a_single_json_sink(tmp_path):
+    """Test configure_json_logging replaces the console and default file sinks"""
+    try:
+        configure_json_logging(str(tmp_path / "api_{pid}.jsonl"))
+        assert len(logger._core.handlers) == 1
+        logger.bind(test_id="t1").info("hello")
+    finally:
+        # the sink is stopped and flushed when removed
+        setup_logger()
+
+    record, = read_lines(tmp_path / f"api_{os.getpid()}.jsonl")
+    assert (record["message"], record["test_id"]) == ("hello", "t1")
@@ -0,0 +1,76 @@
+import asyncio
+from uuid import uuid4
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from utils.metrics import MetricsRegistry
+from utils.llm_metrics import (
+    LLMMetricsCallbackHandler, llm_node, llm_request_duration, llm_time_to_first_token,
+    llm_prompt_tokens, llm_completion_tokens, llm_cost
+)
+
+
+def test_registry_renders_prometheus_text():
+    """Test counters and histograms render in the Prometheus text format"""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("node",))
+    latency = registry.histogram("latency_seconds", "Latency", ("node",), buckets=(1, 5))
+    requests.inc(node="kickoff")
+    requests.inc(2, node="kickoff")
+    latency.observe(0.5, node='say "hi"')
+    latency.observe(3, node='say "hi"')
+
+    assert registry.counter("requests_total", "Requests", ("node",)) is requests
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{node="kickoff"} 3' in text
+    assert 'latency_seconds_bucket{node="say \\"hi\\"",le="1"} 1' in text
+    assert 'latency_seconds_bucket{node="say \\"hi\\"",le="5"} 2' in text
+    assert 'latency_seconds_bucket{node="say \\"hi\\"",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{node="say \\"hi\\""} 2' in text
+    assert 'latency_seconds_sum{node="say \\"hi\\""} 3.5' in text
+
+
+def _result(input_tokens: int, output_tokens: int) -> LLMResult:
+    message = AIMessage(content="ok", usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens
+    })
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+def test_callback_records_latency_tokens_and_cost():
+    """Test a finished call records latency, first token time, tokens and cost by node and model"""
+    handler = LLMMetricsCallbackHandler()
+    labels = {"node": "metrics_test_node", "model": "gpt-4o-mini-2024-07-18"}
+    count = llm_request_duration.get_count(outcome="success", **labels)
+    cost = llm_cost.get(**labels)
+
+    run_id = uuid4()
+    handler.on_chat_model_start({}, [], run_id=run_id,
+                                metadata={"langgraph_node": labels["node"], "ls_model_name": labels["model"]})
+    handler.on_llm_new_token("o", run_id=run_id)
+    handler.on_llm_new_token("k", run_id=run_id)
+    handler.on_llm_end(_result(1000, 500), run_id=run_id)
+
+    assert llm_request_duration.get_count(outcome="success", **labels) == count + 1
+    assert llm_time_to_first_token.get_sum(**labels) <= llm_request_duration.get_sum(outcome="success", **labels)
+    assert llm_prompt_tokens.get_sum(**labels) >= 1000
+    assert llm_completion_tokens.get_sum(**labels) >= 500
+    # versioned model names use the price of gpt-4o-mini
+    assert abs(llm_cost.get(**labels) - cost - (1000 * 0.15 + 500 * 0.6) / 1_000_000) < 1e-12
+
+
+def test_callback_labels_calls_outside_graph_and_errors():
+    """Test llm_node labels calls outside the graph and failed calls are counted as errors"""
+    handler = LLMMetricsCallbackHandler()
+    labels = {"node": "metrics_test_background", "model": "gpt-4o"}
+    count = llm_request_duration.get_count(outcome="error", **labels)
+
+    async def call():
+        with llm_node(labels["node"]):
+            run_id = uuid4()
+            handler.on_chat_model_start({}, [], run_id=run_id, metadata={"ls_model_name": "gpt-4o"})
+            handler.on_llm_error(TimeoutError(), run_id=run_id)
+
+    asyncio.run(call())
+    assert llm_request_duration.get_count(outcome="error", **labels) == count + 1
+    assert llm_prompt_tokens.get_count(**labels) == 0
@@ -0,0 +1,81 @@
+import os
+import pytest
+from unittest.mock import patch
+from utils.prompt_utils import PromptRegistry, PromptTemplate, load_prompt
+
+
+@pytest.fixture
+def registry(tmp_path):
+    prompt_dir = tmp_path / "prompts"
+    prompt_dir.mkdir()
+    (prompt_dir / "greeting.txt").write_text("你好 {name}，面试时间 {minutes:>3} 分钟", encoding="utf-8")
+    (prompt_dir / "greeting.english.txt").write_text("Hello {name}", encoding="utf-8")
+    return PromptRegistry(base_dir=str(tmp_path), check_interval=0)
+
+
+def test_prompt_template_format_matches_str_format():
+    """Test compiled templates render the same as str.format"""
+    template = "Q{number}: {question!r} {{literal}} {score:.1f}"
+    values = {"number": 1, "question": "What is React?", "score": 4.5}
+    assert PromptTemplate(template, 0).format(**values) == template.format(**values)
+
+
+def test_get_prompt_is_cached(registry):
+    """Test the file is read only once while its mtime does not change"""
+    first = registry.get("prompts/greeting.txt")
+    with patch("builtins.open") as mock_open:
+        second = registry.get("prompts/greeting.txt")
+    assert first is second
+    mock_open.assert_not_called()
+    assert second.format(name="张三", minutes=30) == "你好 张三，面试时间  30 分钟"
+
+
+def test_get_prompt_reloads_when_mtime_changes(registry, tmp_path):
+    """Test a modified file is reloaded"""
+    path = tmp_path / "prompts" / "greeting.txt"
+    registry.get("prompts/greeting.txt")
+    path.write_text("Hi {name}", encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert registry.get("prompts/greeting.txt").format(name="Tom") == "Hi Tom"
+
+
+def test_get_prompt_language_variant(registry):
+    """Test language variants are used when available and fall back otherwise"""
+    assert registry.get("prompts/greeting.txt", "English").format(name="Tom") == "Hello Tom"
+    assert registry.get("prompts/greeting.txt", "Chinese").format(name="Tom", minutes=5).startswith("你好 Tom")
+
+
+def test_load_all(registry):
+    """Test all templates are loaded up front"""
+    registry.load_all()
+    assert set(registry._templates.keys()) == {
+        os.path.join("prompts", "greeting.txt"),
+        os.path.join("prompts", "greeting.english.txt")
+    }
+
+
+def test_include_is_expanded_and_reloaded(registry, tmp_path):
+    """Test '@include' lines are replaced by the included file, which is reloaded when modified"""
+    rules = tmp_path / "prompts" / "rules.txt"
+    rules.write_text("Interview for {job}\n", encoding="utf-8")
+    (tmp_path / "prompts" / "ask.txt").write_text("@include prompts/rules.txt\nAsk a question", encoding="utf-8")
+    assert registry.get("prompts/ask.txt").format(job="React") == "Interview for React\nAsk a question"
+
+    rules.write_text("Hire a {job}\n", encoding="utf-8")
+    stat = os.stat(rules)
+    os.utime(rules, (stat.st_atime, stat.st_mtime + 10))
+    assert registry.get("prompts/ask.txt").format(job="React") == "Hire a React\nAsk a question"
+
+
+def test_circular_include_is_rejected(registry, tmp_path):
+    (tmp_path / "prompts" / "loop.txt").write_text("@include prompts/loop.txt\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        registry.get("prompts/loop.txt")
+
+
+def test_load_prompt_keeps_raw_template():
+    """Test load_prompt still returns the raw template text"""
+    assert "{job_title}" in load_prompt("prompts/kickoff_interview.txt")
+    assert "{question}" in load_prompt("prompts/grade_and_ask.txt")
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Type
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, PrivateAttr
+from agent.interview_response import Question, Answer, QAResult, QuestionType, GradeAndAskResult, InterviewResult
+
+INTERVIEW_OVER = "面试结束，感谢您的参与 (Interview Over)"
+
+KNOWLEDGE_POINTS = ("Python", "Data Structures", "Concurrency", "Databases", "Networking", "Testing")
+
+
+class FakeLLMError(Exception):
+    """Injected upstream failure of the fake chat model"""
+
+
+class FakeInterviewChatModel(BaseChatModel):
+    """
+    Deterministic chat model for load tests, no upstream calls
+
+    Plain calls return an interview question ending with its answer key line, or the interview
+    over message after questions_per_interview questions. Structured output calls return valid
+    QAResult, GradeAndAskResult and InterviewResult objects. The same prompt and seed always
+    produce the same output; latency follows a log-normal distribution around latency_seconds
+    and a share error_rate of the calls fail.
+    """
+
+    model_name: str = "fake"
+    seed: int = 0
+    # median latency before the first token
+    latency_seconds: float = 0.5
+    # log-normal shape of the latency, 0 for a constant latency
+    latency_sigma: float = 0.3
+    # streaming speed after the first token, 0 to stream everything at once
+    tokens_per_second: float = 50
+    # share of the calls failing with FakeLLMError after the latency
+    error_rate: float = 0.0
+    questions_per_interview: int = 5
+
+    _schemas: Dict[str, Type[BaseModel]] = PrivateAttr(default_factory=dict)
+    # latencies and failures are a seeded sequence, so that a failed prompt may succeed when retried
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls, model: str) -> "FakeInterviewChatModel":
+        """Create the model from the FAKE_LLM_* environment variables"""
+        return cls(
+            model_name=model,
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            latency_seconds=float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5")),
+            latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.3")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            questions_per_interview=int(os.getenv("FAKE_LLM_QUESTIONS", "5"))
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-interview"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Runnable:
+        """Bind pydantic schemas, the structured output of the model is built from them"""
+        for tool in tools:
+            if isinstance(tool, type) and issubclass(tool, BaseModel):
+                self._schemas[tool.__name__] = tool
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _respond(self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]) -> tuple:
+        """The response message derived from the prompt, and the latency of the call"""
+        prompt = "\n".join(str(message.content) for message in messages)
+        rng = random.Random(f"{self.seed}:{self.model_name}:{prompt}")
+        latency = self.latency_seconds * (self._rng.lognormvariate(0, self.latency_sigma) if self.latency_sigma > 0 else 1)
+        if self._rng.random() < self.error_rate:
+            return FakeLLMError(f"Injected failure of {self.model_name}"), latency
+
+        if tools:
+            name = tools[0]["function"]["name"]
+            schema = self._schemas.get(name)
+            if schema is None:
+                raise ValueError(f"Unknown structured output schema {name}")
+            result = build_structured_output(schema, prompt, rng, self.questions_per_interview)
+            return AIMessage(content="", tool_calls=[
+                {"name": name, "args": result.model_dump(mode="json"), "id": f"call_{rng.getrandbits(64):x}"}
+            ]), latency
+
+        return AIMessage(content=build_question(prompt, rng, self.questions_per_interview)), latency
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message, latency = self._respond(messages, kwargs.get("tools"))
+        time.sleep(latency)
+        if isinstance(message, Exception):
+            raise message
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=_usage(messages, message))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        message, latency = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(latency)
+        if isinstance(message, Exception):
+            raise message
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=_usage(messages, message))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        message, latency = self._respond(messages, kwargs.get("tools"))
+        time.sleep(latency)
+        if isinstance(message, Exception):
+            raise message
+        for chunk in self._chunks(message):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            if self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        message, latency = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(latency)
+        if isinstance(message, Exception):
+            raise message
+        for chunk in self._chunks(message):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+
+    def _chunks(self, message: AIMessage) -> List[ChatGenerationChunk]:
+        if message.tool_calls:
+            return [ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+                for call in message.tool_calls
+            ]))]
+        # one chunk per word, roughly one token each
+        words = re.findall(r"\S+\s*|\s+", message.content) if self.tokens_per_second > 0 else [message.content]
+        return [ChatGenerationChunk(message=AIMessageChunk(content=word)) for word in words]
+
+
+def _usage(messages: List[BaseMessage], message: AIMessage) -> Dict[str, Any]:
+    prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+    completion_tokens = len(message.content or json.dumps([call["args"] for call in message.tool_calls])) // 4
+    return {"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}}
+
+
+def get_next_question_number(prompt: str) -> int:
+    """The question numbers in the rendered history are "Q<number>", the next one follows the highest"""
+    return max((int(n) for n in re.findall(r"Q(\d+)", prompt)), default=0) + 1
+
+
+def build_question(prompt: str, rng: random.Random, questions_per_interview: int) -> str:
+    """A question with its answer key line, alternating single choice, true/false and short answer"""
+    number = get_next_question_number(prompt)
+    if number > questions_per_interview:
+        return INTERVIEW_OVER
+
+    knowledge_point = rng.choice(KNOWLEDGE_POINTS)
+    question_type = (QuestionType.SINGLE_CHOICE, QuestionType.TRUE_FALSE, QuestionType.SHORT_ANSWER)[number % 3]
+    if question_type == QuestionType.SINGLE_CHOICE:
+        answer = rng.choice("ABCD")
+        options = "\n\n".join(f"{letter}. Option {letter} about {knowledge_point}" for letter in "ABCD")
+        text = f"Q{number} (Single Choice): Which statement about {knowledge_point} is correct?\n\n{options}"
+    elif question_type == QuestionType.TRUE_FALSE:
+        answer = rng.choice(("True", "False"))
+        text = f"Q{number} (True False): {knowledge_point} statement number {rng.randint(1, 100)} is true."
+    else:
+        answer = f"A short explanation of {knowledge_point}"
+        text = f"Q{number} (Short Answer): Explain a common pitfall of {knowledge_point}."
+
+    key = {"question_number": number, "question_type": question_type.value,
+           "answer": answer, "knowledge_point": knowledge_point}
+    return f"{text}\n\n<answer_key>{json.dumps(key)}</answer_key>"
+
+
+def build_qa_result(prompt: str, rng: random.Random, questions_per_interview: int) -> QAResult:
+    number = max(1, get_next_question_number(prompt) - 1)
+    score = rng.randint(0, 5)
+    return QAResult(
+        question=Question(question=f"Q{number}", question_number=number, question_type=QuestionType.SHORT_ANSWER,
+                          knowledge_point=rng.choice(KNOWLEDGE_POINTS), answer=""),
+        answer=Answer(is_valid=True, giveup=False, suggest_more_details=False, follow_up_question="",
+                      feedback="Thanks, your answer has been recorded.", is_correct=score >= 3,
+                      analysis=f"Fake analysis with score {score}", score=score),
+        is_interview_over=False,
+        summary=f"Q{number} : fake Answer:recorded Score:{score}"
+    )
+
+
+def build_interview_result(prompt: str, rng: random.Random, questions_per_interview: int) -> InterviewResult:
+    total = max(0, get_next_question_number(prompt) - 1)
+    correct = rng.randint(0, total)
+    return InterviewResult(summary=f"Fake summary of {total} questions", total_question_number=total,
+                           correct_question_number=correct, score=round(10 * correct / total) if total else 0,
+                           interview_time=0)
+
+
+def build_grade_and_ask_result(prompt: str, rng: random.Random, questions_per_interview: int) -> GradeAndAskResult:
+    return GradeAndAskResult(qa_result=build_qa_result(prompt, rng, questions_per_interview),
+                             next_question=build_question(prompt, rng, questions_per_interview))
+
+
+STRUCTURED_OUTPUT_BUILDERS: Dict[Type[BaseModel], Callable[[str, random.Random, int], BaseModel]] = {
+    QAResult: build_qa_result,
+    GradeAndAskResult: build_grade_and_ask_result,
+    InterviewResult: build_interview_result,
+}
+
+
+def build_structured_output(schema: Type[BaseModel], prompt: str, rng: random.Random,
+                            questions_per_interview: int) -> BaseModel:
+    builder = STRUCTURED_OUTPUT_BUILDERS.get(schema)
+    if builder is None:
+        raise ValueError(f"Fake chat model does not support {schema.__name__}")
+    return builder(prompt, rng, questions_per_interview)
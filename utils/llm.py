@@ -1,22 +1,139 @@
 import os
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Type
+import httpx
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable
 from langchain_core.tools import tool
 from dotenv import load_dotenv
+from pydantic import BaseModel
+from utils.llm_metrics import llm_metrics_handler
+from utils.llm_governor import GovernedModel
 
 # Load environment variables from .env file
 load_dotenv()
 
-def get_model(model: str = "gpt-4o", tools: list = None, temperature: float = 0.5) -> ChatOpenAI:
+# shared keep-alive connection pools, the connection limits cap upstream concurrency per process
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+# model registry keyed by (model, temperature, tools, output schema)
+_models: Dict[Tuple[Hashable, ...], Runnable] = {}
+_lock = threading.Lock()
+
+
+def _get_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+    )
+
+
+def _get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(float(os.getenv("LLM_TIMEOUT", "120")), connect=10.0)
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Get the shared sync and async HTTP clients used by every model"""
+    global _http_client, _http_async_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_get_limits(), timeout=_get_timeout())
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(limits=_get_limits(), timeout=_get_timeout())
+        return _http_client, _http_async_client
+
+
+def _tools_key(tools: Optional[list]) -> Tuple[str, ...]:
+    return tuple(getattr(t, "name", None) or getattr(t, "__name__", repr(t)) for t in tools or [])
+
+
+def get_model(model: str = "gpt-4o",
+              tools: list = None,
+              temperature: float = 0.5,
+              output_schema: Optional[Type[BaseModel]] = None) -> Runnable:
+    """
+    Get a chat model from the registry, creating it on first use
+
+    Models share one keep-alive connection pool, and the bound tools or structured
+    output schema are derived only once per (model, temperature, tools, output_schema).
+    Every call is recorded by the LLM metrics callback handler, and async calls
+    wait for a slot of the process wide LLM governor. LLM_BACKEND=fake swaps in the
+    deterministic fake chat model for offline load tests.
+
+    Args:
+        model: model name
+        tools: tools to bind to the model
+        temperature: sampling temperature
+        output_schema: pydantic model for structured output
+
+    Returns:
+        Runnable: the governed chat model, or structured output runnable if output_schema is set
+    """
+    key = (model, temperature, _tools_key(tools), output_schema)
+    cached = _models.get(key)
+    if cached is not None:
+        return cached
+
+    if os.getenv("LLM_BACKEND", "openai") == "fake":
+        # offline load tests, see utils/fake_llm.py
+        from utils.fake_llm import FakeInterviewChatModel
+        chat_model: Runnable = FakeInterviewChatModel.from_env(model)
+        chat_model.callbacks = [llm_metrics_handler]
+        return _register(key, model, chat_model, tools, output_schema)
+
+    http_client, http_async_client = get_http_clients()
     api_key = os.getenv("OPENAI_API_KEY", "any")
     base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-    
-    model = ChatOpenAI(
-        model=model, 
+
+    chat_model: Runnable = ChatOpenAI(
+        model=model,
         base_url=base_url,
         api_key=api_key,
-        temperature=temperature
+        temperature=temperature,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        callbacks=[llm_metrics_handler]
     )
-    
+
+    return _register(key, model, chat_model, tools, output_schema)
+
+
+def _register(key: Tuple[Hashable, ...],
+              model: str,
+              chat_model: Runnable,
+              tools: Optional[list],
+              output_schema: Optional[Type[BaseModel]]) -> Runnable:
     if tools and len(tools) > 0:
-        model = model.bind_tools(tools)
-    return model
+        chat_model = chat_model.bind_tools(tools)
+    if output_schema is not None:
+        chat_model = chat_model.with_structured_output(output_schema)
+    chat_model = GovernedModel(bound=chat_model, model_name=model)
+
+    with _lock:
+        return _models.setdefault(key, chat_model)
+
+
+def warmup_models(specs: List[Dict[str, Any]]) -> None:
+    """
+    Create the models in advance so that the first interview turn does not pay for it
+
+    Args:
+        specs: list of get_model keyword arguments
+    """
+    for spec in specs:
+        get_model(**spec)
+
+
+async def close_clients() -> None:
+    """Close the shared HTTP clients and clear the model registry"""
+    global _http_client, _http_async_client
+    with _lock:
+        http_client, http_async_client = _http_client, _http_async_client
+        _http_client, _http_async_client = None, None
+        _models.clear()
+    if http_client is not None:
+        http_client.close()
+    if http_async_client is not None:
+        await http_async_client.aclose()
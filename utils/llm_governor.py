@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import itertools
+import time
+import threading
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from langchain_core.runnables import RunnableBinding, RunnableConfig, ensure_config
+from langchain_core.runnables.config import merge_configs
+from utils.metrics import metrics_registry
+from utils.llm_metrics import get_llm_node
+from utils.llm_policy import (
+    LLMCallPolicy, LLMDeadlineExceeded, FirstTokenCallbackHandler, first_token_latencies, get_call_policy, get_node,
+    llm_hedged, llm_hedge_wins, llm_deadline_exceeded
+)
+
+
+class LLMPriority(IntEnum):
+    # answers of interviews in progress
+    LIVE = 0
+    # first question of a new interview
+    KICKOFF = 1
+    # summaries, question pool refills and other batch jobs
+    BACKGROUND = 2
+
+
+# workflow nodes and llm_node labels that are not live interview turns,
+# other calls outside the graph are background jobs
+NODE_PRIORITIES = {
+    "kickoff_interview": LLMPriority.KICKOFF,
+    "summarize_interview": LLMPriority.BACKGROUND,
+}
+
+# share of a model's concurrency each priority may use, so that live turns always find a free slot
+PRIORITY_SHARES = {
+    LLMPriority.LIVE: 1.0,
+    LLMPriority.KICKOFF: 0.8,
+    LLMPriority.BACKGROUND: 0.5,
+}
+
+llm_queue_wait = metrics_registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls wait for the concurrency governor", ("model", "priority"),
+    (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+llm_queued = metrics_registry.gauge(
+    "llm_queued_requests", "LLM calls waiting for the concurrency governor", ("model", "priority"))
+llm_in_flight = metrics_registry.gauge(
+    "llm_in_flight_requests", "LLM calls holding a governor slot", ("model",))
+
+
+def get_priority(config: Optional[RunnableConfig] = None) -> LLMPriority:
+    """Get the priority of a model call from its llm_node label or the workflow node running it"""
+    label = get_llm_node()
+    if label is not None:
+        return NODE_PRIORITIES.get(label, LLMPriority.BACKGROUND)
+    node = ensure_config(config).get("metadata", {}).get("langgraph_node")
+    if node is None:
+        return LLMPriority.BACKGROUND
+    return NODE_PRIORITIES.get(node, LLMPriority.LIVE)
+
+
+class ModelLimiter:
+    """
+    Concurrency limit and token bucket of one model, waiters are served by priority then arrival
+
+    A call needs a free slot within the share of its priority and a token from the bucket,
+    requests_per_second <= 0 disables the token bucket.
+    """
+
+    def __init__(self,
+                 model: str,
+                 max_concurrency: int,
+                 requests_per_second: float = 0,
+                 burst: Optional[int] = None,
+                 shares: Optional[Dict[LLMPriority, float]] = None):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max(1, int(requests_per_second))
+        self.shares = shares or PRIORITY_SHARES
+        self._active = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # (priority, arrival, future)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _limit(self, priority: LLMPriority) -> int:
+        return max(1, int(self.max_concurrency * self.shares.get(priority, 1.0)))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.requests_per_second > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.requests_per_second)
+        self._updated = now
+
+    def _try_take(self, priority: LLMPriority) -> Optional[float]:
+        """Take a slot and a token, return None on success or the seconds until the next token"""
+        if self._active >= self._limit(priority):
+            return 0
+        if self.requests_per_second > 0:
+            self._refill()
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self._active += 1
+        return None
+
+    def _dispatch(self) -> None:
+        """Wake up waiters in priority order while slots and tokens are available"""
+        self._timer = None
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._try_take(LLMPriority(priority))
+            if wait is not None:
+                # lower priorities have smaller shares, they cannot run either
+                if wait > 0:
+                    if self._timer is not None:
+                        self._timer.cancel()
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def try_acquire(self, priority: LLMPriority) -> bool:
+        """Take a slot without waiting, False if the call would have to queue"""
+        return not self.queued and self._try_take(priority) is None
+
+    async def acquire(self, priority: LLMPriority) -> None:
+        if not self._waiters and self._try_take(priority) is None:
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._arrivals), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot was granted while the caller was being cancelled
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+
+class LLMGovernor:
+    """
+    Process wide limiter of upstream LLM calls
+
+    Limits are set by configure from the llm_limits section of the API configuration:
+        default: limits of every model
+            max_concurrency: concurrent calls per model
+            requests_per_second: started calls per second per model, 0 for no limit
+            burst: token bucket size, 0 for one second of requests
+        models: per model overrides, e.g. {"gpt-4o": {"max_concurrency": 20, "requests_per_second": 5}}
+    Until then (CLI, tests) DEFAULT_LIMITS apply.
+    """
+
+    DEFAULT_LIMITS = {"max_concurrency": 50, "requests_per_second": 0, "burst": 0}
+
+    def __init__(self):
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+        self._default = dict(self.DEFAULT_LIMITS)
+        self._models: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self,
+                  default: Optional[Dict[str, Any]] = None,
+                  models: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Set the limits and drop the existing limiters, calls holding a slot release it to the old limiter"""
+        with self._lock:
+            self._default = {**self.DEFAULT_LIMITS, **(default or {})}
+            self._models = dict(models or {})
+            self._limiters.clear()
+
+    def get_limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is not None:
+            return limiter
+        with self._lock:
+            limits = {**self._default, **self._models.get(model, {})}
+            return self._limiters.setdefault(model, ModelLimiter(model, **limits))
+
+    @asynccontextmanager
+    async def slot(self, model: str, priority: LLMPriority) -> AsyncIterator[None]:
+        """Wait for a slot of the model, higher priorities are served first"""
+        limiter = self.get_limiter(model)
+        labels = {"model": model, "priority": priority.name.lower()}
+        started = time.perf_counter()
+        llm_queued.inc(**labels)
+        try:
+            await limiter.acquire(priority)
+        finally:
+            llm_queued.dec(**labels)
+        llm_queue_wait.observe(time.perf_counter() - started, **labels)
+
+        llm_in_flight.inc(model=model)
+        try:
+            yield
+        finally:
+            llm_in_flight.dec(model=model)
+            limiter.release()
+
+    def reset(self) -> None:
+        """Drop the limiters, they are created again with the current limits on next use"""
+        with self._lock:
+            self._limiters.clear()
+
+
+llm_governor = LLMGovernor()
+
+
+class GovernedModel(RunnableBinding):
+    """
+    Chat model whose async calls wait for a governor slot, the priority is derived from the calling node
+
+    ainvoke also applies the LLMCallPolicy of the node: a hard deadline bounded by the remaining
+    interview time, and optionally a hedged duplicate request when the first token is late.
+    """
+
+    model_name: str
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        policy = get_call_policy(config)
+        timeout = policy.get_timeout()
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                async with llm_governor.slot(self.model_name, get_priority(config)):
+                    if policy.hedge:
+                        return await self._hedged_ainvoke(policy, input, config, **kwargs)
+                    return await super().ainvoke(input, config, **kwargs)
+        except TimeoutError as e:
+            if not deadline.expired():
+                raise
+            node = get_node(config)
+            llm_deadline_exceeded.inc(node=node, model=self.model_name)
+            raise LLMDeadlineExceeded(f"LLM call of {node} exceeded its {timeout:.1f}s deadline") from e
+
+    async def _hedged_ainvoke(self, policy: LLMCallPolicy, input: Any, config: Optional[RunnableConfig],
+                              **kwargs: Any) -> Any:
+        """
+        Send a duplicate request if the first one has no first token after the learned hedging delay
+
+        The first request to produce a token wins and the others are cancelled right away,
+        before they could stream anything, so the workflow only streams the winner.
+        """
+        loop = asyncio.get_running_loop()
+        node = get_node(config)
+        limiter = llm_governor.get_limiter(self.model_name)
+        attempts: List[asyncio.Task] = []
+        outcome: asyncio.Future = loop.create_future()
+        responded = False
+
+        def on_done(task: asyncio.Task) -> None:
+            if outcome.done():
+                return
+            if not task.cancelled() and task.exception() is None:
+                if task is not attempts[0]:
+                    llm_hedge_wins.inc(node=node, model=self.model_name)
+                outcome.set_result(task.result())
+            elif all(attempt.done() for attempt in attempts):
+                failed = [attempt for attempt in attempts if not attempt.cancelled()]
+                if failed:
+                    outcome.set_exception(failed[0].exception())
+                else:
+                    outcome.cancel()
+
+        def start() -> asyncio.Task:
+            started = time.perf_counter()
+
+            def on_first_token() -> None:
+                nonlocal responded
+                responded = True
+                first_token_latencies.observe(self.model_name, time.perf_counter() - started)
+                for attempt in attempts:
+                    if attempt is not task:
+                        attempt.cancel()
+
+            attempt_config = merge_configs(ensure_config(config), {"callbacks": [FirstTokenCallbackHandler(on_first_token)]})
+            task = asyncio.create_task(RunnableBinding.ainvoke(self, input, attempt_config, **kwargs))
+            attempts.append(task)
+            task.add_done_callback(on_done)
+            return task
+
+        def hedge() -> None:
+            # the duplicate never queues, it only uses capacity that is free right now
+            if responded or outcome.done() or not limiter.try_acquire(get_priority(config)):
+                return
+            llm_hedged.inc(node=node, model=self.model_name)
+            start().add_done_callback(lambda _: limiter.release())
+
+        start()
+        delay = first_token_latencies.percentile(self.model_name, policy.hedge_percentile)
+        timer = loop.call_later(max(delay, policy.hedge_min_delay_seconds), hedge) if delay is not None else None
+        try:
+            return await outcome
+        finally:
+            if timer is not None:
+                timer.cancel()
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async with llm_governor.slot(self.model_name, get_priority(config)):
+            async for chunk in super().astream(input, config, **kwargs):
+                yield chunk
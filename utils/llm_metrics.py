@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from utils.metrics import metrics_registry
+
+# node label of LLM calls made outside the workflow graph, e.g. background summaries
+_llm_node: ContextVar[Optional[str]] = ContextVar("llm_node", default=None)
+
+# USD per 1M (prompt, completion) tokens, override or extend with LLM_PRICES='{"model": [in, out]}'
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "deepseek-v3": (0.27, 1.1),
+}
+
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+LABELS = ("node", "model")
+
+llm_request_duration = metrics_registry.histogram(
+    "llm_request_duration_seconds", "Wall time of LLM calls", LABELS + ("outcome",))
+llm_time_to_first_token = metrics_registry.histogram(
+    "llm_time_to_first_token_seconds", "Time to the first streamed token, the full response time if not streamed", LABELS)
+llm_prompt_tokens = metrics_registry.histogram(
+    "llm_prompt_tokens", "Prompt tokens per LLM call", LABELS, TOKEN_BUCKETS)
+llm_completion_tokens = metrics_registry.histogram(
+    "llm_completion_tokens", "Completion tokens per LLM call", LABELS, TOKEN_BUCKETS)
+llm_cost = metrics_registry.counter(
+    "llm_cost_usd_total", "Estimated cost of LLM calls in USD", LABELS)
+
+
+@contextmanager
+def llm_node(node: str) -> Iterator[None]:
+    """Label the LLM calls made in this context, for calls made outside the workflow graph"""
+    token = _llm_node.set(node)
+    try:
+        yield
+    finally:
+        _llm_node.reset(token)
+
+
+def get_llm_node() -> Optional[str]:
+    """Label set by llm_node, None if not set"""
+    return _llm_node.get()
+
+
+def get_model_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(MODEL_PRICES)
+    prices.update({model: tuple(price) for model, price in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+    return prices
+
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Record latency, time to first token, token usage, cost and outcome of every chat model call
+
+    Calls are labeled by the workflow node running them (langgraph_node metadata),
+    by the llm_node context for calls outside the graph, or "other".
+    """
+
+    # only cheap bookkeeping, run in the event loop instead of an executor
+    run_inline = True
+
+    def __init__(self):
+        # run id -> (node, model, start time, first token time)
+        self._runs: Dict[UUID, list] = {}
+        self._lock = threading.Lock()
+        self._prices = get_model_prices()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        node = _llm_node.get() or metadata.get("langgraph_node") or "other"
+        model = metadata.get("ls_model_name") or kwargs.get("invocation_params", {}).get("model") or "unknown"
+        with self._lock:
+            self._runs[run_id] = [node, model, time.perf_counter(), None]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run[3] is None:
+            run[3] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._pop(run_id)
+        if run is None:
+            return
+        node, model, started, first_token = run
+        now = time.perf_counter()
+        llm_request_duration.observe(now - started, node=node, model=model, outcome="success")
+        llm_time_to_first_token.observe((first_token or now) - started, node=node, model=model)
+
+        prompt_tokens, completion_tokens = self._get_usage(response)
+        llm_prompt_tokens.observe(prompt_tokens, node=node, model=model)
+        llm_completion_tokens.observe(completion_tokens, node=node, model=model)
+
+        price = self._get_price(model)
+        if price:
+            llm_cost.inc((prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000, node=node, model=model)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._pop(run_id)
+        if run is None:
+            return
+        node, model, started, _ = run
+        # hedged duplicates and calls past their deadline are cancelled
+        outcome = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+        llm_request_duration.observe(time.perf_counter() - started, node=node, model=model, outcome=outcome)
+
+    def _pop(self, run_id: UUID) -> Optional[list]:
+        with self._lock:
+            return self._runs.pop(run_id, None)
+
+    def _get_price(self, model: str) -> Optional[Tuple[float, float]]:
+        # versioned names such as "gpt-4o-2024-08-06" use the price of their base model
+        return self._prices.get(model) or next(
+            (price for name, price in sorted(self._prices.items(), key=lambda item: -len(item[0])) if model.startswith(name)),
+            None
+        )
+
+    @staticmethod
+    def _get_usage(response: LLMResult) -> Tuple[int, int]:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+llm_metrics_handler = LLMMetricsCallbackHandler()
@@ -0,0 +1,130 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableConfig, ensure_config
+from utils.metrics import metrics_registry
+
+# seconds left in the interview of the running workflow node
+_remaining_seconds: ContextVar[Optional[float]] = ContextVar("llm_remaining_seconds", default=None)
+
+# first token latencies kept per model to learn the hedging delay
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+llm_hedged = metrics_registry.counter(
+    "llm_hedged_requests_total", "LLM calls that sent a hedged duplicate request", ("node", "model"))
+llm_hedge_wins = metrics_registry.counter(
+    "llm_hedge_wins_total", "Hedged LLM calls answered by the duplicate request", ("node", "model"))
+llm_deadline_exceeded = metrics_registry.counter(
+    "llm_deadline_exceeded_total", "LLM calls cancelled by the node deadline", ("node", "model"))
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The LLM call did not finish before the deadline of its workflow node"""
+
+
+@dataclass
+class LLMCallPolicy:
+    """
+    Deadline and hedging policy of the LLM calls made by a workflow node
+
+    Attributes:
+        timeout_seconds: hard deadline of a call, including the governor queue, None for no deadline
+        min_timeout_seconds: the deadline follows the remaining interview time but never drops below this
+        hedge: send a duplicate request if no first token arrived after the hedge percentile of the model
+        hedge_percentile: percentile of the learned first token latency used as the hedging delay
+        hedge_min_delay_seconds: lower bound of the hedging delay
+    """
+    timeout_seconds: Optional[float] = None
+    min_timeout_seconds: float = 10
+    hedge: bool = False
+    hedge_percentile: float = 0.9
+    hedge_min_delay_seconds: float = 0.5
+
+    def get_timeout(self) -> Optional[float]:
+        """The deadline of a call, shortened to the remaining interview time"""
+        remaining = _remaining_seconds.get()
+        if self.timeout_seconds is None or remaining is None:
+            return self.timeout_seconds
+        return min(self.timeout_seconds, max(self.min_timeout_seconds, remaining))
+
+
+DEFAULT_POLICY = LLMCallPolicy()
+
+
+def get_node(config: Optional[RunnableConfig] = None) -> str:
+    """Get the workflow node running a model call, "other" outside the graph"""
+    return ensure_config(config).get("metadata", {}).get("langgraph_node") or "other"
+
+
+def get_call_policy(config: Optional[RunnableConfig] = None) -> LLMCallPolicy:
+    """
+    Get the policy of a model call from the llm_policies of the runnable config
+
+    llm_policies maps workflow nodes to LLMCallPolicy fields, "default" applies to the other nodes.
+    """
+    config = ensure_config(config)
+    policies: Dict[str, Dict[str, Any]] = config.get("configurable", {}).get("llm_policies") or {}
+    policy = policies.get(get_node(config)) or policies.get("default")
+    return LLMCallPolicy(**policy) if policy else DEFAULT_POLICY
+
+
+@contextmanager
+def llm_deadline(remaining_seconds: float) -> Iterator[None]:
+    """Bound the deadlines of the LLM calls made in this context by the remaining interview time"""
+    token = _remaining_seconds.set(remaining_seconds)
+    try:
+        yield
+    finally:
+        _remaining_seconds.reset(token)
+
+
+class FirstTokenLatencies:
+    """Rolling window of first token latencies per model"""
+
+    def __init__(self, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model: str, percentile: float) -> Optional[float]:
+        """The latency percentile of the model, None until enough calls were observed"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+
+first_token_latencies = FirstTokenLatencies()
+
+
+class FirstTokenCallbackHandler(BaseCallbackHandler):
+    """Call back once, on the first streamed token or the end of a non-streamed call"""
+
+    # must run before the token reaches the stream of the workflow
+    run_inline = True
+
+    def __init__(self, callback: Callable[[], None]):
+        self._callback = callback
+        self._called = False
+
+    def _fire(self) -> None:
+        if not self._called:
+            self._called = True
+            self._callback()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self._fire()
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        self._fire()
@@ -0,0 +1,179 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from utils.metrics import metrics_registry
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+log_records_written = metrics_registry.counter(
+    "log_records_written_total", "Log records written by the JSON log sinks", ("sink",))
+log_records_dropped = metrics_registry.counter(
+    "log_records_dropped_total", "Log records dropped because the JSON log sink queue was full", ("sink",))
+
+# stops the writer thread
+_STOP = object()
+
+
+def parse_size(size: str) -> int:
+    """Parse a file size such as "500 MB" into bytes"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B)?\s*", size.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2) or "B"])
+
+
+def to_json_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Structured fields of a loguru record, the bound extra fields (test_id, node, duration...) included"""
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "process": record["process"].id,
+    }
+    entry.update(record["extra"])
+    if record["exception"] is not None:
+        error_type, error, tb = record["exception"]
+        entry["exception"] = "".join(traceback.format_exception(error_type, error, tb))
+    return entry
+
+
+class BatchedJsonSink:
+    """
+    Non-blocking loguru sink writing JSON lines from a background thread
+
+    The logging call only puts the record on a bounded queue, a full queue drops the record
+    and counts it in log_records_dropped_total, so logging never blocks the event loop.
+    The writer thread serializes whatever has been queued as one batch, appends it to the file
+    and rotates the file by size, rotated files are compressed and the newest `retention` kept.
+    "{pid}" in the path is replaced by the process id, so that workers never share a file.
+    """
+
+    def __init__(self,
+                 path: str,
+                 rotation: Optional[str] = "500 MB",
+                 retention: int = 10,
+                 compression: Optional[str] = "gz",
+                 queue_size: int = 10000,
+                 batch_size: int = 256):
+        self.path = path.format(pid=os.getpid())
+        self.rotation_bytes = parse_size(rotation) if rotation else None
+        self.retention = retention
+        self.compression = compression
+        self.batch_size = batch_size
+        self.name = os.path.basename(self.path)
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name=f"log-sink-{self.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        """Called by loguru for each record"""
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
+            log_records_dropped.inc(sink=self.name)
+
+    def stop(self) -> None:
+        """Called by loguru when the sink is removed, writes the queued records and closes the file"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [record for record in batch if record is not _STOP]
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # the sink can't log through loguru, that would enqueue into itself
+                print(f"Failed to write log records to {self.path}: {str(e)}", flush=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        lines = [json.dumps(to_json_record(record), ensure_ascii=False, default=str) for record in records]
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            lines.append(json.dumps({
+                "time": datetime.now(timezone.utc).isoformat(),
+                "level": "WARNING",
+                "message": f"Dropped {dropped} log records, the log queue was full",
+                "logger": __name__,
+                "dropped": dropped,
+            }))
+        if not lines:
+            return
+
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        log_records_written.inc(len(records), sink=self.name)
+
+        if self.rotation_bytes and self._file.tell() >= self.rotation_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        root, ext = os.path.splitext(self.path)
+        rotated = f"{root}.{time.strftime('%Y%m%d_%H%M%S')}{ext}"
+        index = 1
+        while os.path.exists(rotated) or os.path.exists(f"{rotated}.gz"):
+            rotated = f"{root}.{time.strftime('%Y%m%d_%H%M%S')}.{index}{ext}"
+            index += 1
+        os.rename(self.path, rotated)
+
+        if self.compression == "gz":
+            with open(rotated, "rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+
+        rotated_files = sorted(glob.glob(f"{glob.escape(root)}.*{ext}*"), key=os.path.getmtime)
+        for path in rotated_files[:max(0, len(rotated_files) - self.retention)]:
+            os.remove(path)
+
+
+def add_json_sink(path: str, level: str = "INFO", **kwargs: Any) -> int:
+    """
+    Add a BatchedJsonSink to the loguru logger
+
+    Args:
+        path: log file, "{pid}" is replaced by the process id
+        level: minimum level
+        **kwargs: BatchedJsonSink options (rotation, retention, compression, queue_size, batch_size)
+
+    Returns:
+        int: handler id for logger.remove
+    """
+    # the record is serialized by the sink, the message isn't formatted by loguru
+    return logger.add(BatchedJsonSink(path, **kwargs), level=level, format=lambda record: "")
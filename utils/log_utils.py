@@ -1,28 +1,66 @@
+import os
 import sys
+from langchain_core.runnables.config import var_child_runnable_config
 from loguru import logger
+from utils.log_sink import add_json_sink
+
+
+def add_workflow_node(record):
+    """Bind the workflow node running the log call to the record"""
+    config = var_child_runnable_config.get()
+    node = config and config.get("metadata", {}).get("langgraph_node")
+    if node:
+        record["extra"].setdefault("node", node)
+
+
+CONSOLE_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
 
 def setup_logger():
-    """Configure and setup loguru logger"""
+    """Configure and setup loguru logger for CLI and development runs, the API calls configure_json_logging"""
     # Remove default handler
     logger.remove()
+    logger.configure(patcher=add_workflow_node)
     
     # Add custom formatted handler
     logger.add(
         sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO"
+        format=CONSOLE_FORMAT,
+        level=os.getenv("LOG_LEVEL", "INFO")
     )
     
-    # Optional: Add file handler for logging to file
-    logger.add(
-        "logs/ai_interview_{time}.log",
-        rotation="500 MB",
-        retention="10 days",
-        level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+    # Structured JSON lines written by a background thread, one file per process
+    add_json_sink(
+        os.getenv("LOG_FILE", "logs/ai_interview_{pid}.jsonl"),
+        level=os.getenv("LOG_FILE_LEVEL", "INFO"),
+        rotation=os.getenv("LOG_ROTATION", "500 MB"),
+        retention=int(os.getenv("LOG_RETENTION", "10")),
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000"))
     )
 
     return logger
 
+
+def configure_json_logging(path: str, level: str = "INFO", console: bool = False, **kwargs) -> int:
+    """
+    Replace the sinks of setup_logger by a single BatchedJsonSink
+
+    Used by the API, so that every record is serialized once and logging never blocks the event loop.
+
+    Args:
+        path: log file, "{pid}" is replaced by the process id
+        level: minimum level
+        console: also log to stdout, the records are written by loguru's queue thread
+        **kwargs: BatchedJsonSink options (rotation, retention, compression, queue_size, batch_size)
+
+    Returns:
+        int: handler id of the JSON sink
+    """
+    logger.remove()
+    if console:
+        logger.add(sys.stdout, format=CONSOLE_FORMAT, level=level, enqueue=True)
+    return add_json_sink(path, level=level, **kwargs)
+
+
 # Initialize logger
-logger = setup_logger() 
\ No newline at end of file
+logger = setup_logger()
@@ -1,7 +1,153 @@
 import os
+import threading
+import time
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+# prompt file paths are relative to the agent directory, e.g. 'prompts/kickoff_interview.txt'
+AGENT_DIR = os.path.join(os.path.dirname(__file__), '..', 'agent')
+# a line '@include prompts/interview_rules.txt' is replaced by the content of that file
+INCLUDE_DIRECTIVE = '@include '
+
+
+class PromptTemplate:
+    """A prompt template parsed once and rendered without re-parsing"""
+
+    def __init__(self, template: str, mtime: float, dependencies: Optional[Dict[str, float]] = None):
+        self.template = template
+        self.mtime = mtime
+        # mtimes of the included files, a change of any of them reloads the template
+        self.dependencies = dependencies or {}
+        # (literal_text, field_name, format_spec, conversion) as parsed by str.format
+        self.segments: List[Tuple[str, Optional[str], str, Optional[str]]] = list(Formatter().parse(template))
+        self.fields = {field for _, field, _, _ in self.segments if field}
+
+    def format(self, **kwargs: Any) -> str:
+        """Render the template, same semantics as str.format for named fields"""
+        parts: List[str] = []
+        for literal, field, format_spec, conversion in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = kwargs[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(parts)
+
+
+class PromptRegistry:
+    """
+    Cache of compiled prompt templates
+
+    All templates under the prompt directory are loaded once. A cached entry is
+    reloaded when its file's mtime changes; mtimes are checked at most once per
+    check_interval seconds so the hot path normally does no file I/O.
+
+    Language variants are stored next to the default template as
+    '<name>.<language>.txt', e.g. 'kickoff_interview.english.txt'.
+    Templates sharing the same rules include them with an '@include <path>' line.
+    """
+
+    def __init__(self, base_dir: str = AGENT_DIR, prompt_dir: str = 'prompts', check_interval: float = 2.0):
+        self.base_dir = base_dir
+        self.prompt_dir = prompt_dir
+        self.check_interval = check_interval
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._missing: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load_all(self) -> None:
+        """Load and compile every template under the prompt directory"""
+        directory = os.path.join(self.base_dir, self.prompt_dir)
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith('.txt'):
+                self._load(os.path.join(self.prompt_dir, file_name))
+
+    def get(self, file_path: str, language: Optional[str] = None) -> PromptTemplate:
+        """
+        Get a compiled template
+
+        Args:
+            file_path: template path relative to the agent directory
+            language: interview language, the language variant is used if it exists
+
+        Returns:
+            PromptTemplate: the compiled template
+        """
+        if language:
+            variant = self._variant_path(file_path, language)
+            if variant in self._templates or self._variant_exists(variant):
+                return self._get(variant)
+        return self._get(file_path)
+
+    def _variant_exists(self, variant: str) -> bool:
+        # missing variants are remembered for check_interval seconds
+        now = time.monotonic()
+        if now - self._missing.get(variant, -self.check_interval) < self.check_interval:
+            return False
+        if os.path.exists(os.path.join(self.base_dir, variant)):
+            self._missing.pop(variant, None)
+            return True
+        self._missing[variant] = now
+        return False
+
+    def _get(self, file_path: str) -> PromptTemplate:
+        template = self._templates.get(file_path)
+        if template is None:
+            return self._load(file_path)
+
+        now = time.monotonic()
+        if now - self._checked_at.get(file_path, 0) >= self.check_interval:
+            self._checked_at[file_path] = now
+            if os.path.getmtime(os.path.join(self.base_dir, file_path)) != template.mtime or any(
+                    os.path.getmtime(os.path.join(self.base_dir, path)) != mtime
+                    for path, mtime in template.dependencies.items()):
+                return self._load(file_path)
+        return template
+
+    def _load(self, file_path: str) -> PromptTemplate:
+        with self._lock:
+            mtimes: Dict[str, float] = {}
+            text = self._read(file_path, mtimes, ())
+            mtime = mtimes.pop(file_path)
+            template = PromptTemplate(text, mtime, mtimes)
+            self._templates[file_path] = template
+            self._checked_at[file_path] = time.monotonic()
+            return template
+
+    def _read(self, file_path: str, mtimes: Dict[str, float], including: Tuple[str, ...]) -> str:
+        """Read a template file with its '@include' lines expanded, recording the mtime of every file read"""
+        if file_path in including:
+            raise ValueError(f"Circular prompt include: {' -> '.join(including + (file_path,))}")
+        full_path = os.path.join(self.base_dir, file_path)
+        mtimes[file_path] = os.path.getmtime(full_path)
+        with open(full_path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines(keepends=True)
+        return "".join(
+            self._read(line[len(INCLUDE_DIRECTIVE):].strip(), mtimes, including + (file_path,))
+            if line.startswith(INCLUDE_DIRECTIVE) else line
+            for line in lines
+        )
+
+    def _variant_path(self, file_path: str, language: str) -> str:
+        name, ext = os.path.splitext(file_path)
+        return f"{name}.{language.lower()}{ext}"
+
+
+prompt_registry = PromptRegistry()
+
+
+def get_prompt(file_path: str, language: Optional[str] = None) -> PromptTemplate:
+    """Get a compiled prompt template, see PromptRegistry.get"""
+    return prompt_registry.get(file_path, language)
+
 
 def load_prompt(file_path: str) -> str:
     """Load a prompt from a file."""
-    prompt_file_path = os.path.join(os.path.dirname(__file__), '..', 'agent', file_path)
-    with open(prompt_file_path, 'r', encoding='utf-8') as file:
-        return file.read()
\ No newline at end of file
+    return prompt_registry.get(file_path).template